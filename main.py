@@ -4,6 +4,8 @@
 
 Usage:
     python main.py --event-id 12345 --event-name "My Event"
+    python main.py --event-id 12345 --event-name "My Event" --offline
+    python main.py --batch events.txt --batch-workers 4 --rate 8
 
 Behavior:
 - Creates data/<event-name>/ with subfolders `matchups/` and `results/`.
@@ -19,6 +21,21 @@ Behavior:
   9) scripts/create_win_matrix.py
   10) scripts/create_win_matrix_heatmap.py
 - Exports environment variables so the scripts write into the event folder.
+- With --incremental, standings and pairings only fetch rounds not yet recorded
+  as completed in data/<event-name>/fetch_state.json and merge them into the
+  existing artifacts (INCREMENTAL_FETCH=1).
+- With --offline, fetch stages replay from data/<event-name>/http_cache/ and
+  never touch the network (MELEE_OFFLINE=1).
+- With --final-standings, pairings are fetched first and standings only
+  download the final round; limited/constructed records are rebuilt from the
+  pairings (STANDINGS_FINAL_ONLY=1).
+- With --reparse-decklists, decklists are parsed again from the raw pages
+  archived in data/<event-name>/decklists_html.bin (DECKLIST_REPARSE=1).
+- With --batch FILE, every event listed in FILE (`event_id,event name[,event_type]`
+  per line) is run: up to --batch-workers events fetch at once, sharing the
+  --rate request budget evenly, and each event's analytics stages start as
+  soon as its own fetch stages finish. Script output goes to
+  data/<event-name>/logs/pipeline.out.
 """
 
 from __future__ import annotations
@@ -27,18 +44,45 @@ import os
 import subprocess
 from pathlib import Path
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
 
-def run_script(python_exe: str, module_name: str, env: dict) -> int:
+FETCH_MODULES = [
+    "scripts.fetch_standings_api",
+    "scripts.fetch_pairings_api",
+    "scripts.fetch_decklists_api",
+]
+ANALYTICS_MODULES = [
+    "scripts.create_metagame_breakdown",
+    "scripts.create_card_winrates",
+    "scripts.filter_pairings_by_archetype",
+    "scripts.create_matchups_files",
+    "scripts.create_aggregate_stats",
+    "scripts.create_win_matrix",
+    "scripts.create_win_matrix_heatmap",
+]
+EVENT_TYPES = ["constructed", "pro-tour", "worlds"]
+
+
+def run_script(python_exe: str, module_name: str, env: dict, output: Path | None = None) -> int:
     """Run a module using `python -m module_name` so package imports resolve.
 
+    With `output`, the module's stdout/stderr are appended to that file instead
+    of the console (batch mode runs several events at once).
+
     Returns the subprocess return code.
     """
-    print(f"Running module {module_name}...")
+    print(f"Running module {module_name}..." + (f" [{env.get('EVENT_NAME')}]" if output else ""))
     cmd = [python_exe, "-m", module_name]
-    proc = subprocess.run(cmd, env=env)
+    if output is None:
+        proc = subprocess.run(cmd, env=env)
+        return proc.returncode
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("a", encoding="utf-8") as fh:
+        proc = subprocess.run(cmd, env=env, stdout=fh, stderr=subprocess.STDOUT)
     return proc.returncode
 
 
@@ -52,45 +96,222 @@ def _append_log(log_path: Path, text: str) -> None:
         print(f"Unable to write log to {log_path}")
 
 
+def prepare_event(base_env: dict, data_root: Path, event_id: str, event_name: str, event_type: str, args) -> tuple[dict, Path]:
+    """Create data/<event-name>/ (with logs/) and the env the scripts run with."""
+    event_dir = data_root / event_name
+    (event_dir / "logs").mkdir(parents=True, exist_ok=True)
+
+    env = dict(base_env)
+    env["EVENT_ID"] = event_id
+    env["EVENT_NAME"] = event_name
+    env["EVENT_DATA_DIR"] = str(event_dir)
+    env["EVENT_TYPE"] = event_type
+    if args.offline:
+        env["MELEE_OFFLINE"] = "1"
+    if args.incremental:
+        env["INCREMENTAL_FETCH"] = "1"
+    if args.reparse_decklists:
+        env["DECKLIST_REPARSE"] = "1"
+    if args.final_standings:
+        env["STANDINGS_FINAL_ONLY"] = "1"
+    if args.csv_trees:
+        env["RESULTS_CSV_TREES"] = "1"
+    return env, event_dir
+
+
+def fetch_modules(final_standings: bool) -> list[str]:
+    modules = list(FETCH_MODULES)
+    if final_standings:
+        # standings reconstruct per-round records from the pairings, so fetch those first
+        modules[0], modules[1] = modules[1], modules[0]
+    return modules
+
+
+def run_modules(python_exe: str, modules: list[str], env: dict, logs_dir: Path, output: Path | None = None) -> int:
+    """Run modules in order, logging each to logs/main.log; stop at the first failure."""
+    for mod in modules:
+        start_ts = time.time()
+        rc = run_script(python_exe, mod, env, output=output)
+        end_ts = time.time()
+        duration = end_ts - start_ts
+        now = datetime.now(timezone.utc).isoformat()
+        log_line = f"{now} | module={mod} | rc={rc} | duration_s={duration:.3f}"
+        _append_log(logs_dir / "main.log", log_line)
+        print(log_line + (f" | event={env.get('EVENT_NAME')}" if output else ""))
+        if rc != 0:
+            print(f"Module {mod} exited with code {rc}. Aborting.")
+            return rc
+    return 0
+
+
+def read_batch_file(path: Path, default_event_type: str) -> list[tuple[str, str, str]]:
+    """Parse a batch file: one `event_id,event name[,event_type]` per line; `#` starts a comment."""
+    events: list[tuple[str, str, str]] = []
+    for raw in path.read_text(encoding="utf-8-sig").splitlines():
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+        parts = [part.strip() for part in line.split(",")]
+        if len(parts) < 2 or not parts[0].isdigit() or not parts[1]:
+            raise ValueError(f"Bad batch line (expected 'event_id,event name[,event_type]'): {raw!r}")
+        event_type = parts[2].lower() if len(parts) > 2 and parts[2] else default_event_type
+        if event_type not in EVENT_TYPES:
+            raise ValueError(f"Unknown event type {event_type!r} in batch line: {raw!r}")
+        events.append((parts[0], parts[1], event_type))
+    return events
+
+
+def split_rate_budget(env: dict, total_rps: float, concurrent_events: int) -> dict:
+    """Give one event's fetch processes their share of the global request-rate budget.
+
+    The standings, pairings and decklists stages each pace all of their
+    requests (tournament page and CSRF token included) through their own
+    token bucket. An event's stages run one after another, so each gets the
+    event's whole share, and the global budget is divided evenly between the
+    events fetched at once.
+
+    The split is static: every subprocess gets total_rps / concurrent_events
+    up front and paces itself, since there is no limiter shared across
+    processes. An event that finishes early or sits idle does not hand its
+    share to the others, so the batch can run below the global budget but
+    never above it.
+    """
+    share = total_rps / max(1, concurrent_events)
+    burst = str(max(1, int(share)))
+    env = dict(env)
+    env["STANDINGS_RATE"] = f"{share:g}"
+    env["STANDINGS_BURST"] = burst
+    env["PAIRINGS_RATE"] = f"{share:g}"
+    env["PAIRINGS_BURST"] = burst
+    env["DECKLIST_RPS"] = f"{share:g}"
+    return env
+
+
+def run_batch(args, base_env: dict, data_root: Path) -> int:
+    """Fetch several events concurrently under one global rate budget, running
+    each event's analytics stages as soon as its fetch stages finish."""
+    events = read_batch_file(Path(args.batch), args.event_type)
+    if not events:
+        print(f"No events found in {args.batch}.")
+        return 1
+    fetch_workers = max(1, min(args.batch_workers, len(events)))
+    total_rps = float(args.rate)
+    print(
+        f"Batch: {len(events)} events, {fetch_workers} fetched at once, "
+        f"{total_rps:g} req/s total ({total_rps / fetch_workers:g} req/s per event)."
+    )
+
+    results: dict[str, int] = {}
+    results_lock = threading.Lock()
+
+    def analytics(event_name: str, env: dict, event_dir: Path) -> None:
+        rc = run_modules(args.python, ANALYTICS_MODULES, env, event_dir / "logs", output=event_dir / "logs" / "pipeline.out")
+        with results_lock:
+            results[event_name] = rc
+
+    with ThreadPoolExecutor(max_workers=max(1, args.analytics_workers)) as analytics_pool:
+
+        def fetch(event: tuple[str, str, str]) -> None:
+            event_id, event_name, event_type = event
+            env, event_dir = prepare_event(base_env, data_root, event_id, event_name, event_type, args)
+            env = split_rate_budget(env, total_rps, fetch_workers)
+            output = event_dir / "logs" / "pipeline.out"
+            rc = run_modules(args.python, fetch_modules(args.final_standings), env, event_dir / "logs", output=output)
+            if rc != 0:
+                with results_lock:
+                    results[event_name] = rc
+                return
+            # inputs have landed: analyse this event while others are still fetching
+            analytics_pool.submit(analytics, event_name, env, event_dir)
+
+        with ThreadPoolExecutor(max_workers=fetch_workers) as fetch_pool:
+            list(fetch_pool.map(fetch, events))
+
+    failed = {name: rc for name, rc in results.items() if rc != 0}
+    for event_id, event_name, _ in events:
+        status = "ok" if results.get(event_name) == 0 else f"failed (rc={results.get(event_name)})"
+        print(f"{event_id} {event_name}: {status}")
+    if failed:
+        print(f"{len(failed)} of {len(events)} events failed; see data/<event-name>/logs/pipeline.out.")
+        return 1
+    print("All events completed successfully. Artifacts are in:", data_root)
+    return 0
+
+
 def main(argv: list[str] | None = None) -> int:
     p = argparse.ArgumentParser(description="Run the full pipeline: fetch data, normalize, create matchups, aggregate stats, and generate visualizations.")
-    p.add_argument("--event-id", required=True, help="Event ID to use when fetching (numeric).")
-    p.add_argument("--event-name", required=True, help="Event name (used to create data/<event-name>/ folder).")
+    p.add_argument("--event-id", help="Event ID to use when fetching (numeric).")
+    p.add_argument("--event-name", help="Event name (used to create data/<event-name>/ folder).")
     p.add_argument(
         "--event-type",
         default="constructed",
-        choices=["constructed", "pro-tour", "worlds"],
+        choices=EVENT_TYPES,
         help="Event type used for limited/constructed round classification.",
     )
+    p.add_argument(
+        "--batch",
+        help="File listing events to run, one 'event_id,event name[,event_type]' per line (replaces --event-id/--event-name).",
+    )
+    p.add_argument(
+        "--batch-workers",
+        type=int,
+        default=int(os.environ.get("BATCH_WORKERS") or 4),
+        help="Batch mode: number of events fetched concurrently.",
+    )
+    p.add_argument(
+        "--analytics-workers",
+        type=int,
+        default=int(os.environ.get("BATCH_ANALYTICS_WORKERS") or 2),
+        help="Batch mode: number of events whose analytics stages run concurrently.",
+    )
+    p.add_argument(
+        "--rate",
+        type=float,
+        default=float(os.environ.get("BATCH_RATE") or 8),
+        help="Batch mode: global request-rate budget (requests/s) shared by all events being fetched.",
+    )
+    p.add_argument(
+        "--offline",
+        action="store_true",
+        help="Replay fetch stages purely from the event's HTTP response cache (no network).",
+    )
+    p.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch new or still-running rounds; completed rounds already on disk are reused.",
+    )
+    p.add_argument(
+        "--final-standings",
+        action="store_true",
+        help="Fetch only the final standings round and rebuild limited/constructed records from pairings.",
+    )
+    p.add_argument(
+        "--reparse-decklists",
+        action="store_true",
+        help="Re-parse every archived decklist page (e.g. after a parser fix) instead of reusing parsed decks.",
+    )
+    p.add_argument(
+        "--csv-trees",
+        action="store_true",
+        help="Also write the per-archetype results/ and matchups/ CSV files (the event database always has them).",
+    )
     p.add_argument("--python", default=sys.executable, help="Python executable to run the scripts (default: current interpreter).")
     args = p.parse_args(argv)
 
-    event_id = str(args.event_id)
-    event_name = args.event_name
-    event_type = args.event_type
-    python_exe = args.python
-
     repo_root = Path(__file__).resolve().parent
     data_root = repo_root / "data"
-    event_dir = data_root / event_name
-    matchups_dir = event_dir / "matchups"
-    results_dir = event_dir / "results"
 
-    # create folders
-    matchups_dir.mkdir(parents=True, exist_ok=True)
-    results_dir.mkdir(parents=True, exist_ok=True)
+    if args.batch:
+        return run_batch(args, os.environ.copy(), data_root)
+    if not args.event_id or not args.event_name:
+        p.error("--event-id and --event-name are required unless --batch is given")
 
-    # prepare environment for subprocesses
-    env = os.environ.copy()
-    env["EVENT_ID"] = event_id
-    env["EVENT_NAME"] = event_name
-    env["EVENT_DATA_DIR"] = str(event_dir)
-    env["EVENT_TYPE"] = event_type
+    event_id = str(args.event_id)
+    event_name = args.event_name
+    python_exe = args.python
 
-    # ensure event dir and logs dir exist
-    event_dir.mkdir(parents=True, exist_ok=True)
+    env, event_dir = prepare_event(os.environ.copy(), data_root, event_id, event_name, args.event_type, args)
     logs_dir = event_dir / "logs"
-    logs_dir.mkdir(parents=True, exist_ok=True)
 
     # script order: 
     # 1) fetch standings, pairings, decklists
@@ -99,31 +320,10 @@ def main(argv: list[str] | None = None) -> int:
     # 4) aggregate stats, win matrix, heatmap
     # We'll run them as modules (python -m scripts.fetch_standings_api) so imports like
     # `from utils.api_utils import ...` resolve from the repo root.
-    modules = [
-        "scripts.fetch_standings_api",
-        "scripts.fetch_pairings_api",
-        "scripts.fetch_decklists_api",
-        "scripts.create_metagame_breakdown",
-        "scripts.create_card_winrates",
-        "scripts.filter_pairings_by_archetype",
-        "scripts.create_matchups_files",
-        "scripts.create_aggregate_stats",
-        "scripts.create_win_matrix",
-        "scripts.create_win_matrix_heatmap",
-    ]
-
-    for mod in modules:
-        start_ts = time.time()
-        rc = run_script(python_exe, mod, env)
-        end_ts = time.time()
-        duration = end_ts - start_ts
-        now = datetime.now(timezone.utc).isoformat()
-        log_line = f"{now} | module={mod} | rc={rc} | duration_s={duration:.3f}"
-        _append_log(logs_dir / "main.log", log_line)
-        print(log_line)
-        if rc != 0:
-            print(f"Module {mod} exited with code {rc}. Aborting.")
-            return rc
+    modules = fetch_modules(args.final_standings) + ANALYTICS_MODULES
+    rc = run_modules(python_exe, modules, env, logs_dir)
+    if rc != 0:
+        return rc
 
     print("All scripts completed successfully. Artifacts are in:", event_dir)
     return 0
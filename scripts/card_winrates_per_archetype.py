@@ -4,22 +4,39 @@
 # @Author  : peterpiperpickedpeppers
 # @Link    : https://github.com/peterpiperpickedpeppers
 
+import numpy as np
 import pandas as pd
 
+from utils.card_matrix import CardMatrix
+from utils.vocab import EventVocabulary
+
 # This module provides archetype_card_copy_winrates(df, archetype, ...)
 
+_COLUMNS = ["card", "loc", "deck_archetype", "Copies", "# of Pilots", "Wins", "Losses", "Win%"]
+# helper column names -> vocabulary their codes come from
+_CODED_FIELDS = {"pilot": "players", "deck_archetype": "archetypes", "card": "cards", "loc": "zones"}
+
+
 def archetype_card_copy_winrates(
     df: pd.DataFrame,
     archetype: str,
     loc: str | None = None,   # None (or "None") => include both main + side
     min_pilots: int = 0,
     max_copies_cap: int | None = None,
+    vocab: EventVocabulary | None = None,
+    matrix: CardMatrix | None = None,
 ) -> pd.DataFrame:
     """
     For the given archetype, return a table that, for each card (and loc),
     shows winrate by copy count INCLUDING 0 copies (pilots who didn't play it).
     Expected columns in df (case-insensitive): player|pilot, archetype, card name|card,
     quantity|Copies, loc, wins|Wins, losses|Losses
+
+    With `vocab`, the pilot/archetype/card/loc columns already hold its int32
+    codes (EventVocabulary.encode_frame); otherwise they are encoded here.
+    `matrix` is the event's CardMatrix over the same codes (built here when
+    omitted), so the archetype is a row slice and the per-copy counts are
+    reductions over its sparse entries; strings come back only in the output.
     """
 
     # --- normalize columns ---
@@ -37,78 +54,70 @@ def archetype_card_copy_winrates(
     missing = required - set(df.columns)
     if missing:
         raise KeyError(f"Missing columns: {missing}")
-
-    # coerce types gently
-    df["Copies"] = pd.to_numeric(df["Copies"], errors="coerce").fillna(0).astype(int)
-    df["Wins"]   = pd.to_numeric(df["Wins"],   errors="coerce").fillna(0).astype(int)
-    df["Losses"] = pd.to_numeric(df["Losses"], errors="coerce").fillna(0).astype(int)
-
-    # --- subset to archetype ---
-    df_arch_all = df[df["deck_archetype"] == archetype].copy()
-    if df_arch_all.empty:
-        return pd.DataFrame(columns=["card","loc","deck_archetype","Copies","# of Pilots","Wins","Losses","Win%"])
+    if vocab is None:
+        vocab = EventVocabulary()
+        df = vocab.encode_frame(df, _CODED_FIELDS)
+    if matrix is None:
+        matrix = CardMatrix.from_codes(*(df[c] for c in ("pilot", "deck_archetype", "card", "loc", "Copies")))
+        matrix.set_records(df["pilot"], df["deck_archetype"], df["Wins"], df["Losses"])
+
+    # --- the archetype's pilots are a contiguous row range of the matrix ---
+    rows = matrix.archetype_rows(vocab.archetypes.code(archetype))
+    n_pilots_total = rows.stop - rows.start
+    if n_pilots_total == 0:
+        return pd.DataFrame(columns=_COLUMNS)
+    pilot_wins = matrix.wins[rows].astype(np.int64)
+    pilot_losses = matrix.losses[rows].astype(np.int64)
+    entry_col, entry_row, entry_copies = matrix.entries(rows)
 
     # normalize loc argument
     if isinstance(loc, str) and loc.lower() == "none":
         loc = None
 
-    # optional loc filter for card rows ONLY (results still come from all pilots)
+    # optional loc filter for card columns ONLY (results still come from all pilots)
     if loc is not None and loc.lower() in ("main", "side"):
-        df_arch = df_arch_all[df_arch_all["loc"].str.lower() == loc.lower()].copy()
-    else:
-        df_arch = df_arch_all.copy()  # include both
-
-    # --- pilot-level results (use all archetype rows so every pilot is present) ---
-    pilot_results = (
-        df_arch_all.groupby("pilot")[["Wins", "Losses"]]
-        .first()
-        .reindex(df_arch_all["pilot"].unique())
-    )
-    all_pilots = pilot_results.index
-
-    rows = []
-
-    # iterate over (card, loc) pairs present in the (optionally) loc-filtered frame
-    for (card, card_loc) in df_arch[["card", "loc"]].drop_duplicates().itertuples(index=False):
-        # copies per pilot for THIS (card, loc); pilots without the card get 0
-        sub = df_arch[(df_arch["card"] == card) & (df_arch["loc"] == card_loc)]
-        copies_per_pilot = (
-            sub.groupby("pilot")["Copies"].sum()
-            .reindex(all_pilots, fill_value=0)
-        )
-
-        # decide copy range
-        observed_max = int(copies_per_pilot.max()) if len(copies_per_pilot) else 0
-        max_c = max_copies_cap if max_copies_cap is not None else observed_max
-        copy_vals = range(0, max_c + 1)
-
-        for c in copy_vals:
-            pilots_at_c = copies_per_pilot.index[copies_per_pilot == c]
-            n_pilots = len(pilots_at_c)
-            if n_pilots < min_pilots:
-                continue
-
-            if n_pilots > 0:
-                wr = pilot_results.loc[pilots_at_c].sum()
-                wins = int(wr["Wins"])
-                losses = int(wr["Losses"])
-                total = wins + losses
-                winp = round(100 * wins / total, 2) if total else 0.0
-            else:
-                wins = losses = 0
-                winp = 0.0
-
-            rows.append({
-                "card": card,
-                "loc": card_loc,
-                "deck_archetype": archetype,
-                "Copies": int(c),
-                "# of Pilots": int(n_pilots),
-                "Wins": int(wins),
-                "Losses": int(losses),
-                "Win%": winp,
-            })
-
-    out = pd.DataFrame(rows).sort_values(["card", "loc", "Copies"]).reset_index(drop=True)
+        wanted = [code for code, name in enumerate(vocab.zones.values) if name.lower() == loc.lower()]
+        keep = np.isin(matrix.zones[entry_col], wanted)
+        entry_col, entry_row, entry_copies = entry_col[keep], entry_row[keep], entry_copies[keep]
+
+    # (card, loc) columns present for the archetype; pilots without an entry have 0 copies
+    columns, k = np.unique(entry_col, return_inverse=True)
+    observed_max = np.zeros(len(columns), dtype=np.int64)
+    np.maximum.at(observed_max, k, entry_copies)
+    max_c = np.full(len(columns), max_copies_cap) if max_copies_cap is not None else observed_max
+    width = int(max_c.max()) + 1 if len(columns) else 1
+
+    # per column and copy count: pilots, wins, losses (sparse reductions over the entries)
+    n_pilots = np.zeros((len(columns), width), dtype=np.int64)
+    wins = np.zeros_like(n_pilots)
+    losses = np.zeros_like(n_pilots)
+    counted = (entry_copies >= 1) & (entry_copies <= max_c[k])
+    for table, values in ((n_pilots, 1), (wins, pilot_wins[entry_row]), (losses, pilot_losses[entry_row])):
+        np.add.at(table, (k[counted], entry_copies[counted]), values[counted] if np.ndim(values) else values)
+    nonzero = entry_copies != 0
+    nonzero_pilots = np.bincount(k[nonzero], minlength=len(columns))
+    n_pilots[:, 0] = n_pilots_total - nonzero_pilots
+    wins[:, 0] = pilot_wins.sum() - np.bincount(k[nonzero], weights=pilot_wins[entry_row[nonzero]], minlength=len(columns)).astype(np.int64)
+    losses[:, 0] = pilot_losses.sum() - np.bincount(k[nonzero], weights=pilot_losses[entry_row[nonzero]], minlength=len(columns)).astype(np.int64)
+
+    # one output row per column and copy count 0..max_c, dropping thin cells
+    out_k = np.repeat(np.arange(len(columns)), max_c + 1)
+    out_c = np.arange(len(out_k)) - np.repeat(np.cumsum(max_c + 1) - (max_c + 1), max_c + 1)
+    keep = n_pilots[out_k, out_c] >= min_pilots
+    out_k, out_c = out_k[keep], out_c[keep]
+    w = wins[out_k, out_c].tolist()
+    l_ = losses[out_k, out_c].tolist()
+
+    # strings only come back for the output table
+    cols = {
+        "card": list(vocab.cards.decode(matrix.cards[columns[out_k]])),
+        "loc": list(vocab.zones.decode(matrix.zones[columns[out_k]])),
+        "deck_archetype": [archetype] * len(out_k),
+        "Copies": out_c.tolist(),
+        "# of Pilots": n_pilots[out_k, out_c].tolist(),
+        "Wins": w,
+        "Losses": l_,
+        "Win%": [round(100 * a / (a + b), 2) if a + b else 0.0 for a, b in zip(w, l_)],
+    }
+    out = pd.DataFrame(cols, columns=_COLUMNS).sort_values(["card", "loc", "Copies"]).reset_index(drop=True)
     return out
-
@@ -3,21 +3,29 @@
 """
 Combine decklist CSVs from multiple Regional Championship events into a single file.
 
-Reads all '*decklists.csv' files from RC event folders under data/ and combines
-them into a single CSV with an Event column added to track the source event.
+Reads the decklists artifact from each RC event folder under data/ and combines
+them into a single file with an Event column added to track the source event.
 
 Usage:
     python -m scripts.combine_decklists
     
-Output: data/all_events/modern_rcs_all_decklists.csv
+Output: data/all_events/modern_rcs_all_decklists.arrow (Arrow IPC, memory-mapped
+by load_combined_decklists) plus the .csv unless ARTIFACT_CSV=0. Without pyarrow
+only the CSV is written.
 """
 
 from __future__ import annotations
 
 from pathlib import Path
 import pandas as pd
+from pandas.api.types import union_categoricals
 import re
 
+from utils.artifacts import find_artifacts, load_decklists, write_artifact
+from utils.vocab import EventVocabulary, vocab_path
+
+COMBINED_DECKLISTS = Path(__file__).resolve().parents[1] / 'data' / 'all_events' / 'modern_rcs_all_decklists.csv'
+
 
 def extract_event_name(path: Path) -> str:
     """Extract a clean event name from the file path."""
@@ -32,6 +40,36 @@ def extract_event_name(path: Path) -> str:
     return parent
 
 
+def load_combined_decklists(path: Path = COMBINED_DECKLISTS, arrow_backed: bool = True) -> pd.DataFrame:
+    """Load the combined decklists; the Arrow copy is memory-mapped instead of parsed."""
+    return load_decklists(path, arrow_backed=arrow_backed)
+
+
+def load_combined_decklists_encoded(path: Path = COMBINED_DECKLISTS) -> tuple[pd.DataFrame, EventVocabulary]:
+    """Combined decklists with player/Event/archetype/card/zone as int32 codes of the cross-event vocabulary.
+
+    Several times smaller in memory than the string table; decode output with
+    vocab.decode_frame(...).
+    """
+    vocab = EventVocabulary.load(vocab_path(path.parent))
+    df = vocab.encode_frame(load_decklists(path))
+    vocab.save(vocab_path(path.parent))
+    return df, vocab
+
+
+def _union_categories(frames: list[pd.DataFrame]) -> list[pd.DataFrame]:
+    """Give each categorical column the same categories in every frame, so concat keeps it categorical."""
+    for col in frames[0].columns:
+        parts = [df[col] for df in frames if col in df.columns]
+        if not all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            continue
+        categories = union_categoricals([p.array for p in parts], ignore_order=True).categories
+        for df in frames:
+            if col in df.columns:
+                df[col] = df[col].cat.set_categories(categories)
+    return frames
+
+
 def combine_decklists() -> None:
     """Combine all RC decklist CSVs into a single file."""
     repo_root = Path(__file__).resolve().parents[1]
@@ -49,7 +87,7 @@ def combine_decklists() -> None:
     # Collect all decklist files
     decklist_files = []
     for rc_dir in rc_dirs:
-        decklists = list(rc_dir.glob('*decklists.csv'))
+        decklists = find_artifacts(rc_dir, '*decklists')
         if decklists:
             decklist_files.append(decklists[0])  # Take the first match
             print(f"  {rc_dir.name}: {decklists[0].name}")
@@ -62,14 +100,14 @@ def combine_decklists() -> None:
     # Read and combine all files
     combined_dfs = []
     for file_path in decklist_files:
-        df = pd.read_csv(file_path)
+        df = load_decklists(file_path)
         event_name = extract_event_name(file_path)
-        df['Event'] = event_name
+        df['Event'] = pd.Categorical([event_name] * len(df))
         combined_dfs.append(df)
         print(f"  Loaded {len(df):,} rows from {event_name}")
     
     # Concatenate all dataframes
-    combined = pd.concat(combined_dfs, ignore_index=True)
+    combined = pd.concat(_union_categories(combined_dfs), ignore_index=True)
     
     # Reorder columns to put Event first (after player)
     cols = combined.columns.tolist()
@@ -80,13 +118,14 @@ def combine_decklists() -> None:
         combined = combined[cols]
     
     # Write output
-    output_dir = data_dir / 'all_events'
-    output_dir.mkdir(parents=True, exist_ok=True)
-    output_path = output_dir / 'modern_rcs_all_decklists.csv'
-    
-    combined.to_csv(output_path, index=False)
+    # Arrow IPC rather than Parquet: this file is re-read by every notebook/analysis run
+    written = write_artifact(combined, COMBINED_DECKLISTS, 'decklists', fmt='arrow')
+    # assign cross-event IDs to any new players, archetypes and cards
+    vocab = EventVocabulary.load(vocab_path(COMBINED_DECKLISTS.parent))
+    vocab.encode_frame(combined)
+    vocab.save(vocab_path(COMBINED_DECKLISTS.parent))
     print(f"\nWrote combined decklists with {len(combined):,} rows from {len(decklist_files)} files.")
-    print(f"Output: {output_path}")
+    print(f"Output: {', '.join(str(p) for p in written)}")
     
     # Print summary stats
     print(f"\nSummary:")
@@ -95,7 +134,7 @@ def combine_decklists() -> None:
     print(f"  Unique archetypes: {combined['deck_archetype'].nunique():,}")
     print(f"  Events: {combined['Event'].nunique()}")
     print("\nCards per event:")
-    print(combined.groupby('Event').size().to_string())
+    print(combined.groupby('Event', observed=True).size().to_string())
 
 
 if __name__ == '__main__':
@@ -7,6 +7,8 @@ import os
 import pandas as pd
 from pathlib import Path
 
+from utils import event_db
+
 def create_aggregate_stats():
     # Get the event directory from environment
     event_data_dir = os.getenv('EVENT_DATA_DIR')
@@ -14,37 +16,26 @@ def create_aggregate_stats():
     if not event_data_dir:
         raise ValueError("EVENT_DATA_DIR environment variable not set")
     
-    # Setup directories
-    matchups_dir = Path(event_data_dir) / 'matchups'
-    
-    if not matchups_dir.exists():
-        raise ValueError(f"Matchups directory not found: {matchups_dir}")
+    conn = event_db.connect(event_data_dir)
+    try:
+        # Sum wins, losses, draws across all opponent matchups
+        totals = event_db.archetype_totals(conn)
+    finally:
+        conn.close()
     
     # Collect aggregate stats for each archetype
     aggregate_rows = []
     
-    for matchup_file in sorted(matchups_dir.glob('*matchups.csv')):
-        # Extract archetype name from filename
-        archetype = matchup_file.stem.replace(' matchups', '')
-        
-        # Read the matchup file
-        df = pd.read_csv(matchup_file)
-        
-        # Sum wins, losses, draws across all opponent matchups
-        total_wins = df['Wins'].sum()
-        total_losses = df['Losses'].sum()
-        total_draws = df['Draws'].sum()
-        total_matches = df['Total_Matches'].sum()
-        
+    for row in totals.itertuples(index=False):
         # Calculate overall winrate
-        winrate = (total_wins / total_matches) * 100 if total_matches > 0 else 0
+        winrate = (row.Wins / row.Total_Matches) * 100 if row.Total_Matches > 0 else 0
         
         aggregate_rows.append({
-            'Archetype': archetype,
-            'Wins': total_wins,
-            'Losses': total_losses,
-            'Draws': total_draws,
-            'Total_Matches': total_matches,
+            'Archetype': row.Archetype,
+            'Wins': row.Wins,
+            'Losses': row.Losses,
+            'Draws': row.Draws,
+            'Total_Matches': row.Total_Matches,
             'Winrate': round(winrate, 1)
         })
     
@@ -17,12 +17,12 @@ and an existing decklists CSV named "<EVENT_NAME> decklists.csv" in EVENT_DATA_D
 import os
 import sys
 import re
-import requests
 import webbrowser
 from datetime import datetime, timezone
 from html import escape
 from pathlib import Path
 from typing import Dict, List, Optional, Set
+import numpy as np
 import pandas as pd
 
 # Ensure repository root is on sys.path for local imports when executed directly
@@ -30,30 +30,34 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-from scripts.fetch_decklists_api import DecklistScraper
-from utils.api_utils import parse_result_string
-from utils.api_utils import classify_event_round_ids
+from utils.artifacts import artifact_exists, load_decklists, read_artifact
+from utils.names import normalize_player_name
+from utils.card_matrix import load_card_matrix
+from utils.vocab import MISSING, EventVocabulary, Vocabulary, vocab_path
+from utils.melee_payloads import has_player_ids, parse_result_string
 from scripts.card_winrates_per_archetype import archetype_card_copy_winrates
 
 
-def _is_valid_match_row(row: pd.Series) -> bool:
-    """Return True for rows that should count toward card winrates."""
-    outcome = str(row.get("Outcome", "") or "")
-    result_string = str(row.get("ResultString", "") or "")
+def _valid_match_rows(pairings_df: pd.DataFrame) -> pd.Series:
+    """Mask of rows that should count toward card winrates (no byes, draws or 0-0-3 results)."""
+    outcome = _text_column(pairings_df, "Outcome")
+    result_string = _text_column(pairings_df, "ResultString")
+    outcome_lower = outcome.str.strip().str.lower()
+    result_lower = result_string.str.lower()
+    return (
+        ((outcome != "") | (result_string != ""))
+        & (outcome_lower != "bye")
+        & ~result_string.str.contains("0-0-3", regex=False)
+        & ~outcome_lower.str.contains("draw", regex=False)
+        & ~result_lower.str.contains("draw", regex=False)
+    )
 
-    if not outcome and not result_string:
-        return False
 
-    if outcome.strip().lower() == "bye":
-        return False
-
-    if "0-0-3" in result_string:
-        return False
-
-    if "draw" in outcome.lower() or "draw" in result_string.lower():
-        return False
-
-    return True
+def _text_column(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    values = df[column].astype(object)
+    return values.where(values.notna(), "").astype(str)
 
 
 def build_pilot_result_lookup_from_pairings(
@@ -61,11 +65,15 @@ def build_pilot_result_lookup_from_pairings(
     pilots: Optional[List[str]] = None,
     constructed_pilots: Optional[Set[str]] = None,
 ) -> Dict[str, Dict[str, int]]:
-    """Build pilot -> {Wins, Losses} from constructed-only pairings rows."""
+    """Build pilot -> {Wins, Losses} from constructed-only pairings rows.
+
+    Names are normalized once per distinct value and encoded to int32 codes;
+    the per-row work compares codes only.
+    """
     if pilots is None:
         pilots = []
 
-    normalizer = DecklistScraper().normalize_player_name
+    normalizer = normalize_player_name
     lookup: Dict[str, Dict[str, int]] = {
         normalizer(str(pilot).strip()): {"Wins": 0, "Losses": 0}
         for pilot in pilots
@@ -79,37 +87,80 @@ def build_pilot_result_lookup_from_pairings(
     else:
         constructed_pilots = {normalizer(str(p).strip()) for p in constructed_pilots if str(p).strip()}
 
-    for _, row in pairings_df.iterrows():
-        if not _is_valid_match_row(row):
-            continue
-
-        player = normalizer(str(row.get("Player") or ""))
-        opponent = normalizer(str(row.get("Opponent") or ""))
-        result_string = str(row.get("ResultString") or "")
-        outcome = str(row.get("Outcome") or "")
+    names = Vocabulary()
+    constructed_codes = names.encode(sorted(constructed_pilots))
+
+    def codes_for(raw: pd.Series) -> np.ndarray:
+        normalized = {value: normalizer(value) for value in raw.unique()}
+        return names.lookup(raw.map(normalized))
+
+    valid = _valid_match_rows(pairings_df).to_numpy(copy=True)
+    player = codes_for(_text_column(pairings_df, "Player"))
+    opponent = codes_for(_text_column(pairings_df, "Opponent"))
+    valid &= np.isin(player, constructed_codes) & np.isin(opponent, constructed_codes)
+
+    # the winner comes from the result string (or the outcome when that is empty)
+    result_text = _text_column(pairings_df, "ResultString")
+    result_text = result_text.where(result_text != "", _text_column(pairings_df, "Outcome"))[valid]
+    winners: Dict[str, Optional[str]] = {}
+    for text in result_text.unique():
+        winner_name, is_draw, is_bye = parse_result_string(text)
+        winners[text] = None if is_draw or is_bye or not winner_name else normalizer(winner_name)
+    winner = np.full(len(pairings_df), MISSING, dtype=np.int32)
+    winner[valid] = names.lookup(result_text.map(winners))
+
+    player_won = valid & (winner == player) & (winner != MISSING)
+    opponent_won = valid & ~player_won & (winner == opponent) & (winner != MISSING)
+    for codes, column in [
+        (player[player_won], "Wins"),
+        (opponent[player_won], "Losses"),
+        (opponent[opponent_won], "Wins"),
+        (player[opponent_won], "Losses"),
+    ]:
+        counts = np.bincount(codes, minlength=len(names))
+        nonzero = np.flatnonzero(counts)
+        for name, n in zip(names.decode(nonzero), counts[nonzero]):
+            if name in lookup:
+                lookup[name][column] += int(n)
 
-        if not player and not opponent:
-            continue
+    return lookup
 
-        if player not in constructed_pilots or opponent not in constructed_pilots:
-            continue
 
-        winner_name, is_draw, is_bye = parse_result_string(result_string or outcome)
-        if is_draw or is_bye or not winner_name:
-            continue
-
-        winner_key = normalizer(winner_name)
-        if winner_key == player:
-            if opponent in lookup:
-                lookup[opponent]["Losses"] += 1
-            if player in lookup:
-                lookup[player]["Wins"] += 1
-        elif winner_key == opponent:
-            if player in lookup:
-                lookup[player]["Losses"] += 1
-            if opponent in lookup:
-                lookup[opponent]["Wins"] += 1
+def build_pilot_result_lookup_by_id(
+    pairings_df: pd.DataFrame,
+    pilot_ids: Set[int],
+) -> Dict[int, Dict[str, int]]:
+    """Build player_id -> {Wins, Losses} from constructed-only pairings rows.
+
+    Same rules as build_pilot_result_lookup_from_pairings (byes, draws and
+    matches against non-pilots are skipped), but keyed on the PlayerId /
+    OpponentId / WinnerId columns so no names are compared.
+    """
+    lookup: Dict[int, Dict[str, int]] = {int(pid): {"Wins": 0, "Losses": 0} for pid in pilot_ids}
+    if pairings_df.empty:
+        return lookup
 
+    outcome = pairings_df["Outcome"].fillna("").astype(str).str.strip().str.lower()
+    result = pairings_df["ResultString"].fillna("").astype(str).str.lower()
+    player = pd.to_numeric(pairings_df["PlayerId"], errors="coerce")
+    opponent = pd.to_numeric(pairings_df["OpponentId"], errors="coerce")
+    winner = pd.to_numeric(pairings_df["WinnerId"], errors="coerce")
+    valid = (
+        ((outcome != "") | (result != ""))
+        & (outcome != "bye")
+        & ~result.str.contains("0-0-3", regex=False)
+        & ~outcome.str.contains("draw", regex=False)
+        & ~result.str.contains("draw", regex=False)
+        & winner.notna()
+        & player.isin(lookup)
+        & opponent.isin(lookup)
+    )
+    winner = winner[valid].astype(int)
+    loser = player[valid].where(winner != player[valid], opponent[valid]).astype(int)
+    for pid, n in winner.value_counts().items():
+        lookup[int(pid)]["Wins"] += int(n)
+    for pid, n in loser.value_counts().items():
+        lookup[int(pid)]["Losses"] += int(n)
     return lookup
 
 
@@ -380,8 +431,8 @@ def _write_card_winrate_html_reports(
 
 def _get_constructed_round_ids_from_standings_files(event_path: Path) -> Set[int]:
     round_ids: Set[int] = set()
-    for p in event_path.glob("*standings round_*.csv"):
-        m = re.search(r"round_(\d+)\.csv$", p.name)
+    for p in event_path.glob("*standings round_*"):
+        m = re.search(r"round_(\d+)\.(csv|parquet|arrow)$", p.name)
         if m:
             round_ids.add(int(m.group(1)))
     return round_ids
@@ -407,7 +458,7 @@ def create_all_card_winrates(min_pilots: int = 0, max_copies_cap: Optional[int]
 
     event_path = Path(event_dir)
     decklists_csv = event_path / f"{event_name} decklists.csv"
-    if not decklists_csv.exists():
+    if not artifact_exists(decklists_csv):
         raise FileNotFoundError(f"Decklists file not found: {decklists_csv}")
 
     out_dir = event_path / 'card_winrates'
@@ -417,7 +468,7 @@ def create_all_card_winrates(min_pilots: int = 0, max_copies_cap: Optional[int]
     open_html = _env_flag("CARD_WINRATES_OPEN_HTML", False)
     html_dir = event_path / 'card_winrates_html'
 
-    df = pd.read_csv(decklists_csv)
+    df = load_decklists(decklists_csv)
     # Ensure expected columns present for the helper
     # helper will rename: player->pilot, card_name->card, qty->Copies, zone->loc, wins/losses
 
@@ -425,10 +476,10 @@ def create_all_card_winrates(min_pilots: int = 0, max_copies_cap: Optional[int]
     df = df.dropna(subset=['deck_archetype']).copy()
 
     pairings_csv = event_path / f"{event_name} pairings.csv"
-    normalizer = DecklistScraper().normalize_player_name
+    normalizer = normalize_player_name
     pilot_results_lookup: Dict[str, Dict[str, int]] = {}
-    if pairings_csv.exists():
-        pairings_df = pd.read_csv(pairings_csv)
+    if artifact_exists(pairings_csv):
+        pairings_df = read_artifact(pairings_csv, "pairings")
 
         # Round filtering precedence:
         # 1) CONSTRUCTED_ROUND_IDS env (explicit allow-list)
@@ -443,7 +494,13 @@ def create_all_card_winrates(min_pilots: int = 0, max_copies_cap: Optional[int]
         event_id_raw = (os.getenv("EVENT_ID") or "").strip()
         if event_id_raw.isdigit():
             try:
-                classified = classify_event_round_ids(requests.Session(), int(event_id_raw), event_type, mode="pairings")
+                # network helpers load only here: normally the saved round metadata is enough
+                from utils.api_utils import classify_event_round_ids, load_tournament_page
+                from utils.http_client import get_client
+
+                # round metadata saved by the fetch stages; only fetched if missing
+                page = load_tournament_page(get_client(), int(event_id_raw), event_path, max_age_s=None)
+                classified = classify_event_round_ids(get_client(), int(event_id_raw), event_type, mode="pairings", page=page)
                 include_round_ids = set(int(x) for x in classified.get("constructed_ids", []))
                 limited_round_ids = sorted(int(x) for x in classified.get("limited_ids", []))
                 if limited_round_ids:
@@ -465,29 +522,41 @@ def create_all_card_winrates(min_pilots: int = 0, max_copies_cap: Optional[int]
         else:
             print("No constructed round filter found; using all pairings rounds.")
 
-        constructed_pilots = {
-            normalizer(str(p).strip())
-            for p in df['player'].dropna().astype(str).str.strip().unique().tolist()
-            if str(p).strip()
-        }
-        pilot_results_lookup = build_pilot_result_lookup_from_pairings(
-            pairings_df,
-            pilots=sorted(constructed_pilots),
-            constructed_pilots=constructed_pilots,
-        )
+        if has_player_ids(pairings_df) and "player_id" in df.columns and df["player_id"].notna().all():
+            # integer join: decklist rows and pairings both carry Melee player IDs
+            pilot_keys = df["player_id"].astype(int)
+            pilot_results_lookup = build_pilot_result_lookup_by_id(pairings_df, set(pilot_keys.unique()))
+        else:
+            # older artifacts without IDs: join on normalized display names
+            normalized = {name: normalizer(name) for name in df["player"].dropna().astype(str).str.strip().unique() if name}
+            pilot_keys = df["player"].astype(str).str.strip().map(normalized)
+            constructed_pilots = set(normalized.values()) - {""}
+            pilot_results_lookup = build_pilot_result_lookup_from_pairings(
+                pairings_df,
+                pilots=sorted(constructed_pilots),
+                constructed_pilots=constructed_pilots,
+            )
     else:
         print(f"Pairings CSV not found at {pairings_csv}; falling back to standings-derived wins/losses")
 
     # Keep canonical lowercase columns and let the helper normalize names.
     # This avoids creating duplicate "Wins"/"Losses" columns via renaming.
     if pilot_results_lookup:
-        df["wins"] = df["player"].map(lambda p: pilot_results_lookup.get(normalizer(str(p).strip()), {}).get("Wins", 0))
-        df["losses"] = df["player"].map(lambda p: pilot_results_lookup.get(normalizer(str(p).strip()), {}).get("Losses", 0))
+        df["wins"] = pilot_keys.map({k: v["Wins"] for k, v in pilot_results_lookup.items()}).fillna(0).astype(int)
+        df["losses"] = pilot_keys.map({k: v["Losses"] for k, v in pilot_results_lookup.items()}).fillna(0).astype(int)
     else:
         df["wins"] = pd.to_numeric(df["wins"], errors="coerce").fillna(0).astype(int)
         df["losses"] = pd.to_numeric(df["losses"], errors="coerce").fillna(0).astype(int)
 
-    archetypes = sorted(df['deck_archetype'].dropna().unique().tolist())
+    # dictionary-encode players, archetypes, cards and zones once; the per-archetype
+    # tables run on int32 codes and only the output is turned back into strings
+    vocab = EventVocabulary.load(vocab_path(event_path))
+    df = vocab.encode_frame(df)
+    vocab.save(vocab_path(event_path))
+    # pilots x (card, zone) copy matrix, built once per event and cached as card_matrix.npz
+    matrix = load_card_matrix(event_path, df, decklists_csv, vocab)
+
+    archetypes = sorted(vocab.archetypes.decode(np.unique(matrix.archetypes)).tolist())
     print(f"Found {len(archetypes)} unique archetypes in decklists")
 
     written_files: List[Path] = []
@@ -500,6 +569,8 @@ def create_all_card_winrates(min_pilots: int = 0, max_copies_cap: Optional[int]
                 loc=None,
                 min_pilots=min_pilots,
                 max_copies_cap=max_copies_cap,
+                vocab=vocab,
+                matrix=matrix,
             )
         except Exception as e:
             print(f"Error computing card winrates for {archetype}: {e}")
@@ -17,6 +17,7 @@ import os
 import sys
 from pathlib import Path
 import pandas as pd
+from utils.artifacts import artifact_exists, load_decklists
 
 
 def main() -> int:
@@ -34,15 +35,15 @@ def main() -> int:
     decklists_path = event_dir / f"{event_name} decklists.csv"
     output_path = event_dir / f"{event_name} metagame breakdown.csv"
 
-    if not decklists_path.exists():
+    if not artifact_exists(decklists_path):
         print(f"ERROR: Decklists file not found: {decklists_path}", file=sys.stderr)
         return 1
 
     print(f"Loading decklists from: {decklists_path}")
-    df = pd.read_csv(decklists_path)
+    df = load_decklists(decklists_path, columns=["player", "deck_archetype"])
 
     # Count unique players per deck archetype
-    metagame = df.groupby('deck_archetype', as_index=False).agg(
+    metagame = df.groupby('deck_archetype', as_index=False, observed=True).agg(
         Pilots=('player', 'nunique')
     ).sort_values('Pilots', ascending=False)
 
@@ -7,6 +7,8 @@ import os
 import pandas as pd
 from pathlib import Path
 
+from utils import event_db
+
 def create_win_matrix(top_n=15):
     # Get the event directory from environment
     event_data_dir = os.getenv('EVENT_DATA_DIR')
@@ -14,22 +16,14 @@ def create_win_matrix(top_n=15):
     if not event_data_dir:
         raise ValueError("EVENT_DATA_DIR environment variable not set")
     
-    # Setup directories
-    matchups_dir = Path(event_data_dir) / 'matchups'
-    
-    if not matchups_dir.exists():
-        raise ValueError(f"Matchups directory not found: {matchups_dir}")
-    
-    # First, determine the top N archetypes by total matches
-    archetype_totals = []
-    for matchup_file in matchups_dir.glob('*matchups.csv'):
-        archetype = matchup_file.stem.replace(' matchups', '')
-        df = pd.read_csv(matchup_file)
-        total_matches = df['Total_Matches'].sum()
-        archetype_totals.append({'Archetype': archetype, 'Total_Matches': total_matches})
-    
-    totals_df = pd.DataFrame(archetype_totals).sort_values('Total_Matches', ascending=False)
-    top_archetypes = totals_df.head(top_n)['Archetype'].tolist()
+    conn = event_db.connect(event_data_dir)
+    try:
+        # First, determine the top N archetypes by total matches
+        totals_df = event_db.archetype_totals(conn).sort_values('Total_Matches', ascending=False, kind='stable')
+        top_archetypes = totals_df.head(top_n)['Archetype'].tolist()
+        matchups = event_db.matchups_between(conn, top_archetypes)
+    finally:
+        conn.close()
     
     print(f"Top {top_n} archetypes by total matches:")
     for i, row in totals_df.head(top_n).iterrows():
@@ -38,12 +32,13 @@ def create_win_matrix(top_n=15):
     
     # Build the win matrix
     # Matrix will show: row archetype's wins against column archetype
+    records = {
+        (m.Archetype, m.Opponent_Archetype): f"{m.Wins}-{m.Losses}-{m.Draws}"
+        for m in matchups.itertuples(index=False)
+    }
     matrix_data = {}
     
     for archetype in top_archetypes:
-        matchup_file = matchups_dir / f'{archetype} matchups.csv'
-        df = pd.read_csv(matchup_file)
-        
         # Create a row for this archetype
         row = {}
         for opponent in top_archetypes:
@@ -51,16 +46,8 @@ def create_win_matrix(top_n=15):
                 # Mirror matches are excluded, so put a dash
                 row[opponent] = '-'
             else:
-                # Find the matchup data
-                matchup = df[df['Opponent_Archetype'] == opponent]
-                if len(matchup) > 0:
-                    wins = matchup['Wins'].values[0]
-                    losses = matchup['Losses'].values[0]
-                    draws = matchup['Draws'].values[0]
-                    # Format as "W-L-D"
-                    row[opponent] = f"{wins}-{losses}-{draws}"
-                else:
-                    row[opponent] = "0-0-0"
+                # Format as "W-L-D"
+                row[opponent] = records.get((archetype, opponent), "0-0-0")
         
         matrix_data[archetype] = row
     
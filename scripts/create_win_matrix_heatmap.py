@@ -10,6 +10,8 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
 
+from utils import event_db
+
 
 HEATMAP_STYLES = {
     # Softer default palette and text settings for easier readability.
@@ -104,22 +106,14 @@ def create_win_matrix_heatmap(top_n=15, show=False, style_name='soft'):
     if not event_data_dir:
         raise ValueError("EVENT_DATA_DIR environment variable not set")
     
-    # Setup directories
-    matchups_dir = Path(event_data_dir) / 'matchups'
-    
-    if not matchups_dir.exists():
-        raise ValueError(f"Matchups directory not found: {matchups_dir}")
-    
-    # First, determine the top N archetypes by total matches
-    archetype_totals = []
-    for matchup_file in matchups_dir.glob('*matchups.csv'):
-        archetype = matchup_file.stem.replace(' matchups', '')
-        df = pd.read_csv(matchup_file)
-        total_matches = df['Total_Matches'].sum()
-        archetype_totals.append({'Archetype': archetype, 'Total_Matches': total_matches})
-    
-    totals_df = pd.DataFrame(archetype_totals).sort_values('Total_Matches', ascending=False)
-    top_archetypes = totals_df.head(top_n)['Archetype'].tolist()
+    conn = event_db.connect(event_data_dir)
+    try:
+        # First, determine the top N archetypes by total matches
+        totals_df = event_db.archetype_totals(conn).sort_values('Total_Matches', ascending=False, kind='stable')
+        top_archetypes = totals_df.head(top_n)['Archetype'].tolist()
+        matchups = event_db.matchups_between(conn, top_archetypes)
+    finally:
+        conn.close()
     
     style_key, style = _resolve_style(style_name)
     cmap_override = os.getenv('HEATMAP_CMAP', '').strip()
@@ -132,33 +126,29 @@ def create_win_matrix_heatmap(top_n=15, show=False, style_name='soft'):
             print(f"Unknown HEATMAP_CMAP '{cmap_override}', using style colormap '{style['cmap']}'.")
     print(f"Creating heatmap for top {top_n} archetypes (style='{style_key}', cmap='{cmap_to_use}')...")
     
-    # Get overall winrates for each archetype
+    # Get overall winrates for each archetype (against every opponent, not only the top N)
     overall_winrates = {}
     overall_stats = {}
-    for archetype in top_archetypes:
-        matchup_file = matchups_dir / f'{archetype} matchups.csv'
-        df = pd.read_csv(matchup_file)
-        total_wins = df['Wins'].sum()
-        total_losses = df['Losses'].sum()
-        total_draws = df['Draws'].sum()
-        total_matches = total_wins + total_losses + total_draws
-        winrate = (total_wins / total_matches * 100) if total_matches > 0 else 0
-        overall_winrates[archetype] = winrate
-        overall_stats[archetype] = {
-            'wins': int(total_wins),
-            'losses': int(total_losses),
-            'draws': int(total_draws),
+    for row in totals_df.head(top_n).itertuples(index=False):
+        total_matches = row.Wins + row.Losses + row.Draws
+        winrate = (row.Wins / total_matches * 100) if total_matches > 0 else 0
+        overall_winrates[row.Archetype] = winrate
+        overall_stats[row.Archetype] = {
+            'wins': int(row.Wins),
+            'losses': int(row.Losses),
+            'draws': int(row.Draws),
             'winrate': winrate
         }
     
     # Build the win matrix with annotations and numeric winrates
+    records = {
+        (m.Archetype, m.Opponent_Archetype): (int(m.Wins), int(m.Losses), int(m.Draws))
+        for m in matchups.itertuples(index=False)
+    }
     winrate_matrix = []
     annotation_matrix = []
     
     for archetype in top_archetypes:
-        matchup_file = matchups_dir / f'{archetype} matchups.csv'
-        df = pd.read_csv(matchup_file)
-        
         winrate_row = []
         annotation_row = []
         
@@ -173,22 +163,17 @@ def create_win_matrix_heatmap(top_n=15, show=False, style_name='soft'):
                 # Mirror matches - set to NaN for visual distinction
                 winrate_row.append(np.nan)
                 annotation_row.append('-')
+            elif (archetype, opponent) in records:
+                wins, losses, draws = records[(archetype, opponent)]
+                total = wins + losses + draws
+                winrate = (wins / total * 100) if total > 0 else 0
+                
+                # Create annotation: "W-L-D (WR%)"
+                annotation_row.append(f"{wins}-{losses}-{draws}\n({winrate:.1f}%)")
+                winrate_row.append(winrate)
             else:
-                # Find the matchup data
-                matchup = df[df['Opponent_Archetype'] == opponent]
-                if len(matchup) > 0:
-                    wins = int(matchup['Wins'].values[0])
-                    losses = int(matchup['Losses'].values[0])
-                    draws = int(matchup['Draws'].values[0])
-                    total = wins + losses + draws
-                    winrate = (wins / total * 100) if total > 0 else 0
-                    
-                    # Create annotation: "W-L-D (WR%)"
-                    annotation_row.append(f"{wins}-{losses}-{draws}\n({winrate:.1f}%)")
-                    winrate_row.append(winrate)
-                else:
-                    annotation_row.append("0-0-0\n(0.0%)")
-                    winrate_row.append(0)
+                annotation_row.append("0-0-0\n(0.0%)")
+                winrate_row.append(0)
         
         winrate_matrix.append(winrate_row)
         annotation_matrix.append(annotation_row)
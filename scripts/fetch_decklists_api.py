@@ -6,21 +6,107 @@ Fetches a deck view page, extracts cards and the player name, and optionally
 saves the results in a combined CSV file.
 """
 
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 from pathlib import Path
 import os
-import ast
+import importlib.util
 import requests
 import re
-import csv
-from bs4 import BeautifulSoup
-import csv as _csv
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from bs4 import BeautifulSoup, SoupStrainer
+
+from utils.decklist_archive import DecklistArchive, read_archived_html
+from utils.decklist_journal import EMPTY_STATUS, OFFLINE_STATUS, DecklistJournal
+from utils.decklist_store import DecklistStore, store_from_env
+from utils.fetch_metrics import FetchMetrics, emit_run_metrics
+from utils.http_cache import OfflineCacheMiss
+from utils.http_client import MeleeClient, TokenBucket, get_client, melee_url
+from utils.names import normalize_player_name
 
 # Name suffixes to preserve (used in future normalization helpers)
 NAME_SUFFIXES = {"jr", "jr.", "sr", "sr.", "ii", "iii", "iv", "v"}
 import time
 from datetime import datetime, timezone
 
+SIDE_PATTERN = re.compile(r"side(board)?|sideboard", flags=re.I)
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+# containers the structured parser and player heuristics look inside
+DECKLIST_CLASSES = {
+    "decklist-category",
+    "decklist-record",
+    "decklist-title",
+    "decklist-header",
+    "decklist-info",
+    "decklist-owner",
+    "decklist-author",
+}
+# lxml is optional; it only speeds up the strained fast path
+FAST_HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+
+def _class_tokens(value: Any) -> List[str]:
+    if not value:
+        return []
+    return value.split() if isinstance(value, str) else list(value)
+
+
+def _keep_decklist_tag(name: str, attrs: Optional[Dict[str, Any]]) -> bool:
+    """Strainer rule: keep every tag the structured parser or player lookup can use."""
+    attrs = attrs or {}
+    if name == "meta" or name in HEADING_TAGS:
+        return True
+    if name == "a" and "/Profile" in str(attrs.get("href") or ""):
+        return True
+    tokens = _class_tokens(attrs.get("class"))
+    if DECKLIST_CLASSES.intersection(tokens):
+        return True
+    # side/sideboard containers decide the zone of the records inside them
+    return any(SIDE_PATTERN.search(v) for v in tokens + [str(attrs.get("id") or "")] if v)
+
+
+try:
+    from bs4.filter import ElementFilter  # beautifulsoup4 >= 4.13
+
+    class _DecklistFilter(ElementFilter):
+        def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+            return _keep_decklist_tag(name, attrs)
+
+        def allow_string_creation(self, string) -> bool:
+            return False
+
+    def decklist_strainer() -> Any:
+        return _DecklistFilter()
+
+except ImportError:  # older beautifulsoup4 calls a callable name with (name, attrs)
+
+    def decklist_strainer() -> Any:
+        return SoupStrainer(lambda name, attrs=None: _keep_decklist_tag(name, attrs))
+
+
+def _is_heading_or_record(tag) -> bool:
+    return tag.name in HEADING_TAGS or "decklist-record" in (tag.get("class") or [])
+
+
+def _has_side_ancestor(el, cache: Dict[int, bool]) -> bool:
+    """True if `el` or any ancestor has a side/sideboard class or id (memoized per element)."""
+    chain = []
+    cur = el
+    result = False
+    while cur is not None and getattr(cur, 'name', None) is not None:
+        if id(cur) in cache:
+            result = cache[id(cur)]
+            break
+        chain.append(cur)
+        attrs = getattr(cur, 'attrs', {}) or {}
+        values = list(attrs.get('class', [])) + ([attrs.get('id')] if attrs.get('id') else [])
+        if any(v and SIDE_PATTERN.search(str(v)) for v in values):
+            result = True
+            break
+        cur = cur.parent
+    for node in chain:
+        cache[id(node)] = result
+    return result
+
 
 def _parse_match_record(match_record):
     if match_record is None:
@@ -53,24 +139,28 @@ def _coerce_record_value(value):
 
 
 def build_standings_lookup_from_path(path: Path) -> Dict[str, Dict[str, Any]]:
-    if not path or not path.exists():
+    if not path:
+        return {}
+
+    from utils.artifacts import artifact_exists, read_artifact
+    if not artifact_exists(path):
         return {}
 
     try:
         import pandas as pd
-        standings_df = pd.read_csv(path, encoding="utf-8-sig")
+        from utils.api_utils import standings_extract_deck_info
+        standings_df = read_artifact(path, "standings_summary", encoding="utf-8-sig")
     except Exception as exc:
         print(f"Warning: Failed to load standings data from {path}: {exc}")
         return {}
 
-    scraper = DecklistScraper()
     standings_lookup: Dict[str, Dict[str, Any]] = {}
     for _, row in standings_df.iterrows():
         player_name_raw = str(row.get("PlayerName", "")).strip()
         if not player_name_raw:
             continue
 
-        player_name = scraper.normalize_player_name(player_name_raw)
+        player_name = normalize_player_name(player_name_raw)
         if not player_name:
             continue
 
@@ -84,22 +174,25 @@ def build_standings_lookup_from_path(path: Path) -> Dict[str, Dict[str, Any]]:
             losses = _coerce_record_value(parsed.get("losses", ""))
             draws = _coerce_record_value(parsed.get("draws", ""))
 
-        deck_archetype = str(row.get("deck_archetype", "") or "").strip()
-        decklists_data = str(row.get("Decklists", ""))
-        if not deck_archetype and decklists_data and decklists_data != "nan":
-            try:
-                decklist_list = ast.literal_eval(decklists_data)
-                if isinstance(decklist_list, list) and len(decklist_list) > 0:
-                    deck_archetype = decklist_list[0].get("DecklistName", "").strip()
-            except (ValueError, SyntaxError, AttributeError):
-                pass
+        deck_archetype = row.get("deck_archetype")
+        deck_archetype = str(deck_archetype).strip() if pd.notna(deck_archetype) else ""
+        if not deck_archetype and pd.notna(row.get("Decklists")):
+            # round files from older runs still carry the raw Decklists payload
+            _, deck_archetype = standings_extract_deck_info(row.get("Decklists"))
 
-        standings_lookup[player_name] = {
+        player_id = row.get("player_id", row.get("PlayerId"))
+        entry = {
             "wins": wins,
             "losses": losses,
             "draws": draws,
             "deck_archetype": deck_archetype,
+            "player_id": int(player_id) if pd.notna(player_id) else "",
         }
+        standings_lookup[player_name] = entry
+        # decks are joined on their GUID when the standings carry one; the name key is the fallback
+        guid = str(row.get("decklist_guid", "") or "").strip()
+        if guid and guid != "nan":
+            standings_lookup[guid] = entry
 
     return standings_lookup
 
@@ -114,29 +207,91 @@ class DecklistScraper:
     - extract_player_from_soup(soup) -> player display name or ""
     - extract_cards_and_player(payload, guid) -> rows for CSV
     - process_guids(guids, save_csv) -> list rows and optional CSV file
+
+    Pass a DecklistStore to reuse decks parsed in earlier runs or other events,
+    and a DecklistArchive to keep raw pages and parse them in a separate stage.
     """
 
-    def __init__(self, session: Optional[requests.Session] = None, view_url_template: str = "https://melee.gg/Decklist/View/{}"):
-        self.session = session or requests.Session()
-        self.view_url_template = view_url_template
+    def __init__(
+        self,
+        session: Optional[Union[requests.Session, MeleeClient]] = None,
+        view_url_template: Optional[str] = None,
+        store: Optional[DecklistStore] = None,
+        archive: Optional[DecklistArchive] = None,
+    ):
+        # default to the shared pooled client so decklist pages reuse the same connections
+        self.session = session or get_client()
+        self.view_url_template = view_url_template or melee_url("/Decklist/View/{}")
+        # parsed decks shared across runs and events; consulted before the network
+        self.store = store
+        # raw pages kept compressed per event so parsing can be redone offline
+        self.archive = archive
+        # parse time is reported next to the client's per-endpoint fetch metrics
+        self.metrics = getattr(self.session, "metrics", None) or FetchMetrics()
 
     def build_view_url(self, guid: str) -> str:
         return self.view_url_template.format(guid)
 
-    def fetch_into_memory(self, url: str, timeout: int = 20) -> Dict[str, Any]:
+    def fetch_html(self, url: str, timeout: int = 20, limiter: Optional[TokenBucket] = None, refresh: bool = False) -> Dict[str, Any]:
+        """Download a deck page without parsing it.
+
+        `limiter` is handed to MeleeClient, which paces only real network
+        requests: cached pages are returned without spending a token. Plain
+        sessions have no cache and take a token per request. `refresh`
+        bypasses MeleeClient's response cache.
+        """
+        kwargs: Dict[str, Any] = {}
+        if isinstance(self.session, MeleeClient):
+            kwargs["limiter"] = limiter
+            if refresh:
+                kwargs["cache_ttl"] = None
+        elif limiter is not None:
+            limiter.acquire()
         try:
-            r = self.session.get(url, timeout=timeout)
+            r = self.session.get(url, timeout=timeout, **kwargs)
         except Exception as e:
-            return {"status_code": None, "html": "", "soup": None, "error": e}
+            return {"status_code": None, "html": "", "error": e}
+        return {"status_code": r.status_code, "html": r.text}
+
+    @staticmethod
+    def build_payload(html: str, status_code: Any = 200) -> Dict[str, Any]:
         try:
-            soup = BeautifulSoup(r.text, "html.parser")
+            soup = BeautifulSoup(html, "html.parser")
         except Exception:
             soup = None
-        return {"status_code": r.status_code, "html": r.text, "soup": soup}
+        return {"status_code": status_code, "html": html, "soup": soup}
+
+    def fetch_into_memory(self, url: str, timeout: int = 20) -> Dict[str, Any]:
+        page = self.fetch_html(url, timeout=timeout)
+        if page.get("status_code") is None:
+            return {**page, "soup": None}
+        return self.build_payload(page["html"], page["status_code"])
+
+    def parse_html(self, html: str, guid: str) -> List[Dict[str, Any]]:
+        """Parse a deck page into card rows, trying the strained fast path first.
 
-    def parse_cards_from_soup(self, soup: Optional[BeautifulSoup]) -> List[Dict[str, Any]]:
+        The fast path only builds the decklist records, headings, side/sideboard
+        containers, profile links and meta tags (with lxml when installed); pages
+        without structured records fall back to the full html.parser document.
+        """
+        soup = None
+        if "decklist-record" in html:
+            try:
+                soup = BeautifulSoup(html, FAST_HTML_PARSER, parse_only=decklist_strainer())
+            except Exception:
+                soup = None
+        if soup is not None:
+            cards = self.parse_cards_from_soup(soup, structured_only=True)
+            if cards:
+                return self._card_rows(soup, cards, guid)
+        return self.extract_cards_and_player(self.build_payload(html), guid)
+
+    def parse_cards_from_soup(self, soup: Optional[BeautifulSoup], structured_only: bool = False) -> List[Dict[str, Any]]:
         """Extract cards using heuristics (structured -> UL/LI -> text fallback).
 
+        With `structured_only`, stop after the .decklist-category/.decklist-record
+        passes (used on the strained fast-path soup, which lacks the rest of the page).
+
         Returns a list of unique card dicts with combined quantities.
         """
         if soup is None:
@@ -153,42 +308,17 @@ class DecklistScraper:
                 return {"card_name": m2.group(1).strip(), "qty": int(m2.group(2)), "zone": zone}
             return {"card_name": s, "qty": 1, "zone": zone}
 
-        def detect_zone_from_element(el) -> str:
-            """Detect whether an element is part of the 'side' or 'main' section.
-
-            Heuristics:
-            - If an ancestor's class or id contains 'side' or 'sideboard' -> 'side'
-            - If a nearby heading (previous h1..h6) contains 'side' -> 'side'
-            - Otherwise 'main'
-            """
-            # ancestor class/id check
-            cur = el
-            while cur is not None and getattr(cur, 'name', None) is not None:
-                attrs = getattr(cur, 'attrs', {}) or {}
-                for v in list(attrs.get('class', [])) + ([attrs.get('id')] if attrs.get('id') else []):
-                    if not v:
-                        continue
-                    if re.search(r"side(board)?|sideboard", str(v), flags=re.I):
-                        return "side"
-                cur = cur.parent
-            # previous heading check
-            for level in range(1, 7):
-                prev_h = el.find_previous(f"h{level}")
-                if prev_h and re.search(r"side(board)?|sideboard", prev_h.get_text(), flags=re.I):
-                    return "side"
-            return "main"
-
         cards: List[Dict[str, Any]] = []
 
         # 1) If the page groups cards into categories, honor those zones
-        cats = soup.select(".decklist-category")
+        cats = soup.find_all(class_="decklist-category")
         if cats:
             for cat in cats:
-                title_el = cat.select_one(".decklist-category-title")
+                title_el = cat.find(class_="decklist-category-title")
                 zone = "side" if (title_el and re.search(r"side(board)?", title_el.get_text(), flags=re.I)) else "main"
-                for rec in cat.select(".decklist-record"):
-                    name_el = rec.select_one(".decklist-record-name")
-                    qty_el = rec.select_one(".decklist-record-quantity")
+                for rec in cat.find_all(class_="decklist-record"):
+                    name_el = rec.find(class_="decklist-record-name")
+                    qty_el = rec.find(class_="decklist-record-quantity")
                     if name_el:
                         name = name_el.get_text(strip=True)
                         qty = 1
@@ -199,11 +329,17 @@ class DecklistScraper:
                                 qty = 1
                         cards.append({"card_name": name, "qty": qty, "zone": zone})
 
-        # 2) structured .decklist-record blocks (not grouped) with zone detection
+        # 2) structured .decklist-record blocks (not grouped) with zone detection:
+        # a record is 'side' if it or an ancestor has a side/sideboard class or id,
+        # or if the nearest preceding heading of any level h1..h6 mentions side.
+        # Records and headings are visited once in document order, tracking the
+        # latest heading per level and memoizing the ancestor check.
         if not cards:
-            for rec in soup.select(".decklist-record"):
-                name_el = rec.select_one(".decklist-record-name")
-                qty_el = rec.select_one(".decklist-record-quantity")
+            side_by_level: Dict[str, bool] = {}
+            side_cache: Dict[int, bool] = {}
+            for el in soup.find_all(_is_heading_or_record):
+                name_el = el.find(class_="decklist-record-name") if "decklist-record" in (el.get("class") or []) else None
+                qty_el = el.find(class_="decklist-record-quantity") if name_el else None
                 if name_el:
                     name = name_el.get_text(strip=True)
                     qty = 1
@@ -212,11 +348,13 @@ class DecklistScraper:
                             qty = int(qty_el.get_text(strip=True))
                         except Exception:
                             qty = 1
-                    zone = detect_zone_from_element(rec)
-                    cards.append({"card_name": name, "qty": qty, "zone": zone})
+                    side = _has_side_ancestor(el, side_cache) or any(side_by_level.values())
+                    cards.append({"card_name": name, "qty": qty, "zone": "side" if side else "main"})
+                if el.name in HEADING_TAGS:
+                    side_by_level[el.name] = bool(SIDE_PATTERN.search(el.get_text()))
 
         # 3) UL/LI lists (use nearby heading text to guess sideboard)
-        if not cards:
+        if not cards and not structured_only:
             for ul in soup.find_all("ul"):
                 prev_h = None
                 for level in range(1, 7):
@@ -230,7 +368,7 @@ class DecklistScraper:
                         cards.append(parsed)
 
         # 4) text fallback: scan lines and switch to side when 'sideboard' appears
-        if not cards:
+        if not cards and not structured_only:
             text = soup.get_text("\n", strip=True)
             zone = "main"
             for ln in text.splitlines():
@@ -306,9 +444,11 @@ class DecklistScraper:
 
     def extract_cards_and_player(self, payload: Dict[str, Any], guid: str) -> List[Dict[str, Any]]:
         soup = payload.get("soup")
+        return self._card_rows(soup, self.parse_cards_from_soup(soup), guid)
+
+    def _card_rows(self, soup: Optional[BeautifulSoup], cards: List[Dict[str, Any]], guid: str) -> List[Dict[str, Any]]:
         player = self.extract_player_from_soup(soup)
         player = self.normalize_player_name(player)
-        cards = self.parse_cards_from_soup(soup)
         rows: List[Dict[str, Any]] = []
         for c in cards:
             rows.append({
@@ -321,87 +461,118 @@ class DecklistScraper:
         return rows
 
     def normalize_player_name(self, raw: str) -> str:
-        """Normalize player display names into 'First Last' with suffix handling.
+        """Normalize player display names into 'First Last' (see utils.names.normalize_player_name)."""
+        return normalize_player_name(raw)
 
-        Examples:
-        - 'Hulstine, liam' -> 'Liam Hulstine'
-        - 'Smith, John Jr.' -> 'John Smith Jr.'
-        - 'John Smith' -> 'John Smith'
-        Returns empty string if raw is falsy.
+    def fetch_raw(self, guid: str, limiter: Optional[TokenBucket] = None, refresh: bool = False) -> Tuple[Any, Optional[str]]:
+        """Return (status_code, html) for one deck page; html is None unless 200.
+
+        Pages already in the archive are read back without a request, and new
+        pages are archived before they are parsed. `refresh` skips the archive
+        and the HTTP cache (to refetch a page that parsed to no cards). A cache
+        miss in offline mode is reported as OFFLINE_STATUS.
         """
-        if not raw:
-            return ""
-        s = raw.strip()
-        # canonical suffix formatting
-        SUFFIX_MAP = {
-            "jr": "Jr.",
-            "jr.": "Jr.",
-            "sr": "Sr.",
-            "sr.": "Sr.",
-            "ii": "II",
-            "iii": "III",
-            "iv": "IV",
-            "v": "V",
-        }
+        if self.archive is not None and not refresh:
+            html = self.archive.get(guid)
+            if html is not None:
+                return 200, html
+        page = self.fetch_html(self.build_view_url(guid), limiter=limiter, refresh=refresh)
+        if isinstance(page.get("error"), OfflineCacheMiss):
+            print(f"Warning: {guid} is not cached (offline)")
+            return OFFLINE_STATUS, None
+        status = page.get("status_code")
+        if status != 200:
+            print(f"Warning: {guid} returned {status}")
+            return status, None
+        if self.archive is not None:
+            self.archive.put(guid, page["html"])
+        return status, page["html"]
+
+    def fetch_card_rows(
+        self, guid: str, limiter: Optional[TokenBucket] = None, refresh: bool = False
+    ) -> Tuple[Any, Optional[List[Dict[str, Any]]]]:
+        """Fetch and parse one deck GUID; returns (status_code, rows), rows None unless 200.
+
+        Decks already in the store are returned without a request (unless
+        `refresh`, see fetch_raw).
+        """
+        if self.store is not None and not refresh:
+            stored = self.store.get(guid)
+            if stored is not None:
+                return 200, stored
+        status, html = self.fetch_raw(guid, limiter, refresh)
+        if html is None:
+            return status, None
+        with self.metrics.stage("decklist_parse"):
+            card_rows = self.parse_html(html, guid)
+        if self.store is not None:
+            self.store.put(guid, card_rows)
+        return status, card_rows
+
+    def parse_archived(self, guids: List[str], max_workers: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Parse archived pages of `guids` across a process pool (inline when max_workers <= 1).
+
+        Workers read their pages straight from the archive by offset, so only
+        the GUID and location cross the process boundary. GUIDs missing from
+        the archive are left out of the result.
+        """
+        if self.archive is None:
+            return {}
+        tasks = []
+        for guid in guids:
+            loc = self.archive.locate(guid)
+            if loc is not None:
+                tasks.append((guid, str(self.archive.blob_path), loc[0], loc[1]))
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        with self.metrics.stage("decklist_parse"):
+            if max_workers <= 1 or len(tasks) <= 1:
+                parsed = [self.parse_html(read_archived_html(path, off, n), guid) for guid, path, off, n in tasks]
+            else:
+                chunksize = max(1, len(tasks) // (max_workers * 4))
+                with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                    parsed = list(pool.map(_parse_archived_page, tasks, chunksize=chunksize))
+        return {task[0]: card_rows for task, card_rows in zip(tasks, parsed)}
 
-        # If format is 'Last, First [Suffix]' OR 'Last Suffix, First'
-        if "," in s:
-            parts = [p.strip() for p in s.split(",") if p.strip()]
-            if len(parts) >= 2:
-                last_part = parts[0]
-                rest_parts = parts[1:]
-
-                # check for suffix on the last part (e.g., 'Leal Jr.')
-                last_tokens = last_part.split()
-                suffix = ""
-                if last_tokens and last_tokens[-1].rstrip('.').lower() in SUFFIX_MAP:
-                    suffix = SUFFIX_MAP[last_tokens[-1].rstrip('.').lower()]
-                    last_name = " ".join(last_tokens[:-1]) or last_tokens[0]
-                else:
-                    last_name = last_part
-
-                # Build rest tokens while allowing a standalone suffix part (e.g., 'Leal, Jr., Noe')
-                rest_tokens: List[str] = []
-                for part in rest_parts:
-                    t = part.strip()
-                    if not t:
-                        continue
-                    if t.rstrip('.').lower() in SUFFIX_MAP:
-                        suffix = SUFFIX_MAP[t.rstrip('.').lower()]
-                        continue
-                    rest_tokens.extend(t.split())
-
-                # final check: trailing suffix token in rest_tokens (e.g., 'John Jr.')
-                if rest_tokens and rest_tokens[-1].rstrip('.').lower() in SUFFIX_MAP:
-                    suffix = SUFFIX_MAP[rest_tokens[-1].rstrip('.').lower()]
-                    rest_tokens = rest_tokens[:-1]
-
-                first_and_middle = " ".join(rest_tokens)
-                name = (first_and_middle + " " + last_name).strip()
-                if suffix:
-                    name = f"{name} {suffix}"
-                # Title-case each word (simple heuristic)
-                return " ".join([w.capitalize() for w in name.split()])
-
-        # No comma: assume 'First Last' or similar. Normalize whitespace and capitalization
-        tokens = s.split()
-        if not tokens:
-            return ""
-        # handle trailing suffix token
-        suffix = ""
-        if tokens and tokens[-1].rstrip('.').lower() in SUFFIX_MAP:
-            suffix = SUFFIX_MAP[tokens[-1].rstrip('.').lower()]
-            tokens = tokens[:-1]
-        name = " ".join(tokens)
-        if suffix:
-            name = f"{name} {suffix}"
-        return " ".join([w.capitalize() for w in name.split()])
+    @staticmethod
+    def enrich_rows(card_rows: List[Dict[str, Any]], standings_lookup: Optional[Dict[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Add the player's wins/losses/draws/deck_archetype/player_id from the standings lookup.
+
+        Rows are matched on their deck GUID, falling back to the player name
+        for standings files without GUIDs.
+        """
+        if standings_lookup and card_rows:
+            player_data = standings_lookup.get(card_rows[0].get("deck_guid", "")) or standings_lookup.get(card_rows[0].get("player", ""), {})
+            for row in card_rows:
+                row["player_id"] = player_data.get("player_id", "")
+                row["wins"] = player_data.get("wins", "")
+                row["losses"] = player_data.get("losses", "")
+                row["draws"] = player_data.get("draws", "")
+                row["deck_archetype"] = player_data.get("deck_archetype", "")
+        return card_rows
+
+    def fetch_guid_rows(
+        self,
+        guid: str,
+        standings_lookup: Optional[Dict[str, Dict[str, Any]]] = None,
+        limiter: Optional[TokenBucket] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Fetch and parse one deck GUID; returns None when the page did not return 200."""
+        _, card_rows = self.fetch_card_rows(guid, limiter)
+        if card_rows is None:
+            return None
+        return self.enrich_rows(card_rows, standings_lookup)
 
     def process_guids(
         self,
         guids: List[str],
         save_csv: Optional[Path] = None,
-        standings_lookup: Optional[Dict[str, Dict[str, Any]]] = None
+        standings_lookup: Optional[Dict[str, Dict[str, Any]]] = None,
+        max_workers: int = 1,
+        requests_per_second: Optional[float] = None,
+        journal: Optional[DecklistJournal] = None,
+        parse_workers: Optional[int] = None,
+        reparse: bool = False,
     ) -> List[Dict[str, Any]]:
         """Process deck GUIDs and optionally enrich with standings data.
         
@@ -409,80 +580,152 @@ class DecklistScraper:
             guids: List of deck GUIDs to fetch
             save_csv: Optional path to save combined CSV
             standings_lookup: Optional dict mapping player_name -> {wins, losses, draws, deck_archetype}
+            max_workers: Max decklist requests in flight at once (1 = sequential)
+            requests_per_second: Optional global ceiling on request starts across all workers
+            journal: Optional DecklistJournal; GUIDs already journaled are not
+                refetched and failed ones are retried with exponential backoff
+                until they succeed or use up the journal's attempt budget. A
+                page without cards counts as a failure and is refetched past
+                the caches; an offline cache miss is not retried
+            parse_workers: Processes for the parse stage when an archive is
+                set (default: all cores; 1 parses inline)
+            reparse: With an archive, parse every archived GUID again instead
+                of reusing the store or journal (after a parser change)
+
+        With an archive, fetching only downloads raw pages into it and parsing
+        runs afterwards as a separate stage across a process pool.
+
+        Output rows keep the order of `guids` regardless of completion order.
         """
+        limiter = TokenBucket(requests_per_second) if requests_per_second else None
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        to_parse: List[str] = []
+
+        def finish(guid: str, status: Any, card_rows: Optional[List[Dict[str, Any]]]) -> None:
+            if not card_rows:
+                if journal is not None:
+                    journal.record_failure(guid, status if card_rows is None else EMPTY_STATUS)
+                return
+            results[guid] = card_rows
+            if journal is not None:
+                journal.record_success(guid, card_rows)
+
+        def fetch_one(guid: str) -> None:
+            refresh = journal is not None and journal.last_status(guid) == EMPTY_STATUS
+            if self.archive is None:
+                finish(guid, *self.fetch_card_rows(guid, limiter, refresh))
+                return
+            stored = self.store.get(guid) if self.store is not None and not (reparse or refresh) else None
+            if stored is not None:
+                finish(guid, 200, stored)
+                return
+            status, html = self.fetch_raw(guid, limiter, refresh)
+            if html is None:
+                finish(guid, status, None)
+            else:
+                to_parse.append(guid)
+
+        def run(batch: List[str]) -> None:
+            if max_workers <= 1:
+                for guid in batch:
+                    fetch_one(guid)
+            else:
+                with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                    list(pool.map(fetch_one, batch))
+            if to_parse:
+                parsed = self.parse_archived(list(to_parse), max_workers=parse_workers)
+                to_parse.clear()
+                for guid, card_rows in parsed.items():
+                    if self.store is not None:
+                        self.store.put(guid, card_rows)
+                    finish(guid, 200, card_rows)
+
+        todo = journal.pending(guids) if journal is not None and not reparse else list(guids)
+        if journal is not None and len(todo) < len(guids):
+            print(f"Resuming decklists: {len(guids) - len(todo)} already journaled or given up, fetching {len(todo)}.")
+        run(todo)
+
+        # retry queue: wait out the backoff of the earliest failure, then retry whatever is due
+        while journal is not None:
+            retry = journal.pending(todo)
+            if not retry:
+                break
+            wait = (journal.next_retry_at(retry) or 0) - time.time()
+            if wait > 0:
+                print(f"Retrying {len(retry)} failed decklists in {wait:.1f}s...")
+                time.sleep(wait)
+            run(journal.due(retry))
+
         rows: List[Dict[str, Any]] = []
         for guid in guids:
-            url = self.build_view_url(guid)
-            payload = self.fetch_into_memory(url)
-            if payload.get("status_code") != 200:
-                print(f"Warning: {guid} returned {payload.get('status_code')}")
-                continue
-            card_rows = self.extract_cards_and_player(payload, guid)
-            
-            # Enrich with standings data if available
-            if standings_lookup and card_rows:
-                player_name = card_rows[0].get("player", "")
-                player_data = standings_lookup.get(player_name, {})
-                for row in card_rows:
-                    row["wins"] = player_data.get("wins", "")
-                    row["losses"] = player_data.get("losses", "")
-                    row["draws"] = player_data.get("draws", "")
-                    row["deck_archetype"] = player_data.get("deck_archetype", "")
-            
-            rows.extend(card_rows)
+            card_rows = results.get(guid)
+            if card_rows is None and journal is not None:
+                card_rows = journal.rows_for(guid)
+            if card_rows:
+                rows.extend(self.enrich_rows([dict(r) for r in card_rows], standings_lookup))
+
+        if journal is not None:
+            given_up = journal.exhausted(guids)
+            if given_up:
+                print(f"Warning: {len(given_up)} decklists were given up on and skipped (see {journal.retry_path}).")
 
         if save_csv:
-            save_csv.parent.mkdir(parents=True, exist_ok=True)
-            with save_csv.open("w", encoding="utf-8", newline="") as fh:
-                fieldnames = ["player", "wins", "losses", "draws", "deck_archetype", "card_name", "qty", "zone", "deck_guid"]
-                writer = csv.DictWriter(fh, fieldnames=fieldnames, quoting=csv.QUOTE_MINIMAL, extrasaction='ignore')
-                writer.writeheader()
-                if rows:
-                    for r in rows:
-                        writer.writerow(r)
-            print("Saved combined CSV to", save_csv)
+            import pandas as pd
+            from utils.artifacts import write_artifact
+
+            fieldnames = ["player", "wins", "losses", "draws", "deck_archetype", "card_name", "qty", "zone", "deck_guid", "player_id"]
+            written = write_artifact(pd.DataFrame(rows, columns=fieldnames), save_csv, "decklists", encoding="utf-8")
+            print("Saved combined decklists to", ", ".join(str(p) for p in written))
 
         return rows
 
 
+_PARSER: Optional[DecklistScraper] = None
+
+
+def _parse_archived_page(task: Tuple[str, str, int, int]) -> List[Dict[str, Any]]:
+    """Process-pool entry point: parse one archived page located by (guid, path, offset, length)."""
+    global _PARSER
+    if _PARSER is None:
+        # parsing needs no network; a bare session avoids building the shared client per worker
+        _PARSER = DecklistScraper(session=requests.Session())
+    guid, blob_path, offset, length = task
+    return _PARSER.parse_html(read_archived_html(blob_path, offset, length), guid)
+
+
 if __name__ == "__main__":
     sample_guid = ["1cb305cb-c81e-4dce-ac4c-b32d00de6bcd", "09edec86-bc44-4ff1-95a7-b378004ea00d", "6a7ede40-da0c-4643-aa07-b37901544f86", "1133c3a9-32bb-4a16-9458-b37800b7b095"]
 
+    from utils.artifacts import artifact_exists, find_artifacts, read_artifact
+
     def load_guids_from_standings(path: Path) -> List[str]:
-        """Read a standings CSV and extract the `decklist_guid` column.
+        """Read a standings artifact (CSV or its columnar copy) and extract the `decklist_guid` column.
 
         Returns a deduped list preserving first-seen order. Non-empty strings only.
         """
-        if not path.exists():
+        if not artifact_exists(path):
             return []
         guids: List[str] = []
         seen: Set[str] = set()
         try:
-            with path.open("r", encoding="utf-8-sig", newline="") as fh:
-                reader = _csv.DictReader(fh)
-                fieldnames = reader.fieldnames or []
-                lower_fields = [f.lower() for f in fieldnames]
-                if "decklist_guid" not in lower_fields:
-                    print(f"Warning: 'decklist_guid' column not found in {path}")
-                    return []
-                for row in reader:
-                    # handle case-insensitive header names
-                    val = ""
-                    for k, v in row.items():
-                        if k and k.lower() == "decklist_guid":
-                            val = (v or "").strip()
-                            break
-                    if not val:
-                        continue
-                    if val in seen:
-                        continue
-                    seen.add(val)
-                    guids.append(val)
+            df = read_artifact(path, "standings_summary", encoding="utf-8-sig")
+            # handle case-insensitive header names
+            column = next((c for c in df.columns if str(c).lower() == "decklist_guid"), None)
+            if column is None:
+                print(f"Warning: 'decklist_guid' column not found in {path}")
+                return []
+            for v in df[column].dropna():
+                val = str(v).strip()
+                if not val or val in seen:
+                    continue
+                seen.add(val)
+                guids.append(val)
         except Exception as e:
             print(f"Error reading {path}: {e}")
             return []
         return guids
 
+
     # prefer the latest standings summary file in data/ (allow EVENT_DATA_DIR override)
     data_dir = Path(os.environ.get("EVENT_DATA_DIR") or (Path(__file__).resolve().parents[1] / "data"))
 
@@ -496,7 +739,7 @@ if __name__ == "__main__":
         except Exception:
             return []
 
-    summary_candidates = sorted(data_dir.glob("*standings summary*.csv"), key=lambda p: p.stat().st_mtime, reverse=True)
+    summary_candidates = find_artifacts(data_dir, "*standings summary*")
     if summary_candidates:
         standings_path = summary_candidates[0]
         guids = _try_load_from(standings_path)
@@ -505,7 +748,7 @@ if __name__ == "__main__":
         standings_path = None
 
     if standings_path is None:
-        standings_candidates = sorted(data_dir.glob("*standings*.csv"), key=lambda p: p.stat().st_mtime, reverse=True)
+        standings_candidates = find_artifacts(data_dir, "*standings*")
         for cand in standings_candidates:
             vals = _try_load_from(cand)
             if vals:
@@ -514,7 +757,7 @@ if __name__ == "__main__":
                 break
 
     if standings_path is None:
-        other_csvs = sorted(data_dir.glob("*.csv"), key=lambda p: p.stat().st_mtime, reverse=True)
+        other_csvs = find_artifacts(data_dir, "*")
         for cand in other_csvs:
             vals = _try_load_from(cand)
             if vals:
@@ -533,20 +776,42 @@ if __name__ == "__main__":
         guids = sample_guid
 
     standings_lookup: Dict[str, Dict[str, Any]] = {}
-    if standings_path and standings_path.exists():
+    if standings_path and artifact_exists(standings_path):
         standings_lookup = build_standings_lookup_from_path(standings_path)
         if standings_lookup:
             print(f"Loaded standings data for {len(standings_lookup)} players")
         else:
             print(f"Warning: no standings data could be loaded from {standings_path}")
 
-    scraper = DecklistScraper()
+    archive_enabled = str(os.environ.get("DECKLIST_ARCHIVE", "1")).strip().lower() not in {"0", "false", "no", "off"}
+    scraper = DecklistScraper(store=store_from_env(), archive=DecklistArchive(data_dir) if archive_enabled else None)
     # include event name in decklist filename
     raw_event_name = os.environ.get("EVENT_NAME", "event")
     sanitized_event = re.sub(r'[<>:"/\\|?*]', '_', raw_event_name)
     out_path = data_dir / f"{sanitized_event} decklists.csv"
+    max_workers = int(os.environ.get("DECKLIST_WORKERS") or 8)
+    requests_per_second = float(os.environ.get("DECKLIST_RPS") or 5)
+    # completed GUIDs and the retry queue live next to the event's other artifacts
+    journal = DecklistJournal(
+        data_dir,
+        max_attempts=int(os.environ.get("DECKLIST_MAX_ATTEMPTS") or 4),
+        backoff_s=float(os.environ.get("DECKLIST_RETRY_BACKOFF_S") or 5),
+    )
     start_ts = time.time()
-    rows = scraper.process_guids(guids, save_csv=out_path, standings_lookup=standings_lookup)
+    rows = scraper.process_guids(
+        guids,
+        save_csv=out_path,
+        standings_lookup=standings_lookup,
+        max_workers=max_workers,
+        requests_per_second=requests_per_second,
+        journal=journal,
+        parse_workers=int(os.environ.get("DECKLIST_PARSE_WORKERS") or 0) or None,
+        reparse=str(os.environ.get("DECKLIST_REPARSE", "")).strip().lower() in {"1", "true", "yes", "on"},
+    )
+    # nothing left to resume once every GUID is in the CSV or given up (exhausted or 404/410);
+    # only the given-up GUIDs are remembered, so reruns do not request them again
+    if not journal.pending(guids):
+        journal.clear(keep_given_up=True)
     duration = time.time() - start_ts
     print("Parsed rows:", len(rows))
 
@@ -558,5 +823,6 @@ if __name__ == "__main__":
         log_line = f"{now} | script=fetch_decklists_api | event={sanitized_event} | rows={len(rows)} | out={out_path} | duration_s={duration:.3f}"
         with (logs_dir / "fetch_decklists_api.log").open("a", encoding="utf-8") as fh:
             fh.write(log_line + "\n")
+        emit_run_metrics(scraper.metrics, logs_dir, "fetch_decklists_api", event=sanitized_event, rows=len(rows))
     except Exception as e:
         print(f"Failed to write decklists log: {e}")
\ No newline at end of file
@@ -9,31 +9,35 @@ import requests
 import json
 import os
 import time
-import pandas as pd
 from dotenv import load_dotenv
 from utils.api_utils import (
-    parse_result_string,
-    extract_competitor,
     process_raw_pairings_list,
     make_payload,
+    iter_datatables_pages,
+    merge_pairings_frames,
     get_round_ids,
+    get_round_metadata,
+    load_tournament_page,
 )
+from utils.artifacts import artifact_exists, read_artifact, write_artifact
+from utils.http_cache import IMMUTABLE, TTL_LIVE_ROUND
+from utils.fetch_metrics import emit_run_metrics
+from utils.http_client import TokenBucket, get_client, melee_url
+from utils.page_journal import PageJournal
+from utils.fetch_state import incremental_enabled, load_completed_round_ids, record_completed_round_ids
 from pathlib import Path
 import re
-import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 load_dotenv()
 
 # configuration (allow overrides via environment variables)
 EVENT_ID = int(os.environ.get("EVENT_ID", 248718))
-ROUND_IDS = get_round_ids(requests.Session(), EVENT_ID, mode="pairings")
-BASE_URL = "https://melee.gg/Match/GetRoundMatches/{round_id}"
+BASE_URL = melee_url("/Match/GetRoundMatches/{round_id}")
 # default output into data/ unless orchestrated into an event-specific folder
 base_data_dir = Path(__file__).resolve().parents[1] / "data"
 event_data_dir = Path(os.environ.get("EVENT_DATA_DIR", base_data_dir))
-matchups_dir = event_data_dir / "matchups"
-matchups_dir.mkdir(parents=True, exist_ok=True)
 
 # include event name in filename and write into the event root (data/<event>)
 event_name = os.environ.get("EVENT_NAME", "event")
@@ -42,107 +46,163 @@ sanitized_event = re.sub(r'[<>:"/\\|?*]', '_', event_name)
 OUTPUT_CSV_FILE = event_data_dir / f"{sanitized_event} pairings.csv"
 COOKIE = os.environ.get("MELEE_COOKIE")
 PAGE_SIZE = int(os.environ.get("PAGE_SIZE") or 400)
-DELAY_S = float(os.environ.get("DELAY_S") or 1)
+
+PAIRINGS_WORKERS = int(os.environ.get("PAIRINGS_WORKERS") or 6)
+PAIRINGS_RATE = float(os.environ.get("PAIRINGS_RATE") or 4)
+PAIRINGS_BURST = int(os.environ.get("PAIRINGS_BURST") or 4)
 
 # main fetching logic
 
+def fetch_round_pairings(
+    client, round_id: int, limiter: TokenBucket, completed: bool = False, journal: PageJournal | None = None
+) -> int:
+    """Fetch every pairings page of one round into the journal; rows are tagged with their RoundId.
+
+    The first page's record count fixes the remaining offsets, which are then
+    fetched concurrently (see iter_datatables_pages). Pages already in the
+    journal from an interrupted run are skipped, and the round is only marked
+    done once all of its pages are on disk. Returns the number of rows journaled.
+    """
+    url = BASE_URL.format(round_id=round_id)
+    headers = {
+        "Accept": "application/json, text/javascript, */*; q=0.01",
+        "X-Requested-With": "XMLHttpRequest",
+        "Referer": melee_url(f"/Pairing/Round/{round_id}"),
+    }
+
+    def fetch_page(start: int, length: int) -> dict:
+        print(f"Round {round_id} - Fetching rows {start}..{start + length - 1}...")
+        response = client.post(
+            url,
+            data=make_payload(start=start, length=length),
+            headers=headers,
+            event_id=EVENT_ID,
+            cache_ttl=IMMUTABLE if completed else TTL_LIVE_ROUND,
+            limiter=limiter,
+        )
+        raw_content = response.text
+        response.raise_for_status()
+        if raw_content.strip().startswith("<!DOCTYPE html>"):
+            raise PermissionError(f"Round {round_id} failed authentication. Check cookie.")
+        return response.json()
+
+    journal = journal if journal is not None else PageJournal(event_data_dir, "pairings", EVENT_ID)
+    n_rows = 0
+    try:
+        pages = iter_datatables_pages(fetch_page, page_size=PAGE_SIZE, skip_starts=journal.completed_starts(round_id))
+        for start, page_rows in pages:
+            # Inject the Round ID into each row
+            for row in page_rows:
+                row['RoundId'] = round_id
+            journal.append_page(round_id, start, page_rows)
+            n_rows += len(page_rows)
+        journal.mark_round_done(round_id)
+    except PermissionError as e:
+        print(f"ERROR: {e}")
+    except requests.exceptions.RequestException as e:
+        print(f"Request failed for Round {round_id}: {e}")
+    except json.JSONDecodeError as e:
+        print(f"ERROR: Failed to decode JSON for Round {round_id}: {e}")
+
+    print(f"-> Finished Round {round_id}. Records journaled this run: {n_rows}")
+    return n_rows
+
+
 def fetch_all_rounds_data():
-    """Iterates through all ROUND_IDS and fetches all associated pairings."""
-    if not COOKIE:
+    """Fetches pairings for every round of the event concurrently behind a shared token bucket.
+
+    Pages are streamed into a per-event journal as they arrive and the CSV is
+    built from it afterwards, so an interrupted run resumes where it stopped.
+    """
+    # the shared client carries the cookie and reuses connections across rounds/pages
+    client = get_client()
+    if not COOKIE and not client.offline:
         print("FATAL: MELEE_COOKIE environment variable is not set.")
         print("Please set it in your .env file with the full, fresh cookie string.")
         return
 
-    headers = {
-        "Accept": "application/json, text/javascript, */*; q=0.01",
-        "X-Requested-With": "XMLHttpRequest",
-        "Cookie": COOKIE,
+    event_data_dir.mkdir(parents=True, exist_ok=True)
+    # every request of this stage, the tournament page included, draws from one bucket
+    limiter = TokenBucket(PAIRINGS_RATE, burst=PAIRINGS_BURST)
+    # round metadata saved by the standings stage is reused when fresh
+    page = load_tournament_page(client, EVENT_ID, event_data_dir, limiter=limiter)
+    all_round_ids = get_round_ids(client, EVENT_ID, mode="pairings", page=page)
+    # completed rounds are final, so their pages are cached forever; live rounds briefly
+    completed_round_ids = {
+        int(m["id"]) for m in get_round_metadata(client, EVENT_ID, mode="pairings", page=page) if m.get("is_completed")
     }
-    
-    all_rounds_rows = []
-    
-    print(f"Starting pipeline for {len(ROUND_IDS)} rounds.")
+    # one bucket paces every page request across all rounds (cache hits don't spend tokens)
+    # incremental mode: skip rounds already fetched in their final state
+    incremental = incremental_enabled() and artifact_exists(OUTPUT_CSV_FILE)
+    round_ids = list(all_round_ids)
+    if incremental:
+        already_done = load_completed_round_ids(event_data_dir, "pairings")
+        round_ids = [rid for rid in all_round_ids if rid not in already_done]
+        print(f"Incremental mode: {len(all_round_ids) - len(round_ids)} completed rounds already on disk, fetching {len(round_ids)}.")
+
+    # resume from the journal of an interrupted run; rounds still in progress may
+    # have changed since, so only completed rounds keep their journaled pages
+    journal = PageJournal(event_data_dir, "pairings", EVENT_ID)
+    if journal.has_progress:
+        journal.reset_rounds(rid for rid in round_ids if rid not in completed_round_ids)
+        resumed = [rid for rid in round_ids if journal.is_round_done(rid)]
+        if resumed:
+            print(f"Resuming from {journal.journal_path.name}: {len(resumed)} rounds already journaled.")
+    pending = [rid for rid in round_ids if not journal.is_round_done(rid)]
+
+    print(f"Starting pipeline for {len(pending)} rounds ({PAIRINGS_WORKERS} workers, {PAIRINGS_RATE:g} req/s, burst {PAIRINGS_BURST}).")
     print("-" * 50)
-    
-    for round_id in ROUND_IDS:
-        url = BASE_URL.format(round_id=round_id)
-        # Update referer for the current round
-        headers["Referer"] = f"https://melee.gg/Pairing/Round/{round_id}"
-        
-        start = 0
-        page_num = 1
-        round_records = 0
-        
-        while True:
-            payload = make_payload(start=start, length=PAGE_SIZE) # type: ignore
-            
-            try:
-                print(f"Round {round_id} - Fetching page {page_num} (start={start})...")
-                response = requests.post(url, data=payload, headers=headers, timeout=30)
-                
-                raw_content = response.text
-                response.raise_for_status()
-
-                if raw_content.strip().startswith("<!DOCTYPE html>"):
-                    print(f"ERROR: Round {round_id} failed authentication. Check cookie.")
-                    break
-
-                json_data = response.json()
-                rows = json_data.get("data", [])
-                n_fetched = len(rows)
-
-                if n_fetched == 0:
-                    break
-
-                # Inject the Round ID into each row before appending
-                for row in rows:
-                    row['RoundId'] = round_id
-                    
-                all_rounds_rows.extend(rows)
-                round_records += n_fetched
-                
-                # Stop condition
-                if n_fetched < PAGE_SIZE: # type: ignore
-                    break
-                    
-                start += PAGE_SIZE # type: ignore
-                page_num += 1
-                time.sleep(DELAY_S)  # type: ignore
-
-            except requests.exceptions.RequestException as e:
-                print(f"Request failed for Round {round_id} on page {page_num}: {e}")
-                break
-
-            except json.JSONDecodeError as e:
-                print(f"ERROR: Failed to decode JSON for Round {round_id}: {e}")
-                break
-        
-        print(f"-> Finished Round {round_id}. Total records collected: {round_records}")
-        time.sleep(1) # Longer delay between rounds
-        
+
+    with ThreadPoolExecutor(max_workers=max(1, PAIRINGS_WORKERS)) as pool:
+        list(pool.map(lambda rid: fetch_round_pairings(client, rid, limiter, rid in completed_round_ids, journal), pending))
+
+    # only rounds with every page journaled are written: a partly fetched round
+    # would truncate the CSV (or, merged incrementally, replace good rows on disk)
+    done = sorted(rid for rid in journal.journaled_round_ids() if journal.is_round_done(rid))
+    unfinished = [rid for rid in round_ids if not journal.is_round_done(rid)]
+
     # Final step: Convert all collected data to a DataFrame and save
-    total_records = len(all_rounds_rows)
     print("\n" + "=" * 50)
-    print(f"DATA COLLECTION COMPLETE. Total pairings collected: {total_records}")
+    print(f"DATA COLLECTION COMPLETE. Rounds journaled: {len(done)}, unfinished: {len(unfinished)}")
     print("=" * 50)
 
-    if all_rounds_rows:
+    total_records = 0
+    if unfinished and not incremental:
+        print(f"{len(unfinished)} rounds did not finish; pairings not written. Rerun to resume from {journal.journal_path}.")
+    elif done:
         try:
-            # 1. Process the raw list using the imported robust logic
-            df_clean = process_raw_pairings_list(all_rounds_rows)
+            # 1. Stream the journaled rows through the imported robust logic
+            df_clean = process_raw_pairings_list(journal.iter_rows(done))
+            total_records = len(df_clean)
             print("Data cleaning and feature extraction complete.")
 
-            # 2. Save to CSV
-            df_clean.to_csv(OUTPUT_CSV_FILE, index=False, encoding='utf-8')
-            print(f"SUCCESS! Cleaned data saved to: {OUTPUT_CSV_FILE}")
+            if incremental:
+                existing = read_artifact(OUTPUT_CSV_FILE, "pairings")
+                df_clean = merge_pairings_frames(existing, df_clean, done)
+                print(f"Merged {len(done)} refreshed rounds into existing pairings ({len(df_clean)} rows).")
+
+            # 2. Save (Parquet when pyarrow is available, plus the CSV unless ARTIFACT_CSV=0)
+            written = write_artifact(df_clean, OUTPUT_CSV_FILE, "pairings", encoding='utf-8')
+            print(f"SUCCESS! Cleaned data saved to: {', '.join(str(p) for p in written)}")
+
+            # remember rounds that were final when fetched so incremental runs can skip them
+            record_completed_round_ids(
+                event_data_dir,
+                "pairings",
+                [rid for rid in round_ids if journal.is_round_done(rid) and rid in completed_round_ids],
+            )
+
+            if unfinished:
+                print(f"{len(unfinished)} rounds did not finish; rerun to resume from {journal.journal_path}.")
+            else:
+                journal.clear()
 
         except Exception as e:
-            # Using the new variable name 'df_clean' for clarity if the processing failed late
             print(f"FATAL ERROR during DataFrame processing or saving: {e}")
-            # If pandas conversion fails, save the raw list to JSON as a backup
-            with open("backup_raw_data.json", "w", encoding="utf-8") as f:
-                json.dump(all_rounds_rows, f, indent=4)
-            print("Raw data saved to backup_raw_data.json.")
+            # the raw pages stay in the journal, so nothing needs to be refetched
+            print(f"Raw pages kept in {journal.journal_path}.")
+    elif incremental:
+        print("No new pairings rounds to fetch; existing pairings left unchanged.")
     else:
         print("No data collected successfully.")
 
@@ -161,5 +221,6 @@ if __name__ == "__main__":
         log_line = f"{now} | script=fetch_pairings_api | event={sanitized_event} | event_id={EVENT_ID} | duration_s={duration:.3f} | rows={total} | out={OUTPUT_CSV_FILE}"
         with (logs_dir / "fetch_pairings_api.log").open("a", encoding="utf-8") as fh:
             fh.write(log_line + "\n")
+        emit_run_metrics(get_client().metrics, logs_dir, "fetch_pairings_api", event=sanitized_event, event_id=EVENT_ID, rows=total)
     except Exception as e:
         print(f"Failed to write pairings log: {e}")
\ No newline at end of file
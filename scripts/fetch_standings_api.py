@@ -5,7 +5,6 @@
 # @Link    : https://github.com/peterpiperpickedpeppers
 
 import os
-import ast
 import re
 from pathlib import Path
 from dotenv import load_dotenv
@@ -14,15 +13,29 @@ from utils.api_utils import (
     standings_make_payload,
     standings_maybe_get_csrf_header,
     fetch_round_standings,
-    standings_extract_display_names,
+    flatten_standings_frame,
+    has_player_ids,
+    write_standings_payload,
     get_round_ids,
     classify_event_round_ids,
+    load_tournament_page,
+    records_from_pairings,
+)
+from utils.artifacts import apply_schema, artifact_exists, read_artifact, write_artifact
+from utils.fetch_metrics import emit_run_metrics
+from utils.http_client import TokenBucket, get_client
+from utils.fetch_state import (
+    final_round_id,
+    incremental_enabled,
+    load_completed_round_ids,
+    record_completed_round_ids,
+    standings_final_only,
 )
 import requests
 import time
 from datetime import datetime, timezone
 
-from scripts.fetch_decklists_api import DecklistScraper
+from utils.names import normalize_player_name
 
 load_dotenv()
 
@@ -82,6 +95,8 @@ if __name__ == "__main__":
     PAGE_SIZE = int(os.environ.get("PAGE_SIZE") or 400)
     LIMITED_ROUND_COUNT = int(os.environ.get("LIMITED_ROUND_COUNT") or 3)
     EVENT_TYPE = (os.environ.get("EVENT_TYPE") or "constructed").strip().lower()
+    STANDINGS_RATE = float(os.environ.get("STANDINGS_RATE") or 4)
+    STANDINGS_BURST = int(os.environ.get("STANDINGS_BURST") or 4)
 
     # timing and logging
     start_ts = time.time()
@@ -91,7 +106,8 @@ if __name__ == "__main__":
     player_totals = {}
     player_limited = {}
     player_deck_info = {}
-    scraper = DecklistScraper()
+    player_names = {}
+    player_ids = {}
 
     base_data_dir = Path(__file__).resolve().parents[1] / "data"
     event_data_dir = Path(os.environ.get("EVENT_DATA_DIR", base_data_dir / event))
@@ -100,101 +116,130 @@ if __name__ == "__main__":
     raw_event_name = os.environ.get("EVENT_NAME", event)
     sanitized_event = re.sub(r'[<>:"/\\|?*]', '_', raw_event_name)
 
-    session = requests.Session()
-    round_classification = classify_event_round_ids(session, EVENT_ID, EVENT_TYPE, mode="standings")
+    session = get_client()
+    # every request of this stage, the tournament page included, draws from one bucket
+    limiter = TokenBucket(STANDINGS_RATE, burst=STANDINGS_BURST)
+    # one download/parse of the tournament page, saved as round_metadata.json for later stages
+    page = load_tournament_page(session, EVENT_ID, event_data_dir, limiter=limiter)
+    round_classification = classify_event_round_ids(session, EVENT_ID, EVENT_TYPE, mode="standings", page=page)
     limited_round_ids = set(int(x) for x in round_classification.get("limited_ids", []))
+    completed_round_ids = {
+        int(m["id"]) for m in round_classification.get("metadata", []) if m.get("is_completed")
+    }
 
-    round_ids = list(reversed(get_round_ids(session, EVENT_ID, mode="standings")))
+    round_ids = list(reversed(get_round_ids(session, EVENT_ID, mode="standings", page=page)))
     if limited_round_ids:
         print(f"Detected limited rounds for event_type={EVENT_TYPE}: {sorted(limited_round_ids)}")
     else:
         print(f"No limited rounds detected for event_type={EVENT_TYPE}; all rounds treated as constructed")
 
-    for round_id in round_ids:
-        print(f"Fetching round ID: {round_id}")
+    # final-round-only mode: totals come from the last standings round and the
+    # limited/constructed split from the pairings fetched before this stage
+    final_only = standings_final_only()
+    pairings_csv = event_data_dir / f"{sanitized_event} pairings.csv"
+    if final_only and not artifact_exists(pairings_csv):
+        print(f"Final-round-only standings need {pairings_csv}; fetching every round instead.")
+        final_only = False
+    final_round = final_round_id(round_ids, completed_round_ids) if final_only else None
+    if final_only and round_ids and final_round is None:
+        print("Final-round-only standings need a completed round; fetching every round instead.")
+        final_only = False
+    if final_only and final_round is not None:
+        print(f"Final-round-only mode: fetching standings round {final_round} only.")
+        round_ids = [final_round]
 
-        df = fetch_round_standings(round_id, EVENT_ID, page_size=PAGE_SIZE)  # type: ignore
-        print(f"Total rows fetched: {len(df)}")
+    # incremental mode: completed rounds already on disk are re-read instead of re-fetched
+    already_done = load_completed_round_ids(event_data_dir, "standings") if incremental_enabled() else set()
+    fetched_completed = []
+
+    for round_id in round_ids:
+        round_csv = event_data_dir / f"{sanitized_event} standings round_{round_id}.csv"
+        round_jsonl = round_csv.with_suffix(".jsonl")
+        from_disk = round_id in already_done and artifact_exists(round_csv)
+        if from_disk:
+            print(f"Loading completed round ID {round_id} from {round_csv}")
+            df = read_artifact(round_csv, "standings_round", encoding="utf-8-sig")
+        else:
+            print(f"Fetching round ID: {round_id}")
+            df = fetch_round_standings(
+                round_id,
+                EVENT_ID,
+                page_size=PAGE_SIZE,  # type: ignore
+                client=session,
+                completed=round_id in completed_round_ids,
+                limiter=limiter,
+            )
+            print(f"Total rows fetched: {len(df)}")
+            if not df.empty and round_id in completed_round_ids:
+                fetched_completed.append(round_id)
 
         if not df.empty:
-            df["PlayerName"] = df["Team"].apply(standings_extract_display_names)
-
-            def _extract_deck_info(cell):
-                guid = ""
-                archetype = ""
-                if isinstance(cell, dict):
-                    guid = cell.get("DecklistId") or cell.get("DecklistID") or cell.get("decklistId") or ""
-                    archetype = cell.get("DecklistName") or cell.get("decklistName") or ""
-                    return str(guid).strip(), str(archetype).strip()
-                if isinstance(cell, list):
-                    for item in cell:
-                        if isinstance(item, dict):
-                            g = item.get("DecklistId") or item.get("DecklistID") or item.get("decklistId") or ""
-                            if g:
-                                n = item.get("DecklistName") or item.get("decklistName") or ""
-                                return str(g).strip(), str(n).strip()
-                    return "", ""
-                if isinstance(cell, str) and cell.strip():
-                    try:
-                        parsed = ast.literal_eval(cell)
-                    except Exception:
-                        return "", ""
-                    return _extract_deck_info(parsed)
-                return "", ""
-
-            def _extract_guid(cell):
-                guid, _ = _extract_deck_info(cell)
-                return guid or None
-
-            decklists_col = df.get("Decklists")
-            if decklists_col is None:
-                df["decklist_guid"] = None
-            else:
-                df["decklist_guid"] = decklists_col.apply(_extract_guid)
-
-            cols = ["PlayerName"] + [c for c in df.columns if c != "PlayerName"]
-            df = df[cols]
-
-            out_csv = event_data_dir / f"{sanitized_event} standings round_{round_id}.csv"
-            df.to_csv(out_csv, index=False, encoding="utf-8-sig")
-            print(f"Saved: {out_csv}\n")
-            rows_written += len(df)
-
-            for _, row in df.iterrows():
+            if not from_disk:
+                # raw payload as JSON Lines; the CSV only keeps flat, typed columns
+                write_standings_payload(df, round_jsonl)
+            df = flatten_standings_frame(df)
+
+            out_csv = round_csv
+            if not from_disk:
+                df = apply_schema(df, "standings_round")
+                written = write_artifact(df, out_csv, "standings_round", encoding="utf-8-sig")
+                print(f"Saved: {', '.join(str(p) for p in written)}\n")
+                rows_written += len(df)
+
+            for row in df.to_dict("records"):
                 player_name_raw = str(row.get("PlayerName") or "").strip()
-                if not player_name_raw:
+                if not player_name_raw or player_name_raw == "nan":
                     continue
-                player_name = scraper.normalize_player_name(player_name_raw)
+                player_name = normalize_player_name(player_name_raw)
                 if not player_name:
                     continue
+                # players are tracked across rounds by Melee ID; the name is only a fallback key
+                player_id = row.get("PlayerId")
+                player_key = int(player_id) if pd.notna(player_id) else player_name
+                player_names[player_key] = player_name
+                if pd.notna(player_id):
+                    player_ids[player_key] = int(player_id)
 
                 current_totals = _parse_match_record(row.get("MatchRecord"))
-                previous_totals = player_totals.get(player_name, {"wins": 0, "losses": 0, "draws": 0})
+                previous_totals = player_totals.get(player_key, {"wins": 0, "losses": 0, "draws": 0})
                 delta = {
                     "wins": max(0, current_totals["wins"] - previous_totals.get("wins", 0)),
                     "losses": max(0, current_totals["losses"] - previous_totals.get("losses", 0)),
                     "draws": max(0, current_totals["draws"] - previous_totals.get("draws", 0)),
                 }
-                player_totals[player_name] = current_totals
-                player_limited.setdefault(player_name, {"wins": 0, "losses": 0, "draws": 0})
-                if int(round_id) in limited_round_ids:
-                    player_limited[player_name]["wins"] += delta["wins"]
-                    player_limited[player_name]["losses"] += delta["losses"]
-                    player_limited[player_name]["draws"] += delta["draws"]
-
-                deck_guid, deck_archetype = _extract_deck_info(row.get("Decklists"))
-                if not deck_guid:
-                    deck_guid = row.get("decklist_guid") or row.get("DecklistGuid") or None
-                if deck_guid:
-                    player_deck_info[player_name] = {
+                player_totals[player_key] = current_totals
+                player_limited.setdefault(player_key, {"wins": 0, "losses": 0, "draws": 0})
+                if int(round_id) in limited_round_ids and not final_only:
+                    player_limited[player_key]["wins"] += delta["wins"]
+                    player_limited[player_key]["losses"] += delta["losses"]
+                    player_limited[player_key]["draws"] += delta["draws"]
+
+                deck_guid = row.get("decklist_guid")
+                if pd.notna(deck_guid) and str(deck_guid).strip():
+                    deck_archetype = row.get("deck_archetype")
+                    player_deck_info[player_key] = {
                         "decklist_guid": str(deck_guid).strip(),
-                        "deck_archetype": str(deck_archetype).strip(),
+                        "deck_archetype": str(deck_archetype).strip() if pd.notna(deck_archetype) else "",
                     }
 
-    for player_name, totals in player_totals.items():
-        limited = player_limited.get(player_name, {"wins": 0, "losses": 0, "draws": 0})
+    if final_only:
+        pairings_limited_ids = classify_event_round_ids(session, EVENT_ID, EVENT_TYPE, mode="pairings", page=page).get("limited_ids", [])
+        pairings_df = read_artifact(pairings_csv, "pairings")
+        by_id = bool(player_ids) and has_player_ids(pairings_df)
+        player_limited = records_from_pairings(
+            pairings_df,
+            round_ids=pairings_limited_ids,
+            normalize=normalize_player_name,
+            by_id=by_id,
+        )
+        print(f"Reconstructed limited records for {len(player_limited)} players from {pairings_csv.name}")
+
+    for player_key, totals in player_totals.items():
+        player_name = player_names[player_key]
+        limited = player_limited.get(player_key) or player_limited.get(player_name) or {"wins": 0, "losses": 0, "draws": 0}
         summary_rows.append({
             "PlayerName": player_name,
+            "player_id": player_ids.get(player_key),
             "wins": totals.get("wins", 0),
             "losses": totals.get("losses", 0),
             "draws": totals.get("draws", 0),
@@ -204,15 +249,19 @@ if __name__ == "__main__":
             "constructed_wins": max(0, totals.get("wins", 0) - limited.get("wins", 0)),
             "constructed_losses": max(0, totals.get("losses", 0) - limited.get("losses", 0)),
             "constructed_draws": max(0, totals.get("draws", 0) - limited.get("draws", 0)),
-            "decklist_guid": player_deck_info.get(player_name, {}).get("decklist_guid", ""),
-            "deck_archetype": player_deck_info.get(player_name, {}).get("deck_archetype", ""),
+            "decklist_guid": player_deck_info.get(player_key, {}).get("decklist_guid", ""),
+            "deck_archetype": player_deck_info.get(player_key, {}).get("deck_archetype", ""),
         })
 
+    record_completed_round_ids(event_data_dir, "standings", fetched_completed)
+
     summary_df = pd.DataFrame(summary_rows)
+    if not summary_df.empty:
+        summary_df["player_id"] = summary_df["player_id"].astype("Int64")
     if not summary_df.empty:
         summary_path = event_data_dir / f"{sanitized_event} standings summary.csv"
-        summary_df.to_csv(summary_path, index=False, encoding="utf-8-sig")
-        print(f"Saved standings summary: {summary_path}")
+        written = write_artifact(summary_df, summary_path, "standings_summary", encoding="utf-8-sig")
+        print(f"Saved standings summary: {', '.join(str(p) for p in written)}")
 
     try:
         logs_dir = event_data_dir / "logs"
@@ -222,6 +271,7 @@ if __name__ == "__main__":
         log_line = f"{now} | script=fetch_standings_api | event={sanitized_event} | event_id={EVENT_ID} | duration_s={duration:.3f} | rows={rows_written} | out={out_csv}"
         with (logs_dir / "fetch_standings_api.log").open("a", encoding="utf-8") as fh:
             fh.write(log_line + "\n")
+        emit_run_metrics(get_client().metrics, logs_dir, "fetch_standings_api", event=sanitized_event, event_id=EVENT_ID, rows=rows_written)
     except Exception as e:
         print(f"Failed to write standings log: {e}")
 # -*- coding: utf-8 -*-
@@ -18,13 +18,15 @@ import sys
 from pathlib import Path
 import pandas as pd
 
+from utils.melee_payloads import NON_ARCHETYPE_COLUMNS
+
 
 def normalize_csv(csv_path: Path) -> None:
     if not csv_path.exists():
         raise SystemExit(f"CSV not found: {csv_path}")
 
     df = pd.read_csv(csv_path)
-    deck_cols = [c for c in df.columns if 'deck' in c.lower()]
+    deck_cols = [c for c in df.columns if 'deck' in c.lower() and c not in NON_ARCHETYPE_COLUMNS]
     if not deck_cols:
         raise SystemExit("No deck columns found to normalize.")
 
@@ -17,7 +17,9 @@ from __future__ import annotations
 from pathlib import Path
 import os
 import sys
+import numpy as np
 import pandas as pd
+from utils.artifacts import artifact_exists, load_decklists, read_artifact, write_artifact
 
 
 # Mapping as provided (old_name -> new_name)
@@ -73,6 +75,21 @@ DECKNAME_MAP = {
 
 
 def replace_and_count(series: pd.Series, mapping: dict[str, str]) -> tuple[pd.Series, int]:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # map the categories (once per distinct name) instead of every row;
+        # names mapped onto an existing category are merged into it
+        codes = series.cat.codes.to_numpy()
+        renamed = pd.Index(series.cat.categories).map(lambda c: mapping.get(c, c))
+        categories = pd.Index(renamed.unique())
+        # trailing -1 keeps missing values (code -1) missing
+        new_codes = np.append(categories.get_indexer(renamed), -1)
+        changed = np.append(renamed != series.cat.categories, False)
+        after = pd.Series(
+            pd.Categorical.from_codes(new_codes[codes], categories=categories),
+            index=series.index,
+            name=series.name,
+        )
+        return after, int(changed[codes].sum())
     before = series.copy()
     after = series.replace(mapping)
     changed = (before != after) & ~(before.isna() & after.isna())
@@ -95,22 +112,22 @@ def normalize_event() -> int:
 
     any_updated = False
 
-    if decklists_path.exists():
+    if artifact_exists(decklists_path):
         print(f"Normalizing decklists: {decklists_path}")
-        ddf = pd.read_csv(decklists_path)
+        ddf = load_decklists(decklists_path)
         if 'deck_archetype' in ddf.columns:
             ddf['deck_archetype'], n = replace_and_count(ddf['deck_archetype'], DECKNAME_MAP)
             print(f"  deck_archetype changes: {n}")
             any_updated = any_updated or (n > 0)
         else:
             print("  WARNING: deck_archetype column not found; skipping decklists normalization")
-        ddf.to_csv(decklists_path, index=False)
+        write_artifact(ddf, decklists_path, "decklists")
     else:
         print(f"Decklists not found: {decklists_path}")
 
-    if pairings_path.exists():
+    if artifact_exists(pairings_path):
         print(f"Normalizing pairings: {pairings_path}")
-        pdf = pd.read_csv(pairings_path)
+        pdf = read_artifact(pairings_path, "pairings")
         for col in ['PlayerDeck', 'OpponentDeck', 'WinningDeck']:
             if col in pdf.columns:
                 pdf[col], n = replace_and_count(pdf[col], DECKNAME_MAP)
@@ -118,7 +135,7 @@ def normalize_event() -> int:
                 any_updated = any_updated or (n > 0)
             else:
                 print(f"  WARNING: {col} column not found; skipping")
-        pdf.to_csv(pairings_path, index=False)
+        write_artifact(pdf, pairings_path, "pairings")
     else:
         print(f"Pairings not found: {pairings_path}")
 
@@ -6,35 +6,27 @@
 Usage:
     python scripts/verify_matchup.py --deck-a "Azorius Blink" --deck-b "Esper Goryo's"
 
-This reads per-archetype results and/or matchup files under EVENT_DATA_DIR and
-prints W/L/D counts from both perspectives, asserting symmetry.
+This looks both matchup rows up in the event database (EVENT_DATA_DIR/event.sqlite)
+and prints W/L/D counts from both perspectives, asserting symmetry.
 """
 
 import argparse
 import os
 from pathlib import Path
 import sys
-import pandas as pd
 
+# Ensure repository root is on sys.path for local imports when executed directly
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
 
-def load_matchup_row(matchups_file: Path, opponent: str) -> dict | None:
-    df = pd.read_csv(matchups_file)
-    row = df[df['Opponent_Archetype'] == opponent]
-    if row.empty:
-        return None
-    r = row.iloc[0]
-    return {
-        'wins': int(r['Wins']),
-        'losses': int(r['Losses']),
-        'draws': int(r['Draws']),
-        'total': int(r['Total_Matches']),
-    }
+from utils import event_db  # noqa: E402
 
 
 def main() -> int:
     ap = argparse.ArgumentParser(description="Verify symmetric head-to-head matchup records.")
-    ap.add_argument('--deck-a', required=True, help='First archetype name (as in filenames)')
-    ap.add_argument('--deck-b', required=True, help='Second archetype name (as in filenames)')
+    ap.add_argument('--deck-a', required=True, help='First archetype name')
+    ap.add_argument('--deck-b', required=True, help='Second archetype name')
     ap.add_argument('--event-dir', default=os.getenv('EVENT_DATA_DIR'), help='Event data directory (defaults to EVENT_DATA_DIR)')
     args = ap.parse_args()
 
@@ -43,20 +35,19 @@ def main() -> int:
         return 2
 
     event_dir = Path(args.event_dir)
-    matchups_dir = event_dir / 'matchups'
-
-    file_a = matchups_dir / f"{args.deck_a} matchups.csv"
-    file_b = matchups_dir / f"{args.deck_b} matchups.csv"
-
-    if not file_a.exists() or not file_b.exists():
-        print(f"ERROR: Missing matchup files: {file_a if not file_a.exists() else ''} {file_b if not file_b.exists() else ''}", file=sys.stderr)
+    try:
+        conn = event_db.connect(event_dir)
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
         return 2
-
-    a_vs_b = load_matchup_row(file_a, args.deck_b)
-    b_vs_a = load_matchup_row(file_b, args.deck_a)
+    try:
+        a_vs_b = event_db.matchup(conn, args.deck_a, args.deck_b)
+        b_vs_a = event_db.matchup(conn, args.deck_b, args.deck_a)
+    finally:
+        conn.close()
 
     if a_vs_b is None or b_vs_a is None:
-        print('ERROR: Could not find matchup rows in one or both files.', file=sys.stderr)
+        print('ERROR: Could not find matchup rows for one or both archetypes.', file=sys.stderr)
         return 2
 
     print(f"{args.deck_a} vs {args.deck_b}:")
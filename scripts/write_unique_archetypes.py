@@ -15,21 +15,21 @@ from pathlib import Path
 import os
 import sys
 import pandas as pd
+from utils.artifacts import artifact_exists, find_artifacts, read_artifact
+from utils.melee_payloads import NON_ARCHETYPE_COLUMNS
 
 
 def find_pairings_csv(event_dir: Path, event_name: str | None = None) -> Path | None:
     # Prefer true pairings files: include 'pairings' but exclude derived 'unique archetypes' lists
-    candidates = [p for p in event_dir.glob("*pairings*.csv") if "unique archetypes" not in p.name.lower()]
+    candidates = [p for p in find_artifacts(event_dir, "*pairings*") if "unique archetypes" not in p.name.lower()]
     # If an event_name is provided, further prefer files that start with that name
     if event_name:
         exact = [p for p in candidates if p.name.lower().startswith(event_name.lower())]
         if exact:
-            exact = sorted(exact, key=lambda p: p.stat().st_mtime, reverse=True)
             return exact[0]
-    candidates = sorted(candidates, key=lambda p: p.stat().st_mtime, reverse=True)
     if candidates:
         return candidates[0]
-    others = sorted(event_dir.glob("*.csv"), key=lambda p: p.stat().st_mtime, reverse=True)
+    others = find_artifacts(event_dir, "*")
     return others[0] if others else None
 
 
@@ -49,15 +49,16 @@ def write_unique_archetypes() -> int:
         return 1
 
     pairings_path = find_pairings_csv(event_dir, event_name)
-    if pairings_path is None or not pairings_path.exists():
+    if pairings_path is None or not artifact_exists(pairings_path):
         print(f"ERROR: No pairings CSV found in {event_dir}", file=sys.stderr)
         return 1
 
     print(f"Loading pairings from: {pairings_path}")
-    df = pd.read_csv(pairings_path)
+    df = read_artifact(pairings_path, "pairings")
 
     # Identify deck columns (case-insensitive contains 'deck')
-    deck_cols = [c for c in df.columns if 'deck' in c.lower()]
+    # (decklist GUID columns such as PlayerDecklistId are not archetypes)
+    deck_cols = [c for c in df.columns if 'deck' in c.lower() and c not in NON_ARCHETYPE_COLUMNS]
     if not deck_cols:
         print("ERROR: No deck columns found in pairings CSV.", file=sys.stderr)
         return 1
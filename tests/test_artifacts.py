@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+from utils.artifacts import artifact_exists, find_artifacts, load_decklists, read_artifact, write_artifact
+
+
+def _pairings():
+    return pd.DataFrame({
+        "RoundId": [1, 1],
+        "Player": ["Alice", "Bob"],
+        "PlayerDeck": ["Boros Energy", None],
+        "PlayerId": [10, 11],
+        "WinnerId": [10.0, None],
+        "PlayerDecklistId": ["g1", "g2"],
+    })
+
+
+def test_csv_artifact_keeps_declared_dtypes(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_FORMAT", "csv")
+    path = tmp_path / "E pairings.csv"
+    assert write_artifact(_pairings(), path, "pairings") == [path]
+    # the nullable winner id no longer round-trips through float
+    assert path.read_text().splitlines()[1].split(",")[4] == "10"
+
+    df = read_artifact(path, "pairings")
+    assert str(df["WinnerId"].dtype) == "Int64"
+    assert str(df["PlayerDeck"].dtype) == "string"
+    assert df["WinnerId"].isna().tolist() == [False, True]
+    assert read_artifact(path, "pairings", columns=["Player"]).columns.tolist() == ["Player"]
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_columnar_artifact_round_trip(tmp_path, monkeypatch, fmt):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setenv("ARTIFACT_FORMAT", fmt)
+    monkeypatch.setenv("ARTIFACT_CSV", "0")
+    path = tmp_path / "E pairings.csv"
+    write_artifact(_pairings(), path, "pairings")
+
+    assert not path.exists()
+    assert artifact_exists(path)
+    assert find_artifacts(tmp_path, "*pairings*") == [path]
+    df = read_artifact(path, "pairings")
+    pd.testing.assert_frame_equal(df, read_artifact(path, "pairings"))
+    assert df["WinnerId"].tolist()[0] == 10
+    assert str(df["WinnerId"].dtype) == "Int64"
+    assert isinstance(read_artifact(path, "pairings", arrow_backed=True)["Player"].dtype, pd.ArrowDtype)
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_columnar_copy_is_read_when_csv_is_also_written(tmp_path, monkeypatch, fmt):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setenv("ARTIFACT_FORMAT", fmt)
+    monkeypatch.setenv("ARTIFACT_CSV", "1")
+    path = tmp_path / "E pairings.csv"
+    csv_path, columnar = write_artifact(_pairings(), path, "pairings")
+
+    assert (csv_path, columnar) == (path, path.with_suffix("." + fmt))
+    assert columnar.stat().st_mtime >= csv_path.stat().st_mtime
+    # only the columnar branch returns Arrow-backed columns
+    assert isinstance(read_artifact(path, "pairings", arrow_backed=True)["Player"].dtype, pd.ArrowDtype)
+
+
+def test_find_artifacts_names_by_csv_path(tmp_path):
+    (tmp_path / "E pairings.csv").write_text("a\n1\n")
+    (tmp_path / "E pairings.parquet").write_bytes(b"")
+    (tmp_path / "E standings summary.csv").write_text("a\n1\n")
+    assert find_artifacts(tmp_path, "*pairings*") == [tmp_path / "E pairings.csv"]
+    assert len(find_artifacts(tmp_path, "*")) == 2
+
+
+def test_load_decklists_reads_typed_columns(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_FORMAT", "csv")
+    path = tmp_path / "E decklists.csv"
+    path.write_text(
+        "player,wins,losses,draws,deck_archetype,card_name,qty,zone\n"
+        "Alice,5,2,1,Boros Energy,Ajani,4,main\n"
+        "Alice,5,2,1,Boros Energy,Blood Moon,,side\n"
+    )
+    df = load_decklists(path)
+    assert {c: str(df[c].dtype) for c in ("player", "card_name", "zone")} == dict.fromkeys(("player", "card_name", "zone"), "category")
+    assert str(df["qty"].dtype) == "Int8"
+    assert str(df["wins"].dtype) == "Int16"
+    assert df["qty"].isna().tolist() == [False, True]
+    assert load_decklists(path, columns=["player", "deck_archetype"]).columns.tolist() == ["player", "deck_archetype"]
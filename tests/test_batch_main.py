@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+import main
+
+
+def test_read_batch_file(tmp_path):
+    batch = tmp_path / "events.txt"
+    batch.write_text(
+        "# season backfill\n"
+        "248718, RC Houston 2025\n"
+        "\n"
+        "355905,PT EoE 2025,pro-tour  # limited rounds\n",
+        encoding="utf-8",
+    )
+
+    assert main.read_batch_file(batch, "constructed") == [
+        ("248718", "RC Houston 2025", "constructed"),
+        ("355905", "PT EoE 2025", "pro-tour"),
+    ]
+
+    batch.write_text("RC Houston 2025\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        main.read_batch_file(batch, "constructed")
+
+
+def test_batch_splits_rate_and_runs_analytics_after_fetch(tmp_path, monkeypatch):
+    batch = tmp_path / "events.txt"
+    batch.write_text("1,Event A\n2,Event B\n3,Event C\n", encoding="utf-8")
+    calls = []
+    lock = threading.Lock()
+
+    def fake_run_script(python_exe, module_name, env, output=None):
+        with lock:
+            rates = (env["STANDINGS_RATE"], env["PAIRINGS_RATE"], env["DECKLIST_RPS"])
+            calls.append((env["EVENT_NAME"], module_name, rates, env["STANDINGS_BURST"]))
+        return 1 if (env["EVENT_NAME"], module_name) == ("Event C", "scripts.fetch_pairings_api") else 0
+
+    monkeypatch.setattr(main, "run_script", fake_run_script)
+    monkeypatch.setattr(main, "__file__", str(tmp_path / "main.py"))
+
+    rc = main.main(["--batch", str(batch), "--batch-workers", "2", "--rate", "8"])
+
+    assert rc == 1  # Event C failed
+    # every fetch stage, standings included, gets the event's share of --rate
+    assert {(rates, burst) for _, _, rates, burst in calls} == {(("4", "4", "4"), "4")}
+    for event in ("Event A", "Event B"):
+        modules = [m for name, m, _, _ in calls if name == event]
+        assert modules == main.FETCH_MODULES + main.ANALYTICS_MODULES
+    # a failed fetch stops that event before its analytics
+    assert [m for name, m, _, _ in calls if name == "Event C"] == main.FETCH_MODULES[:2]
+    assert (tmp_path / "data" / "Event A" / "logs" / "main.log").exists()
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.card_matrix import CardMatrix, load_card_matrix, matrix_path
+from utils.vocab import EventVocabulary
+
+
+def _encoded_decklists():
+    # codes as produced by EventVocabulary.encode_frame
+    return pd.DataFrame(
+        [
+            # player, archetype, card, zone, qty, wins, losses
+            (0, 1, 0, 0, 4, 3, 1),
+            (0, 1, 1, 1, 2, 3, 1),
+            (1, 0, 0, 0, 1, 5, 0),
+            (2, 1, 1, 1, 1, 0, 2),
+            (2, 1, 1, 1, 1, 0, 2),
+        ],
+        columns=["player", "deck_archetype", "card_name", "zone", "qty", "wins", "losses"],
+    )
+
+
+def test_card_matrix_rows_grouped_by_archetype_in_csr_form():
+    df = _encoded_decklists()
+    m = CardMatrix.from_frame(df).set_records(df["player"], df["deck_archetype"], df["wins"], df["losses"])
+    assert m.shape == (3, 2)
+    assert m.archetypes.tolist() == [0, 1, 1]
+    assert m.pilots.tolist() == [1, 0, 2]
+    assert m.wins.tolist() == [5, 3, 0]
+    assert (m.cards.tolist(), m.zones.tolist()) == ([0, 1], [0, 1])
+    # row 0: column 0; row 1: columns 0 and 1; row 2: column 1 (pilot 2's duplicate rows summed)
+    assert m.indptr.tolist() == [0, 1, 3, 4]
+    assert m.indices.tolist() == [0, 0, 1, 1]
+    assert m.data.tolist() == [1, 4, 2, 2]
+
+    rows = m.archetype_rows(1)
+    assert (rows.start, rows.stop) == (1, 3)
+    cols, local_rows, copies = m.entries(rows)
+    assert (cols.tolist(), local_rows.tolist(), copies.tolist()) == ([0, 1, 1], [0, 0, 1], [4, 2, 2])
+
+
+def test_card_matrix_cache_follows_the_decklists_artifact(tmp_path):
+    source = tmp_path / "E decklists.csv"
+    source.write_text("x\n")
+    vocab = EventVocabulary({"players": ["a", "b", "c"]})
+    df = _encoded_decklists()
+    built = load_card_matrix(tmp_path, df, source, vocab)
+    assert matrix_path(tmp_path).exists()
+
+    # records are not cached: they always come from the frame
+    df["wins"] = 7
+    cached = load_card_matrix(tmp_path, df, source, vocab)
+    assert cached.key == built.key
+    assert cached.wins.tolist() == [7, 7, 7]
+    np.testing.assert_array_equal(cached.data, built.data)
+
+    df.loc[0, "qty"] = 3
+    source.write_text("x,y\n")
+    os.utime(source, ns=(0, 10**9))
+    rebuilt = load_card_matrix(tmp_path, df, source, vocab)
+    assert rebuilt.key != built.key
+    assert rebuilt.data.tolist() == [1, 3, 2, 2]
@@ -54,3 +54,27 @@ def test_build_pilot_result_lookup_excludes_draws_byes_and_incomplete_matches():
     assert lookup["Alice"] == {"Wins": 1, "Losses": 1}
     assert lookup["Bob"] == {"Wins": 0, "Losses": 0}
     assert lookup["Frank"] == {"Wins": 1, "Losses": 0}
+
+
+def test_build_pilot_result_lookup_by_id_matches_name_rules():
+    from scripts.create_card_winrates import build_pilot_result_lookup_by_id
+
+    pairings = pd.DataFrame(
+        [
+            [1, 2, 1, "Alice won", "Alice won 2-0-0"],
+            [1, 3, None, "Draw", "1-1-0 Draw"],
+            [1, None, 1, "Bye", "Alice was assigned a bye"],
+            [1, 5, 5, "Eve won", "Eve won 2-1-0"],
+            [6, 7, 6, "Frank won", "Frank won 2-0-0"],
+            [8, 9, None, "Ivan won", "0-0-3 Draw"],
+        ],
+        columns=["PlayerId", "OpponentId", "WinnerId", "Outcome", "ResultString"],
+    ).astype({"PlayerId": "Int64", "OpponentId": "Int64", "WinnerId": "Int64"})
+
+    lookup = build_pilot_result_lookup_by_id(pairings, {1, 2, 5, 6})
+
+    assert lookup[1] == {"Wins": 1, "Losses": 1}
+    assert lookup[2] == {"Wins": 0, "Losses": 1}
+    assert lookup[5] == {"Wins": 1, "Losses": 0}
+    # Frank's opponent is not a constructed pilot
+    assert lookup[6] == {"Wins": 0, "Losses": 0}
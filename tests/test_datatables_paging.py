@@ -0,0 +1,48 @@
+import threading
+
+from utils.api_utils import fetch_datatables_pages
+
+
+def _server(n_rows, cap=None, with_totals=True):
+    calls = []
+    lock = threading.Lock()
+
+    def fetch_page(start, length):
+        with lock:
+            calls.append((start, length))
+        served = min(length, cap) if cap else length
+        data = [{"i": i} for i in range(start, min(start + served, n_rows))]
+        body = {"data": data}
+        if with_totals:
+            body["recordsTotal"] = n_rows
+            body["recordsFiltered"] = n_rows
+        return body
+
+    return fetch_page, calls
+
+
+def test_remaining_offsets_come_from_first_page_totals():
+    fetch_page, calls = _server(1005)
+    rows = fetch_datatables_pages(fetch_page, page_size=100, max_workers=4)
+    assert [r["i"] for r in rows] == list(range(1005))
+    assert sorted(start for start, _ in calls) == list(range(0, 1005, 100))
+
+
+def test_server_side_length_cap_is_detected():
+    fetch_page, calls = _server(250, cap=40)
+    rows = fetch_datatables_pages(fetch_page, page_size=500, max_workers=3)
+    assert [r["i"] for r in rows] == list(range(250))
+    assert sorted(start for start, _ in calls) == list(range(0, 250, 40))
+
+
+def test_serial_fallback_without_totals():
+    fetch_page, calls = _server(230, with_totals=False)
+    rows = fetch_datatables_pages(fetch_page, page_size=100)
+    assert [r["i"] for r in rows] == list(range(230))
+    assert [start for start, _ in calls] == [0, 100, 200]
+
+
+def test_empty_first_page():
+    fetch_page, calls = _server(0)
+    assert fetch_datatables_pages(fetch_page, page_size=100) == []
+    assert calls == [(0, 100)]
@@ -0,0 +1,96 @@
+import pandas as pd
+
+from utils import event_db
+
+
+def _pairings():
+    rows = [
+        # RoundId, Table, Player, PlayerDeck, Opponent, OpponentDeck, Outcome, WinningDeck, ResultString, PlayerId, OpponentId
+        (1, 1, "Ann", "Boros Energy", "Bob", "Eldrazi Tron", "Ann won", "Boros Energy", "Ann won 2-0-0", 1, 2),
+        (1, 2, "Cat", "Eldrazi Tron", "Dan", "Boros Energy", "Cat won", "Eldrazi Tron", "Cat won 2-1-0", 3, 4),
+        (2, 1, "Ann", "Boros Energy", "Cat", "Eldrazi Tron", "Draw", None, "1-1-1 Draw", 1, 3),
+        (2, 2, "Bob", "Eldrazi Tron", "Dan", "Eldrazi Tron", "Bob won", "Eldrazi Tron", "Bob won 2-0-0", 2, 4),
+        (2, 3, "Eve", "Boros Energy", None, None, "Bye", None, "0-0-3", 5, None),
+    ]
+    cols = ["RoundId", "TableNumber_Cleaned", "Player", "PlayerDeck", "Opponent", "OpponentDeck", "Outcome",
+            "WinningDeck", "ResultString", "PlayerId", "OpponentId"]
+    return pd.DataFrame(rows, columns=cols)
+
+
+def test_results_and_matchups_from_both_perspectives(tmp_path):
+    conn = event_db.connect(tmp_path, create=True)
+    results = event_db.load_pairings(conn, _pairings())
+    # the bye is dropped; each remaining match appears once per side
+    assert len(results) == 8
+    assert conn.execute("SELECT COUNT(*) FROM pairings").fetchone()[0] == 5
+
+    boros = event_db.archetype_results(conn, "Boros Energy")
+    assert boros["Player"].tolist() == ["Ann", "Ann", "Dan"]
+    assert boros["Result"].tolist() == ["win", "draw", "loss"]
+    assert boros["PlayerId"].tolist() == [1, 1, 4]
+    assert boros["Outcome"].tolist()[2] == "cat lost"
+
+    event_db.build_matchups(conn)
+    assert event_db.matchup(conn, "Boros Energy", "Eldrazi Tron") == {"wins": 1, "losses": 1, "draws": 1, "total": 3}
+    assert event_db.matchup(conn, "Eldrazi Tron", "Boros Energy") == {"wins": 1, "losses": 1, "draws": 1, "total": 3}
+    # mirrors are excluded
+    assert event_db.matchup(conn, "Eldrazi Tron", "Eldrazi Tron") is None
+    totals = event_db.archetype_totals(conn).set_index("Archetype")
+    assert totals.loc["Boros Energy", "Total_Matches"] == 3
+    conn.close()
+
+
+def test_lookups_use_indexes(tmp_path):
+    conn = event_db.connect(tmp_path, create=True)
+    event_db.load_pairings(conn, _pairings())
+    event_db.build_matchups(conn)
+    for sql, params in [
+        ("SELECT * FROM results WHERE PlayerDeck = ?", ("Boros Energy",)),
+        ("SELECT * FROM results WHERE OpponentDeck = ?", ("Boros Energy",)),
+        ("SELECT * FROM results WHERE Player = ?", ("Ann",)),
+        ("SELECT * FROM results WHERE RoundId = ?", (2,)),
+        ("SELECT * FROM matchups WHERE Archetype = ? AND Opponent_Archetype = ?", ("Boros Energy", "Eldrazi Tron")),
+    ]:
+        plan = " ".join(str(r[-1]) for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        assert "USING INDEX" in plan, (sql, plan)
+    conn.close()
+
+
+def test_mirror_match_has_one_winner_and_one_loser(tmp_path):
+    cols = ["RoundId", "Player", "PlayerDeck", "Opponent", "OpponentDeck", "Outcome", "WinningDeck", "ResultString",
+            "PlayerId", "OpponentId", "WinnerId"]
+    pairings = pd.DataFrame(
+        [
+            (1, "Ann", "Burn", "Bob", "Burn", "Ann won", "Burn", "Ann won 2-0-0", 1, 2, 1),
+            # older artifact without IDs: the winner comes from ResultString
+            (2, "Cat", "Burn", "Dan", "Burn", "Dan won", "Burn", "Dan won 2-1-0", None, None, None),
+        ],
+        columns=cols,
+    )
+    conn = event_db.connect(tmp_path, create=True)
+    event_db.load_pairings(conn, pairings)
+    rows = conn.execute("SELECT Player, PlayerDeck, OpponentDeck, Result FROM results ORDER BY match_idx, side").fetchall()
+    assert rows == [
+        ("Ann", "Burn", "Burn", "win"),
+        ("Bob", "Burn", "Burn", "loss"),
+        ("Cat", "Burn", "Burn", "loss"),
+        ("Dan", "Burn", "Burn", "win"),
+    ]
+    conn.close()
+
+
+def test_matchups_sort_winrate_numerically(tmp_path):
+    rows = [
+        (1, 1, "Ann", "Burn", "Bob", "Tron", "Ann won", "Burn", "Ann won 2-0-0", 1, 2),
+        (1, 2, "Cat", "Burn", "Dan", "Scam", "Cat won", "Burn", "Cat won 2-0-0", 3, 4),
+        (2, 1, "Cat", "Burn", "Dan", "Scam", "Dan won", "Scam", "Dan won 2-0-0", 3, 4),
+        (2, 2, "Ann", "Burn", "Bob", "Tron", "Ann won", "Burn", "Ann won 2-1-0", 1, 2),
+    ]
+    conn = event_db.connect(tmp_path, create=True)
+    event_db.load_pairings(conn, pd.DataFrame(rows, columns=_pairings().columns))
+    event_db.build_matchups(conn)
+    burn = event_db.archetype_matchups(conn, "Burn")
+    # 100.0 above 50.0 (as text, "50.0" sorted first)
+    assert burn["Opponent_Archetype"].tolist() == ["Tron", "Scam"]
+    assert burn["Winrate"].tolist() == [100.0, 50.0]
+    conn.close()
@@ -0,0 +1,216 @@
+import random
+import time
+
+from scripts.fetch_decklists_api import DecklistScraper
+
+
+class _FakeResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+
+class _FakeSession:
+    """Serves a minimal deck page per GUID; GUIDs starting with 'bad' 404."""
+
+    def get(self, url, timeout=None):
+        guid = url.rsplit("/", 1)[-1]
+        time.sleep(random.uniform(0, 0.01))
+        if guid.startswith("bad"):
+            return _FakeResponse("", status_code=404)
+        html = (
+            f'<meta name="description" content="Deck - Player {guid} - Modern">'
+            '<div class="decklist-category"><div class="decklist-category-title">Main</div>'
+            f'<div class="decklist-record"><span class="decklist-record-quantity">4</span>'
+            f'<span class="decklist-record-name">Card {guid}</span></div></div>'
+        )
+        return _FakeResponse(html)
+
+
+def test_concurrent_process_guids_preserves_order_and_enrichment():
+    guids = [f"g{i}" for i in range(20)] + ["bad1"]
+    lookup = {f"Player G{i}": {"wins": str(i), "losses": "1", "draws": "0", "deck_archetype": "Arch"} for i in range(20)}
+    scraper = DecklistScraper(session=_FakeSession())
+
+    sequential = scraper.process_guids(guids, standings_lookup=lookup)
+    concurrent = scraper.process_guids(guids, standings_lookup=lookup, max_workers=8, requests_per_second=500)
+
+    assert concurrent == sequential
+    assert [r["deck_guid"] for r in concurrent] == [f"g{i}" for i in range(20)]
+    assert concurrent[3]["wins"] == "3"
+    assert concurrent[3]["deck_archetype"] == "Arch"
+
+
+class _FlakySession(_FakeSession):
+    """Fails each GUID starting with 'flaky' once before serving it."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, timeout=None):
+        guid = url.rsplit("/", 1)[-1]
+        self.calls.append(guid)
+        if guid.startswith("flaky") and self.calls.count(guid) == 1:
+            return _FakeResponse("", status_code=503)
+        return super().get(url, timeout=timeout)
+
+
+def test_journal_resumes_and_retries_failed_guids(tmp_path):
+    from utils.decklist_journal import DecklistJournal
+
+    session = _FlakySession()
+    scraper = DecklistScraper(session=session)
+    journal = DecklistJournal(tmp_path, max_attempts=2, backoff_s=0.01)
+    rows = scraper.process_guids(["g1", "flaky1", "bad1"], journal=journal, max_workers=2)
+
+    assert [r["deck_guid"] for r in rows] == ["g1", "flaky1"]
+    assert session.calls.count("flaky1") == 2
+    # a 404 is terminal: given up after one request instead of retried with backoff
+    assert session.calls.count("bad1") == 1
+    assert journal.exhausted(["bad1"]) == ["bad1"]
+
+    # a rerun only fetches what is missing; the exhausted GUID is not retried
+    session.calls.clear()
+    resumed = DecklistJournal(tmp_path, max_attempts=2, backoff_s=0.01)
+    again = scraper.process_guids(["g1", "flaky1", "bad1", "g2"], journal=resumed)
+    assert session.calls == ["g2"]
+    assert [r["deck_guid"] for r in again] == ["g1", "flaky1", "g2"]
+
+
+def test_journal_is_cleared_when_only_given_up_guids_remain(tmp_path):
+    from utils.decklist_journal import DecklistJournal
+
+    journal = DecklistJournal(tmp_path, max_attempts=3)
+    journal.record_success("g1", [{"card_name": "x"}])
+    journal.record_failure("bad1", 404)
+    journal.record_failure("flaky1", 503)
+    assert journal.pending(["g1", "bad1", "flaky1"]) == ["flaky1"]
+
+    journal.record_failure("flaky1", 503)
+    journal.record_failure("flaky1", 503)
+    assert journal.pending(["g1", "bad1", "flaky1"]) == []
+    journal.clear(keep_given_up=True)
+
+    assert not journal.journal_path.exists()
+    reloaded = DecklistJournal(tmp_path, max_attempts=3)
+    assert reloaded.exhausted(["g1", "bad1", "flaky1"]) == ["bad1", "flaky1"]
+    assert reloaded.pending(["g1", "bad1", "flaky1"]) == ["g1"]
+
+
+class _BlankSession(_FakeSession):
+    """Serves an empty 200 page for 'blank' GUIDs (always) and 'late' GUIDs (first request)."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, url, timeout=None):
+        guid = url.rsplit("/", 1)[-1]
+        self.calls.append(guid)
+        if guid.startswith("blank") or (guid.startswith("late") and self.calls.count(guid) == 1):
+            return _FakeResponse("<html><body></body></html>")
+        return super().get(url, timeout=timeout)
+
+
+def test_pages_without_cards_are_retried_until_the_budget_runs_out(tmp_path):
+    from utils.decklist_journal import DecklistJournal
+
+    session = _BlankSession()
+    journal = DecklistJournal(tmp_path, max_attempts=3, backoff_s=0.01)
+    rows = DecklistScraper(session=session).process_guids(["g1", "late1", "blank1"], journal=journal)
+
+    assert [r["deck_guid"] for r in rows] == ["g1", "late1"]
+    assert session.calls.count("late1") == 2
+    assert session.calls.count("blank1") == 3
+    assert journal.is_done("late1") and not journal.is_done("blank1")
+    assert journal.exhausted(["blank1"]) == ["blank1"]
+
+
+def test_offline_cache_miss_is_given_up_for_the_run_only(tmp_path):
+    from utils.decklist_journal import DecklistJournal
+    from utils.http_cache import OfflineCacheMiss
+
+    class _OfflineSession(_FakeSession):
+        def __init__(self):
+            self.calls = []
+
+        def get(self, url, timeout=None):
+            guid = url.rsplit("/", 1)[-1]
+            self.calls.append(guid)
+            if guid.startswith("miss"):
+                raise OfflineCacheMiss(f"Offline mode: no cached response for GET {url}")
+            return super().get(url, timeout=timeout)
+
+    session = _OfflineSession()
+    journal = DecklistJournal(tmp_path, max_attempts=4, backoff_s=60)
+    started = time.monotonic()
+    rows = DecklistScraper(session=session).process_guids(["g1", "miss1"], journal=journal)
+
+    assert [r["deck_guid"] for r in rows] == ["g1"]
+    assert session.calls.count("miss1") == 1
+    assert time.monotonic() - started < 30  # no backoff sleep
+    assert journal.exhausted(["miss1"]) == ["miss1"]
+    # the next (online) run fetches it again
+    assert DecklistJournal(tmp_path, max_attempts=4).pending(["g1", "miss1"]) == ["miss1"]
+
+
+def test_decklist_store_serves_known_guids_without_requests(tmp_path):
+    from utils.decklist_store import DecklistStore
+
+    store = DecklistStore(tmp_path / "store")
+    first = _FlakySession()
+    rows = DecklistScraper(session=first, store=store).process_guids(["g1", "g2"])
+    assert first.calls == ["g1", "g2"]
+    assert "g1" in store
+
+    # another event/run with the same GUIDs needs no decklist requests
+    second = _FlakySession()
+    again = DecklistScraper(session=second, store=store).process_guids(["g2", "g1"])
+    assert second.calls == []
+    assert [r["deck_guid"] for r in again] == ["g2", "g1"]
+    assert [r for r in again if r["deck_guid"] == "g1"] == [r for r in rows if r["deck_guid"] == "g1"]
+
+
+class _OfflineSession:
+    def get(self, url, timeout=None):
+        raise AssertionError(f"unexpected request: {url}")
+
+
+def test_archive_reparse_across_processes_without_network(tmp_path):
+    from utils.decklist_archive import DecklistArchive
+
+    guids = [f"g{i}" for i in range(6)]
+    fetched = DecklistScraper(session=_FakeSession(), archive=DecklistArchive(tmp_path)).process_guids(guids, parse_workers=1)
+    assert len(DecklistArchive(tmp_path)) == 6
+
+    offline = DecklistScraper(session=_OfflineSession(), archive=DecklistArchive(tmp_path))
+    reparsed = offline.process_guids(guids, parse_workers=2, reparse=True)
+    assert reparsed == fetched
+    assert [r["deck_guid"] for r in reparsed] == guids
+
+
+def test_fast_parse_matches_full_document_parse():
+    html = (
+        '<html><head><meta name="description" content="Deck - Doe, John - Modern"></head><body>'
+        '<nav><a href="/Profile/Org">Organizations</a></nav>'
+        '<h2>Main Deck</h2><div class="cards">'
+        '<div class="decklist-record"><span class="decklist-record-quantity">4</span><span class="decklist-record-name">Bolt</span></div>'
+        '<div class="decklist-record"><span class="decklist-record-quantity">2</span><span class="decklist-record-name">bolt</span></div>'
+        '</div><div id="side-cards"><div class="decklist-record"><span class="decklist-record-quantity">1</span>'
+        '<span class="decklist-record-name">Duress</span></div></div>'
+        '<h3>Sideboard</h3><div class="decklist-record"><span class="decklist-record-quantity">3</span>'
+        '<span class="decklist-record-name">Flusterstorm</span></div>'
+        + '<div class="row"><span>filler</span></div>' * 50 +
+        '</body></html>'
+    )
+    scraper = DecklistScraper(session=_OfflineSession())
+
+    full = scraper.extract_cards_and_player(scraper.build_payload(html), "g")
+    fast = scraper.parse_html(html, "g")
+
+    assert fast == full
+    assert [(r["card_name"], r["qty"], r["zone"]) for r in fast] == [
+        ("Bolt", 6, "main"),
+        ("Duress", 1, "side"),
+        ("Flusterstorm", 3, "side"),
+    ]
+    assert fast[0]["player"] == "John Doe"
@@ -0,0 +1,57 @@
+import json
+
+from utils.fetch_metrics import FetchMetrics, emit_run_metrics, endpoint_for
+
+
+def test_endpoint_labels():
+    assert endpoint_for("https://melee.gg/Tournament/View/123") == "tournament_view"
+    assert endpoint_for("https://melee.gg/Standing/GetRoundStandings") == "standings"
+    assert endpoint_for("https://melee.gg/Match/GetRoundMatches/77") == "pairings"
+    assert endpoint_for("https://melee.gg/Decklist/View/abc") == "decklist_view"
+    assert endpoint_for("https://melee.gg/Home") == "other"
+
+
+def test_summary_and_emitted_files(tmp_path, monkeypatch):
+    metrics = FetchMetrics()
+    url = "https://melee.gg/Decklist/View/abc"
+    for i in range(1, 11):
+        metrics.observe(url, latency_s=i / 100, status=200, nbytes=1000)
+    metrics.observe(url, latency_s=0.5, status=429, wait_s=0.25)
+    metrics.observe(url, latency_s=0.02, status=200, nbytes=1000, retry=True)
+    metrics.observe(url, status=None)
+    metrics.observe(url, cache_hit=True)
+    metrics.add_stage("decklist_parse", 1.5)
+
+    deck = metrics.summary()["endpoints"]["decklist_view"]
+    assert deck["requests"] == 13
+    assert deck["attempts"] == 13
+    assert deck["retries"] == 1
+    assert deck["cache_hits"] == 1
+    assert deck["bytes"] == 11000
+    assert deck["statuses"] == {"200": 11, "429": 1, "error": 1}
+    assert deck["latency_s"]["p50"] == 0.05
+    assert deck["latency_s"]["max"] == 0.5
+
+    monkeypatch.setenv("FETCH_METRICS_PROM_DIR", str(tmp_path / "prom"))
+    emit_run_metrics(metrics, tmp_path / "logs", "fetch_decklists_api", rows=3)
+    logged = [json.loads(line) for line in (tmp_path / "logs" / "fetch_metrics.jsonl").read_text().splitlines()]
+    assert logged[0]["script"] == "fetch_decklists_api" and logged[0]["rows"] == 3
+    assert logged[0]["stages_s"] == {"decklist_parse": 1.5}
+    prom = (tmp_path / "prom" / "melee_fetch_decklists_api.prom").read_text()
+    assert 'melee_fetch_requests_total{script="fetch_decklists_api",endpoint="decklist_view"} 13' in prom
+    assert 'melee_fetch_responses_total{script="fetch_decklists_api",endpoint="decklist_view",status="429"} 1' in prom
+
+
+def test_prom_file_per_event(tmp_path, monkeypatch):
+    monkeypatch.setenv("FETCH_METRICS_PROM_DIR", str(tmp_path / "prom"))
+    for event_id in (101, 202):
+        metrics = FetchMetrics()
+        metrics.observe("https://melee.gg/Match/GetRoundMatches/1", latency_s=0.1, status=200, nbytes=10)
+        emit_run_metrics(metrics, tmp_path / "logs", "fetch_pairings_api", event="Some Event", event_id=event_id)
+
+    assert sorted(p.name for p in (tmp_path / "prom").iterdir()) == [
+        "melee_fetch_pairings_api_101.prom",
+        "melee_fetch_pairings_api_202.prom",
+    ]
+    prom = (tmp_path / "prom" / "melee_fetch_pairings_api_202.prom").read_text()
+    assert 'melee_fetch_requests_total{script="fetch_pairings_api",event="202",endpoint="pairings"} 1' in prom
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from utils import http_client
+from utils.http_cache import IMMUTABLE, OfflineCacheMiss, ResponseCache, cache_key
+from utils.http_client import MeleeClient
+
+
+class _FakeResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+        self.headers = {"Content-Type": "application/json"}
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def _counting_client(monkeypatch, cache, offline=False, text='{"data": [1]}', status_code=200):
+    client = MeleeClient(cookie="", backoff_s=0, cache=cache, offline=offline)
+    calls = []
+
+    def fake_request(method, url, headers=None, timeout=None, **kwargs):
+        calls.append((method, url))
+        return _FakeResponse(text, status_code)
+
+    monkeypatch.setattr(client.session, "request", fake_request)
+    monkeypatch.setattr(http_client.time, "sleep", lambda s: None)
+    return client, calls
+
+
+def test_cache_key_depends_on_payload_not_field_order():
+    a = cache_key("post", "https://x/r", {"start": "0", "length": "100"})
+    b = cache_key("POST", "https://x/r", {"length": "100", "start": "0"})
+    c = cache_key("POST", "https://x/r", {"start": "100", "length": "100"})
+    assert a == b
+    assert a != c
+
+
+def test_immutable_entries_are_replayed_without_network(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path)
+    client, calls = _counting_client(monkeypatch, cache)
+
+    first = client.post("https://x/round", data={"start": "0"}, cache_ttl=IMMUTABLE)
+    second = client.post("https://x/round", data={"start": "0"}, cache_ttl=IMMUTABLE)
+
+    assert len(calls) == 1
+    assert second.json() == first.json() == {"data": [1]}
+    assert getattr(second, "from_cache", False)
+
+
+def test_expired_entries_refetch_and_errors_are_not_cached(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path)
+    client, calls = _counting_client(monkeypatch, cache)
+    client.post("https://x/live", data={"start": "0"}, cache_ttl=0)
+    client.post("https://x/live", data={"start": "0"}, cache_ttl=0)
+    assert len(calls) == 2
+
+    err_client, err_calls = _counting_client(monkeypatch, ResponseCache(tmp_path / "e"), status_code=404)
+    err_client.get("https://x/Decklist/View/abc")
+    err_client.get("https://x/Decklist/View/abc")
+    assert len(err_calls) == 2
+
+
+def test_offline_mode_replays_stale_entries_and_fails_on_miss(tmp_path, monkeypatch):
+    online, _ = _counting_client(monkeypatch, ResponseCache(tmp_path))
+    online.get("https://x/Decklist/View/abc")
+    online.post("https://x/live", data={"start": "0"}, cache_ttl=0)
+
+    offline, calls = _counting_client(monkeypatch, ResponseCache(tmp_path, offline=True), offline=True)
+    assert offline.get("https://x/Decklist/View/abc").status_code == 200
+    assert offline.post("https://x/live", data={"start": "0"}, cache_ttl=0).json() == {"data": [1]}
+    with pytest.raises(OfflineCacheMiss):
+        offline.get("https://x/Decklist/View/missing")
+    assert calls == []
+
+
+def test_cached_decklist_pages_do_not_spend_rate_tokens(tmp_path, monkeypatch):
+    from scripts.fetch_decklists_api import DecklistScraper
+
+    class CountingBucket(http_client.TokenBucket):
+        acquired = 0
+
+        def acquire(self):
+            CountingBucket.acquired += 1
+
+    client, calls = _counting_client(monkeypatch, ResponseCache(tmp_path), text="<html></html>")
+    scraper = DecklistScraper(session=client, view_url_template="https://x/Decklist/View/{}")
+    limiter = CountingBucket(1)
+    for _ in range(3):
+        assert scraper.fetch_raw("g1", limiter)[0] == 200
+
+    # one network request, one token; the replays come from the cache
+    assert len(calls) == 1
+    assert CountingBucket.acquired == 1
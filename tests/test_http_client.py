@@ -0,0 +1,154 @@
+import pytest
+import requests
+
+from utils import http_client
+from utils.http_client import AdaptiveConcurrency, MeleeClient
+
+
+class _FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def _client_with_responses(monkeypatch, statuses):
+    client = MeleeClient(cookie="c=1", max_retries=2, backoff_s=0)
+    calls = []
+    queue = list(statuses)
+
+    def fake_request(method, url, headers=None, timeout=None, **kwargs):
+        calls.append(dict(headers or {}))
+        return _FakeResponse(queue.pop(0))
+
+    monkeypatch.setattr(client.session, "request", fake_request)
+    monkeypatch.setattr(http_client.time, "sleep", lambda s: None)
+    return client, calls
+
+
+def test_retries_transient_statuses_then_returns(monkeypatch):
+    client, calls = _client_with_responses(monkeypatch, [503, 429, 200])
+    r = client.get("https://example.invalid/x")
+    assert r.status_code == 200
+    assert len(calls) == 3
+
+
+def test_retry_budget_is_bounded(monkeypatch):
+    client, calls = _client_with_responses(monkeypatch, [500, 500, 500, 500])
+    r = client.get("https://example.invalid/x")
+    assert r.status_code == 500
+    assert len(calls) == 3
+
+
+def test_csrf_scraped_once_and_refreshed_on_403(monkeypatch):
+    tokens = iter(["t1", "t2"])
+    scrapes = []
+
+    def fake_scrape(session, event_id, timeout=20, limiter=None):
+        scrapes.append(event_id)
+        return {"RequestVerificationToken": next(tokens)}
+
+    monkeypatch.setattr(http_client, "scrape_csrf_token", fake_scrape)
+    client, calls = _client_with_responses(monkeypatch, [200, 200, 403, 200])
+
+    client.post("https://example.invalid/a", event_id=7)
+    client.post("https://example.invalid/b", event_id=7)
+    client.post("https://example.invalid/c", event_id=7)
+
+    assert scrapes == [7, 7]
+    assert [c["RequestVerificationToken"] for c in calls] == ["t1", "t1", "t1", "t2"]
+    assert client.session.headers["Cookie"] == "c=1"
+
+
+def test_csrf_scrape_goes_through_the_client_and_limiter(monkeypatch):
+    class _CountingLimiter:
+        acquired = 0
+
+        def acquire(self):
+            self.acquired += 1
+
+    client = MeleeClient(cookie="", max_retries=0, backoff_s=0)
+    urls = []
+
+    def fake_request(method, url, headers=None, timeout=None, **kwargs):
+        urls.append((method, url))
+        r = _FakeResponse(200)
+        r.text = '<input name="__RequestVerificationToken" value="tok">'
+        r.raise_for_status = lambda: None
+        return r
+
+    monkeypatch.setattr(client.session, "request", fake_request)
+    limiter = _CountingLimiter()
+    client.post("https://example.invalid/a", event_id=7, limiter=limiter)
+
+    assert [m for m, _ in urls] == ["GET", "POST"]
+    assert urls[0][1].endswith("/Standing/Event/7")
+    assert limiter.acquired == 2
+    endpoints = client.metrics.summary()["endpoints"]
+    assert endpoints["csrf_token"]["requests"] == 1 and endpoints["other"]["requests"] == 1
+
+
+def test_connection_errors_are_retried(monkeypatch):
+    client = MeleeClient(cookie="", max_retries=1, backoff_s=0)
+    attempts = []
+
+    def flaky(method, url, headers=None, timeout=None, **kwargs):
+        attempts.append(url)
+        if len(attempts) == 1:
+            raise requests.ConnectionError("boom")
+        return _FakeResponse(200)
+
+    monkeypatch.setattr(client.session, "request", flaky)
+    monkeypatch.setattr(http_client.time, "sleep", lambda s: None)
+    assert client.get("https://example.invalid/x").status_code == 200
+    assert len(attempts) == 2
+
+
+def test_token_bucket_allows_burst_then_paces(monkeypatch):
+    clock = {"now": 0.0}
+    slept = []
+
+    def fake_sleep(seconds):
+        slept.append(seconds)
+        clock["now"] += seconds
+
+    monkeypatch.setattr(http_client.time, "monotonic", lambda: clock["now"])
+    monkeypatch.setattr(http_client.time, "sleep", fake_sleep)
+
+    bucket = http_client.TokenBucket(rate=2, burst=3)
+    for _ in range(5):
+        bucket.acquire()
+
+    # three banked tokens go immediately, the next two wait 0.5s each at 2 tokens/s
+    assert sum(slept) == 1.0
+
+
+def test_adaptive_concurrency_grows_on_healthy_latency_and_halves_once_per_congestion():
+    aimd = AdaptiveConcurrency(initial=2, max_limit=4)
+    for _ in range(4):
+        aimd.release(aimd.acquire(), latency_s=0.05, status=200)
+    assert 3 < aimd.limit < 4  # about +1 per limit-worth of responses
+
+    # slow responses hold the limit instead of growing it
+    before = aimd.limit
+    aimd.release(aimd.acquire(), latency_s=1.0, status=200)
+    assert aimd.limit == before
+
+    # two requests in flight when the server pushes back: only one decrease
+    a, b = aimd.acquire(), aimd.acquire()
+    aimd.release(a, latency_s=0.05, status=429)
+    aimd.release(b, latency_s=0.05, status=503)
+    assert aimd.limit == pytest.approx(before / 2)
+    assert aimd.in_flight == 0
+
+    for _ in range(50):
+        aimd.release(aimd.acquire(), latency_s=0.05, status=200)
+    assert aimd.limit == 4
+
+
+def test_client_feeds_status_and_retry_after_to_adaptive_concurrency(monkeypatch):
+    client, calls = _client_with_responses(monkeypatch, [429, 200])
+    client.concurrency = AdaptiveConcurrency(initial=4)
+    r = client.get("https://example.invalid/x")
+    assert r.status_code == 200
+    assert client.concurrency.limit == pytest.approx(2 + 1 / 2)
+    assert client.concurrency.in_flight == 0
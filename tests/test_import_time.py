@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import main
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+# self time of the repository's own modules, excluding third-party imports
+OWN_IMPORT_BUDGET_US = 250_000
+FETCH_ONLY = {"bs4", "requests"}
+
+
+def _importtime(module: str, tmp_path: Path) -> dict[str, int]:
+    env = dict(os.environ)
+    env.update({
+        "EVENT_DATA_DIR": str(tmp_path),
+        "EVENT_NAME": "Import Test",
+        # nothing listens here: any request at import time would fail the import
+        "MELEE_BASE_URL": "http://127.0.0.1:9",
+        "MELEE_HTTP_CACHE": "0",
+    })
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    self_us = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        self_us[name.strip()] = int(own)
+    return self_us
+
+
+@pytest.mark.parametrize("module", main.FETCH_MODULES + main.ANALYTICS_MODULES)
+def test_pipeline_modules_import_cheaply_and_without_side_effects(module, tmp_path):
+    self_us = _importtime(module, tmp_path)
+
+    assert module in self_us
+    assert list(tmp_path.iterdir()) == []  # no directories or files created on import
+    own = sum(us for name, us in self_us.items() if name.split(".")[0] in {"scripts", "utils", "main"})
+    assert own < OWN_IMPORT_BUDGET_US
+    if module in main.ANALYTICS_MODULES:
+        assert not FETCH_ONLY & set(self_us)
@@ -0,0 +1,45 @@
+import pandas as pd
+
+from utils.api_utils import merge_pairings_frames
+from utils.fetch_state import final_round_id, load_completed_round_ids, record_completed_round_ids
+
+
+def _pairings(rows):
+    return pd.DataFrame(
+        rows,
+        columns=["RoundId", "TableNumber_Cleaned", "Player", "PlayerDeck", "Opponent", "OpponentDeck", "Outcome", "WinningDeck", "ResultString"],
+    )
+
+
+def test_completed_round_state_roundtrip(tmp_path):
+    assert load_completed_round_ids(tmp_path, "pairings") == set()
+    record_completed_round_ids(tmp_path, "pairings", [3, 1])
+    record_completed_round_ids(tmp_path, "pairings", [2])
+    record_completed_round_ids(tmp_path, "standings", [9])
+    assert load_completed_round_ids(tmp_path, "pairings") == {1, 2, 3}
+    assert load_completed_round_ids(tmp_path, "standings") == {9}
+
+
+def test_merge_replaces_only_refreshed_rounds():
+    existing = _pairings([
+        [1, 1, "A", "X", "B", "Y", "A won", "X", "A won 2-0-0"],
+        [2, 1, "A", "X", "C", "Z", "Draw", None, "1-1-1 Draw"],
+    ])
+    fresh = _pairings([
+        [2, 1, "A", "X", "C", "Z", "A won", "X", "A won 2-1-0"],
+        [3, 2, "B", "Y", "C", "Z", "C won", "Z", "C won 2-0-0"],
+    ])
+
+    merged = merge_pairings_frames(existing, fresh, [2, 3])
+
+    assert merged["RoundId"].tolist() == [1, 2, 3]
+    assert merged.loc[merged["RoundId"] == 2, "Outcome"].item() == "A won"
+    assert list(merged.columns) == list(fresh.columns)
+
+
+def test_final_round_skips_unstarted_and_running_rounds():
+    # round 1004 has not started and 1003 is still running
+    assert final_round_id([1001, 1002, 1003, 1004], {1001, 1002}) == 1002
+    assert final_round_id([1001, 1002], {1001, 1002}) == 1002
+    # nothing finished yet: the caller falls back to fetching every round
+    assert final_round_id([1001], set()) is None
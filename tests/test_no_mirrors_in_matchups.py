@@ -1,8 +1,9 @@
 import os
 from pathlib import Path
-import pandas as pd
 import pytest
 
+from utils import event_db
+
 
 EVENT_DIR = os.getenv('EVENT_DATA_DIR')
 
@@ -10,12 +11,13 @@ EVENT_DIR = os.getenv('EVENT_DATA_DIR')
 @pytest.mark.skipif(not EVENT_DIR, reason="EVENT_DATA_DIR not set")
 def test_no_mirror_rows_in_matchups():
     event_dir = Path(EVENT_DIR) # type: ignore
-    mdir = event_dir / 'matchups'
-    if not mdir.exists():
-        pytest.skip('Matchups dir not found')
+    if not event_db.event_db_path(event_dir).exists():
+        pytest.skip('Event database not found')
 
-    for f in mdir.glob('* matchups.csv'):
-        archetype = f.stem.replace(' matchups', '')
-        df = pd.read_csv(f)
-        # Opponent_Archetype should never equal the file archetype (mirrors excluded)
-        assert not (df['Opponent_Archetype'] == archetype).any(), f"Mirror row found in {f.name}"
+    conn = event_db.connect(event_dir)
+    try:
+        # Opponent_Archetype should never equal the archetype (mirrors excluded)
+        mirrors = conn.execute("SELECT Archetype FROM matchups WHERE Archetype = Opponent_Archetype").fetchall()
+    finally:
+        conn.close()
+    assert not mirrors, f"Mirror rows found for {[m[0] for m in mirrors]}"
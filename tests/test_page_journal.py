@@ -0,0 +1,57 @@
+from utils.api_utils import iter_datatables_pages
+from utils.page_journal import PageJournal
+
+
+def test_journal_resumes_and_streams_last_copy(tmp_path):
+    journal = PageJournal(tmp_path, "pairings", 1)
+    journal.append_page(10, 0, [{"id": 1}, {"id": 2}])
+    journal.append_page(10, 2, [{"id": 3}])
+    journal.mark_round_done(10)
+    journal.append_page(11, 0, [{"id": "stale"}])
+    # simulate a crash mid-write
+    with journal.journal_path.open("a", encoding="utf-8") as fh:
+        fh.write('{"round_id": 11, "start": 2, "ro')
+
+    resumed = PageJournal(tmp_path, "pairings", 1)
+    assert resumed.is_round_done(10)
+    assert resumed.completed_starts(11) == {0}
+
+    # round 11 was still in progress: drop it and refetch
+    resumed.reset_rounds([11])
+    resumed.append_page(11, 0, [{"id": "fresh"}])
+    resumed.mark_round_done(11)
+
+    assert [r["id"] for r in resumed.iter_rows()] == [1, 2, 3, "fresh"]
+
+
+def test_journal_rows_can_be_limited_to_finished_rounds(tmp_path):
+    journal = PageJournal(tmp_path, "pairings", 1)
+    journal.append_page(10, 0, [{"id": 1}])
+    journal.mark_round_done(10)
+    # round 11 only got its first page
+    journal.append_page(11, 0, [{"id": "partial"}])
+
+    done = [rid for rid in sorted(journal.journaled_round_ids()) if journal.is_round_done(rid)]
+    assert done == [10]
+    assert [r["id"] for r in journal.iter_rows(done)] == [1]
+
+
+def test_journal_from_other_event_is_discarded(tmp_path):
+    PageJournal(tmp_path, "pairings", 1).append_page(10, 0, [{"id": 1}])
+    journal = PageJournal(tmp_path, "pairings", 2)
+    assert not journal.has_progress
+    assert list(journal.iter_rows()) == []
+
+
+def test_iter_pages_skips_journaled_starts():
+    data = list(range(7))
+    requested = []
+
+    def fetch_page(start, length):
+        requested.append(start)
+        return {"data": data[start:start + length], "recordsFiltered": len(data)}
+
+    pages = list(iter_datatables_pages(fetch_page, page_size=3, skip_starts={0, 3}))
+
+    assert pages == [(6, [6])]
+    assert sorted(requested) == [0, 6]
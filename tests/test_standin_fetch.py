@@ -0,0 +1,31 @@
+from scripts.fetch_decklists_api import DecklistScraper
+from tools.melee_standin import StandinConfig, StandinServer
+from utils.api_utils import TournamentPage, fetch_round_standings
+from utils.http_client import MeleeClient
+
+
+def test_fetchers_against_standin_server(monkeypatch):
+    config = StandinConfig(players=30, rounds=3, page_cap=8, rate_limit=200, burst=5, retry_after_s=0)
+    with StandinServer(config) as server:
+        monkeypatch.setenv("MELEE_BASE_URL", server.base_url)
+        monkeypatch.setenv("MELEE_COOKIE", "standin")
+        client = MeleeClient(backoff_s=0.001)
+
+        page = TournamentPage.fetch(client, config.event_id)
+        assert page.round_ids("standings") == [1003, 1002, 1001]
+
+        df = fetch_round_standings(1003, config.event_id, page_size=100, delay_s=0, client=client)
+        assert len(df) == 30
+        assert df["Rank"].tolist() == list(range(1, 31))
+        # every page beyond the capped first one was requested with the detected stride
+        assert server.stats[("standings", 200)] == 4
+
+        guids = [p["guid"] for p in server.event.players[:5]]
+        rows = DecklistScraper(session=client).process_guids(guids, max_workers=4)
+        assert {r["deck_guid"] for r in rows} == set(guids)
+        assert {r["zone"] for r in rows} == {"main", "side"}
+
+        endpoints = client.metrics.summary()["endpoints"]
+        assert endpoints["standings"]["requests"] == 4
+        assert endpoints["decklist_view"]["requests"] == 5
+        assert endpoints["decklist_view"]["bytes"] > 0
@@ -1,3 +1,5 @@
+import json
+
 import pandas as pd
 
 from scripts.fetch_decklists_api import build_standings_lookup_from_path
@@ -27,3 +29,92 @@ def test_build_standings_lookup_prefers_constructed_totals_from_summary(tmp_path
     assert lookup["Alice"]["wins"] == "10"
     assert lookup["Alice"]["losses"] == "2"
     assert lookup["Alice"]["draws"] == "1"
+
+
+def test_records_from_pairings_rebuilds_limited_split():
+    from utils.api_utils import records_from_pairings
+
+    pairings = pd.DataFrame(
+        [
+            [1, "Doe, John", "Roe, Jane", "Doe, John won 2-1-0"],
+            [1, "Smith, Ann", None, "Smith, Ann was assigned a bye"],
+            [2, "Doe, John", "Smith, Ann", "1-1-1 Draw"],
+            [2, "Roe, Jane", "Lee, Kim", "Not reported"],
+            [4, "Roe, Jane", "Doe, John", "Roe, Jane won 2-0-0"],
+        ],
+        columns=["RoundId", "Player", "Opponent", "ResultString"],
+    )
+
+    limited = records_from_pairings(pairings, round_ids=[1, 2], normalize=lambda n: " ".join(reversed(n.split(", "))))
+
+    assert limited["John Doe"] == {"wins": 1, "losses": 0, "draws": 1}
+    assert limited["Jane Roe"] == {"wins": 0, "losses": 1, "draws": 0}
+    assert limited["Ann Smith"] == {"wins": 1, "losses": 0, "draws": 1}
+    assert "Kim Lee" not in limited
+
+
+def test_pairings_carry_player_ids_and_records_join_on_them():
+    from utils.api_utils import process_raw_pairings_list, records_from_pairings
+
+    def comp(name, pid, guid):
+        return {"Team": {"Players": [{"ID": pid, "DisplayName": name}]}, "Decklists": [{"DecklistId": guid, "DecklistName": "Deck"}]}
+
+    pairings = process_raw_pairings_list([
+        {"RoundId": 1, "TableNumber": 1, "Competitors": [comp("Doe, John", 11, "g11"), comp("Roe, Jane", 12, "g12")], "ResultString": "Roe, Jane won 2-1-0"},
+        {"RoundId": 1, "TableNumber": 2, "Competitors": [comp("Smith, Ann", 13, "g13")], "ResultString": "Smith, Ann was assigned a bye"},
+        {"RoundId": 2, "TableNumber": 1, "Competitors": [comp("Doe, John", 11, "g11"), comp("Smith, Ann", 13, "g13")], "ResultString": "1-1-1 Draw"},
+    ])
+
+    assert pairings["WinnerId"].tolist()[:2] == [12, 13]
+    assert pairings["PlayerDecklistId"].tolist() == ["g11", "g13", "g11"]
+    assert pd.isna(pairings["WinnerId"].iloc[2])
+
+    records = records_from_pairings(pairings, by_id=True)
+    assert records[11] == {"wins": 0, "losses": 1, "draws": 1}
+    assert records[12] == {"wins": 1, "losses": 0, "draws": 0}
+    assert records[13] == {"wins": 1, "losses": 0, "draws": 1}
+
+
+def test_standings_lookup_joins_decks_on_guid(tmp_path):
+    from scripts.fetch_decklists_api import DecklistScraper
+
+    summary_path = tmp_path / "Event standings summary.csv"
+    summary_path.write_text(
+        "PlayerName,player_id,constructed_wins,constructed_losses,constructed_draws,decklist_guid,deck_archetype\n"
+        "Alice,42,7,3,0,GUID123,Burn\n",
+        encoding="utf-8-sig",
+    )
+    lookup = build_standings_lookup_from_path(summary_path)
+
+    # the scraped name differs from the standings name; the GUID still matches
+    rows = DecklistScraper.enrich_rows([{"player": "A. Liddell", "deck_guid": "GUID123", "card_name": "Bolt"}], lookup)
+    assert rows[0]["player_id"] == 42
+    assert rows[0]["wins"] == "7"
+    assert rows[0]["deck_archetype"] == "Burn"
+
+
+def test_flatten_standings_frame_types_nested_payload(tmp_path):
+    from utils.api_utils import flatten_standings_frame, write_standings_payload
+
+    team = {"Players": [{"ID": 7, "DisplayName": "Doe, John"}]}
+    decks = [{"DecklistId": "g7", "DecklistName": "Burn"}]
+    raw = pd.DataFrame([
+        {"Rank": 1, "Team": team, "Decklists": decks, "MatchRecord": "3-0-0"},
+        {"Rank": 2, "Team": {"Players": [{"DisplayName": "Roe, Jane"}]}, "Decklists": [], "MatchRecord": "2-1-0"},
+    ])
+
+    flat = flatten_standings_frame(raw)
+    assert list(flat.columns) == ["PlayerName", "PlayerId", "decklist_guid", "deck_archetype", "Rank", "MatchRecord"]
+    assert str(flat["PlayerId"].dtype) == "Int64"
+    assert flat.iloc[0][["PlayerName", "PlayerId", "decklist_guid", "deck_archetype"]].tolist() == ["Doe, John", 7, "g7", "Burn"]
+    assert pd.isna(flat["PlayerId"].iloc[1]) and pd.isna(flat["decklist_guid"].iloc[1])
+
+    # the side file keeps the untouched payload as JSON
+    path = write_standings_payload(raw, tmp_path / "round_1.jsonl")
+    first = json.loads(path.read_text(encoding="utf-8").splitlines()[0])
+    assert first["Team"] == team and first["Decklists"] == decks
+
+    # round files written by older runs held Python reprs of the payload
+    legacy = pd.DataFrame([{"Rank": 1, "Team": repr(team), "Decklists": repr(decks), "MatchRecord": "3-0-0"}])
+    assert flatten_standings_frame(legacy).iloc[0]["decklist_guid"] == "g7"
+    assert flatten_standings_frame(flat) is flat
@@ -0,0 +1,54 @@
+from utils.api_utils import TournamentPage, load_tournament_page
+
+HTML = """
+<div id="standings-round-selector-container">
+  <button class="round-selector" data-id="101" data-name="Round 1" data-is-started="True" data-is-completed="True"></button>
+  <button class="round-selector" data-id="102" data-name="Round 2" data-is-started="True" data-is-completed="False"></button>
+</div>
+<div id="pairings-round-selector-container">
+  <button class="round-selector" data-id="201" data-name="Round 1" data-is-started="True" data-is-completed="True"></button>
+  <button class="round-selector" data-id="202" data-name="Round 2" data-is-started="True" data-is-completed="True"></button>
+  <button class="round-selector" data-id="203" data-name="Round 3" data-is-started="False" data-is-completed="False"></button>
+</div>
+"""
+
+
+class _CountingSession:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, timeout=None):
+        self.calls += 1
+
+        class _R:
+            text = HTML
+
+            def raise_for_status(self):
+                pass
+
+        return _R()
+
+
+def test_single_parse_extracts_both_selectors():
+    page = TournamentPage.from_html(42, HTML)
+    assert page.round_ids("standings") == [102, 101]
+    assert page.round_ids("pairings") == [203, 202, 201]
+    assert page.round_metadata("standings")[1]["is_completed"] is False
+
+    classified = page.classify("pro-tour", mode="pairings")
+    assert classified["available_ids"] == [201, 202]
+    assert classified["limited_ids"] == [201, 202]
+
+
+def test_saved_page_is_reused_by_later_stages(tmp_path):
+    session = _CountingSession()
+    first = load_tournament_page(session, 42, tmp_path)
+    assert (tmp_path / TournamentPage.FILENAME).exists()
+
+    second = load_tournament_page(session, 42, tmp_path, max_age_s=None)
+    assert session.calls == 1
+    assert second.rounds == first.rounds
+
+    # a saved page for a different event is never reused
+    load_tournament_page(session, 43, tmp_path)
+    assert session.calls == 2
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from scripts.card_winrates_per_archetype import archetype_card_copy_winrates
+from utils.vocab import EventVocabulary, Vocabulary, vocab_path
+
+
+def test_vocabulary_codes_are_dense_stable_and_persisted(tmp_path):
+    vocab = Vocabulary()
+    codes = vocab.encode(pd.Series(["b", "a", None, "b"]))
+    assert codes.dtype == np.int32
+    assert codes.tolist() == [0, 1, -1, 0]
+    assert vocab.lookup(["a", "zzz"]).tolist() == [1, -1]
+    assert len(vocab) == 2
+    assert vocab.decode(codes).tolist() == ["b", "a", None, "b"]
+
+    event = EventVocabulary()
+    event.encode_frame(pd.DataFrame({"player": ["Ann"], "card_name": ["Bolt"]}))
+    event.save(vocab_path(tmp_path))
+    reloaded = EventVocabulary.load(vocab_path(tmp_path))
+    encoded = reloaded.encode_frame(pd.DataFrame({"player": ["Bob", "Ann"], "card_name": ["Bolt", "Island"]}))
+    # existing IDs keep their codes; new names are appended
+    assert encoded["player"].tolist() == [1, 0]
+    assert encoded["card_name"].tolist() == [0, 1]
+
+
+def test_card_winrates_on_encoded_frame_match_strings():
+    df = pd.DataFrame(
+        [
+            ("Ann", "Burn", "Bolt", 4, "main", 3, 1),
+            ("Ann", "Burn", "Skullcrack", 2, "side", 3, 1),
+            ("Bob", "Burn", "Bolt", 3, "main", 1, 3),
+            ("Cat", "Tron", "Karn", 4, "main", 2, 2),
+        ],
+        columns=["player", "deck_archetype", "card_name", "qty", "zone", "wins", "losses"],
+    )
+    vocab = EventVocabulary()
+    encoded = vocab.encode_frame(df)
+    assert encoded["card_name"].dtype == np.int32
+
+    plain = archetype_card_copy_winrates(df, "Burn", max_copies_cap=4)
+    coded = archetype_card_copy_winrates(encoded, "Burn", max_copies_cap=4, vocab=vocab)
+    pd.testing.assert_frame_equal(plain, coded)
+    bolt = coded[(coded["card"] == "Bolt") & (coded["# of Pilots"] > 0)]
+    assert bolt[["Copies", "Wins", "Losses"]].values.tolist() == [[3, 1, 3], [4, 3, 1]]
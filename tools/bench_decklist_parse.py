@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+
+"""Microbenchmark for the decklist HTML parser.
+
+Usage:
+    python tools/bench_decklist_parse.py --archive "data/RC Houston 2025"
+    python tools/bench_decklist_parse.py --html-dir path/to/saved/pages [--limit 500]
+
+Parses every page of the corpus twice:
+    reference   full html.parser document (DecklistScraper.build_payload +
+                extract_cards_and_player)
+    fast        DecklistScraper.parse_html (strained document, lxml when installed)
+
+and reports pages/s for both, the speedup, and how many pages produced
+different card rows. Exits non-zero if any page differs.
+
+The corpus is either the raw-HTML archive of an event directory
+(decklists_html.bin, written by scripts/fetch_decklists_api.py) or a
+directory of saved *.html pages.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Sequence
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import requests  # noqa: E402
+
+from scripts.fetch_decklists_api import FAST_HTML_PARSER, DecklistScraper  # noqa: E402
+from utils.decklist_archive import DecklistArchive  # noqa: E402
+
+
+def load_corpus(archive_dir: Path | None, html_dir: Path | None, limit: int | None) -> list[tuple[str, str]]:
+    pages: list[tuple[str, str]] = []
+    if archive_dir is not None:
+        pages.extend(DecklistArchive(archive_dir).iter_pages())
+    if html_dir is not None:
+        for path in sorted(html_dir.glob("*.html")):
+            pages.append((path.stem, path.read_text(encoding="utf-8")))
+    return pages[:limit] if limit else pages
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark the fast decklist parser against the full-document parser.")
+    parser.add_argument("--archive", type=Path, help="Event directory containing decklists_html.bin.")
+    parser.add_argument("--html-dir", type=Path, help="Directory of saved deck pages (*.html).")
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N pages.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _build_arg_parser().parse_args(argv)
+    pages = load_corpus(args.archive, args.html_dir, args.limit)
+    if not pages:
+        print("No pages found; pass --archive <event dir> or --html-dir <dir>.")
+        return 2
+
+    scraper = DecklistScraper(session=requests.Session())
+
+    start = time.perf_counter()
+    reference = [scraper.extract_cards_and_player(scraper.build_payload(html), guid) for guid, html in pages]
+    ref_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = [scraper.parse_html(html, guid) for guid, html in pages]
+    fast_s = time.perf_counter() - start
+
+    mismatches = [guid for (guid, _), a, b in zip(pages, reference, fast) if a != b]
+    n = len(pages)
+    print(f"pages: {n}  fast parser backend: {FAST_HTML_PARSER}")
+    print(f"reference: {ref_s:.3f}s ({n / ref_s:.1f} pages/s)")
+    print(f"fast:      {fast_s:.3f}s ({n / fast_s:.1f} pages/s)")
+    print(f"speedup:   {ref_s / fast_s:.2f}x")
+    print(f"mismatched pages: {len(mismatches)}")
+    for guid in mismatches[:10]:
+        print(f"  {guid}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+
+"""Fetch-layer throughput benchmark against the local melee.gg stand-in.
+
+Usage:
+    python tools/bench_fetch.py [--players 256] [--rounds 8] [--latency-ms 40]
+        [--jitter-ms 40] [--error-rate 0.02] [--rate-limit 30] [--page-cap 100]
+        [--json out.json]
+
+Starts tools/melee_standin.py in-process, points the fetchers at it
+(MELEE_BASE_URL, HTTP cache off), and runs each fetcher in turn:
+
+    round_metadata   TournamentPage.fetch (get_round_metadata)
+    standings        fetch_round_standings for every standings round
+    pairings         scripts.fetch_pairings_api.fetch_all_rounds_data
+    decklists        DecklistScraper.process_guids for every player's deck
+
+For each it reports wall time, requests served, requests/s, and the 429 and
+5xx responses the server sent (each one costs the client a retry). The
+stand-in is seeded, so runs with the same flags are directly comparable
+before and after a fetch-side change. Set MELEE_ADAPTIVE=0 to compare
+against fixed pacing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from tools.melee_standin import StandinServer, _build_arg_parser as _standin_args, config_from_args  # noqa: E402
+
+
+def _measure(server: StandinServer, name: str, fn: Callable[[], Any]) -> dict[str, Any]:
+    before = Counter(server.stats)
+    start = time.perf_counter()
+    fn()
+    wall = time.perf_counter() - start
+    served = server.stats - before
+    requests = sum(served.values())
+    throttled = sum(n for (_, status), n in served.items() if status == 429)
+    errors = sum(n for (_, status), n in served.items() if status >= 500)
+    return {
+        "fetcher": name,
+        "wall_s": round(wall, 3),
+        "requests": requests,
+        "requests_per_s": round(requests / wall, 1) if wall > 0 else None,
+        "throttled_429": throttled,
+        "errors_5xx": errors,
+    }
+
+
+def run_benchmark(args: argparse.Namespace) -> list[dict[str, Any]]:
+    config = config_from_args(args)
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_fetch_"))
+    with StandinServer(config) as server:
+        os.environ.update({
+            "MELEE_BASE_URL": server.base_url,
+            "MELEE_COOKIE": "standin",
+            "MELEE_HTTP_CACHE": "0",
+            "EVENT_ID": str(config.event_id),
+            "EVENT_NAME": "Standin",
+            "EVENT_DATA_DIR": str(work_dir),
+        })
+        # imported after the environment points at the stand-in
+        from scripts.fetch_decklists_api import DecklistScraper
+        from utils.api_utils import TournamentPage, fetch_round_standings
+        from utils.http_client import MeleeClient, concurrency_from_env
+
+        results = []
+        page_holder: dict[str, Any] = {}
+
+        def round_metadata() -> None:
+            page_holder["page"] = TournamentPage.fetch(MeleeClient(concurrency=concurrency_from_env()), config.event_id)
+
+        def standings() -> None:
+            client = MeleeClient(concurrency=concurrency_from_env())
+            for rid in page_holder["page"].round_ids("standings"):
+                fetch_round_standings(rid, config.event_id, page_size=args.page_size, client=client)
+
+        def pairings() -> None:
+            module = importlib.import_module("scripts.fetch_pairings_api")
+            module.fetch_all_rounds_data()
+
+        def decklists() -> None:
+            scraper = DecklistScraper(session=MeleeClient(concurrency=concurrency_from_env()))
+            scraper.process_guids(
+                [p["guid"] for p in server.event.players],
+                max_workers=args.decklist_workers,
+                requests_per_second=args.decklist_rps,
+            )
+
+        for name, fn in [("round_metadata", round_metadata), ("standings", standings), ("pairings", pairings), ("decklists", decklists)]:
+            results.append(_measure(server, name, fn))
+    return results
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the fetchers against the local melee.gg stand-in.",
+        parents=[_standin_args()],
+        conflict_handler="resolve",
+    )
+    parser.add_argument("--page-size", type=int, default=400, help="DataTables page size requested by the standings fetcher.")
+    parser.add_argument("--decklist-workers", type=int, default=8)
+    parser.add_argument("--decklist-rps", type=float, default=5)
+    parser.add_argument("--json", type=Path, default=None, help="Also write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    # fetcher chatter goes to stderr so the table stays readable
+    real_stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        results = run_benchmark(args)
+    finally:
+        sys.stdout = real_stdout
+
+    print(f"{'fetcher':<16}{'wall_s':>10}{'requests':>10}{'req/s':>10}{'429':>8}{'5xx':>8}")
+    for r in results:
+        print(f"{r['fetcher']:<16}{r['wall_s']:>10.3f}{r['requests']:>10}{r['requests_per_s'] or 0:>10.1f}{r['throttled_429']:>8}{r['errors_5xx']:>8}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
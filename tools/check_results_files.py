@@ -1,7 +1,18 @@
-import pandas as pd
+import os
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from utils import event_db  # noqa: E402
+
+# Results now live in the event database (<event>/event.sqlite), one row per side of each match
+conn = event_db.connect(os.getenv("EVENT_DATA_DIR") or "data/RC Houston 2025")
 
 # Read Esper Goryo's results
-df = pd.read_csv("data/RC Houston 2025/results/Esper Goryo's results.csv")
+df = event_db.archetype_results(conn, "Esper Goryo's")
 matches = df[df['OpponentDeck'] == 'Azorius Blink']
 
 print(f'Total matches in Esper Goryo\'s results: {len(matches)}')
@@ -15,8 +26,9 @@ print(matches['Outcome'].value_counts())
 print("\n" + "="*60)
 
 # Read Azorius Blink results
-df2 = pd.read_csv("data/RC Houston 2025/results/Azorius Blink results.csv")
+df2 = event_db.archetype_results(conn, "Azorius Blink")
 matches2 = df2[df2['OpponentDeck'] == "Esper Goryo's"]
+conn.close()
 
 print(f'\nTotal matches in Azorius Blink results: {len(matches2)}')
 print('\nWinningDeck value counts:')
@@ -28,5 +40,5 @@ print(matches2['Outcome'].value_counts())
 
 print("\n" + "="*60)
 print("\nLet's check the actual rows:")
-print("\nFrom Esper Goryo's results file:")
+print("\nFrom Esper Goryo's results:")
 print(matches[['Player', 'PlayerDeck', 'Opponent', 'OpponentDeck', 'WinningDeck', 'Outcome', 'ResultString']].head(20))
@@ -0,0 +1,373 @@
+#!/usr/bin/env python
+
+"""Local stand-in for the melee.gg endpoints the fetchers use.
+
+Usage:
+    python tools/melee_standin.py [--port 8765] [--players 256] [--rounds 8]
+        [--latency-ms 40] [--jitter-ms 40] [--error-rate 0.02] [--rate-limit 20]
+
+Then point the pipeline at it:
+    MELEE_BASE_URL=http://127.0.0.1:8765 MELEE_COOKIE=standin python main.py --event-id 1 --event-name "Standin"
+
+Serves a deterministic synthetic event (seeded):
+    GET  /Tournament/View/<event_id>         round selectors (standings + pairings)
+    GET  /Standing/Event/<event_id>          page carrying the anti-forgery token
+    POST /Standing/GetRoundStandings         DataTables standings JSON
+    POST /Match/GetRoundMatches/<round_id>   DataTables pairings JSON
+    GET  /Decklist/View/<guid>               decklist page
+
+with configurable latency, a random 503 error rate, a server-side cap on the
+DataTables `length`, and a token-bucket rate limit answered with 429 +
+Retry-After. DataTables POSTs without a cookie get the HTML login page, and
+POSTs with a wrong token get 403, like the live site. Per-endpoint status
+counts are kept in `StandinServer.stats` for benchmarks
+(tools/bench_fetch.py).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Sequence
+from urllib.parse import parse_qs, urlparse
+
+ARCHETYPES = ["Boros Energy", "Izzet Prowess", "Amulet Titan", "Eldrazi Tron", "Jeskai Control", "Goryo's Vengeance"]
+CSRF_TOKEN = "standin-token"
+LOGIN_PAGE = "<!DOCTYPE html><html><body>Please log in</body></html>"
+
+
+@dataclass
+class StandinConfig:
+    event_id: int = 1
+    players: int = 64
+    rounds: int = 6
+    limited_rounds: int = 0
+    seed: int = 7
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit: float = 0.0  # requests/s across all clients; 0 disables
+    burst: int = 10
+    retry_after_s: int = 1
+    page_cap: int | None = None  # server-side maximum DataTables 'length'
+
+
+class SyntheticEvent:
+    """Deterministic players, pairings, standings and decklists for one event."""
+
+    def __init__(self, config: StandinConfig):
+        self.config = config
+        rng = random.Random(config.seed)
+        self.players = [
+            {
+                "name": f"Player{i:03d} Standin",
+                "deck": rng.choice(ARCHETYPES),
+                "guid": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                "id": 50000 + i,
+            }
+            for i in range(config.players)
+        ]
+        self.guids = {p["guid"]: p for p in self.players}
+        self.standings_round_ids = [1000 + r for r in range(1, config.rounds + 1)]
+        self.pairings_round_ids = [2000 + r for r in range(1, config.rounds + 1)]
+        self.pairings: dict[int, list[dict[str, Any]]] = {}
+        self.standings: dict[int, list[dict[str, Any]]] = {}
+
+        records = {p["name"]: [0, 0, 0] for p in self.players}
+        for r in range(1, config.rounds + 1):
+            order = list(self.players)
+            random.Random(config.seed * 1000 + r).shuffle(order)
+            matches = []
+            for table, i in enumerate(range(0, len(order), 2), start=1):
+                pair = order[i:i + 2]
+                if len(pair) == 1:
+                    p = pair[0]
+                    records[p["name"]][0] += 1
+                    matches.append(self._match(table, pair, f"{p['name']} was assigned a bye"))
+                    continue
+                roll = rng.random()
+                if roll < 0.1:
+                    for p in pair:
+                        records[p["name"]][2] += 1
+                    matches.append(self._match(table, pair, "1-1-1 Draw"))
+                else:
+                    winner, loser = pair if roll < 0.55 else pair[::-1]
+                    records[winner["name"]][0] += 1
+                    records[loser["name"]][1] += 1
+                    matches.append(self._match(table, pair, f"{winner['name']} won 2-1-0"))
+            self.pairings[self.pairings_round_ids[r - 1]] = matches
+
+            ranked = sorted(self.players, key=lambda p: (-(3 * records[p["name"]][0] + records[p["name"]][2]), p["name"]))
+            self.standings[self.standings_round_ids[r - 1]] = [
+                {
+                    "Rank": rank,
+                    "Team": {"Players": [{"ID": p["id"], "DisplayName": p["name"]}]},
+                    "Decklists": [{"DecklistId": p["guid"], "DecklistName": p["deck"]}],
+                    "MatchRecord": "-".join(str(x) for x in records[p["name"]]),
+                    "Points": 3 * records[p["name"]][0] + records[p["name"]][2],
+                }
+                for rank, p in enumerate(ranked, start=1)
+            ]
+
+    @staticmethod
+    def _match(table: int, pair: list[dict[str, Any]], result: str) -> dict[str, Any]:
+        return {
+            "TableNumber": table,
+            "Competitors": [
+                {"Team": {"Players": [{"ID": p["id"], "DisplayName": p["name"]}]}, "Decklists": [{"DecklistName": p["deck"], "DecklistId": p["guid"]}]}
+                for p in pair
+            ],
+            "ResultString": result,
+        }
+
+    def tournament_page(self) -> str:
+        def buttons(ids: list[int]) -> str:
+            out = []
+            for r, rid in enumerate(ids, start=1):
+                phase = "Draft" if r <= self.config.limited_rounds else "Swiss"
+                out.append(
+                    f'<button class="round-selector" data-id="{rid}" data-name="Round {r}" '
+                    f'data-is-started="true" data-is-completed="true">{phase} Round {r}</button>'
+                )
+            return "".join(out)
+
+        return (
+            "<!DOCTYPE html><html><body>"
+            f'<div id="standings-round-selector-container">{buttons(self.standings_round_ids)}</div>'
+            f'<div id="pairings-round-selector-container">{buttons(self.pairings_round_ids)}</div>'
+            "</body></html>"
+        )
+
+    def decklist_page(self, guid: str) -> str | None:
+        p = self.guids.get(guid)
+        if p is None:
+            return None
+        rng = random.Random(guid)
+
+        def category(title: str, n_cards: int) -> str:
+            recs = "".join(
+                f'<div class="decklist-record"><span class="decklist-record-quantity">{rng.randint(1, 4)}</span>'
+                f'<span class="decklist-record-name">{p["deck"]} Card {i}</span></div>'
+                for i in range(n_cards)
+            )
+            return f'<div class="decklist-category"><div class="decklist-category-title">{title}</div>{recs}</div>'
+
+        return (
+            "<!DOCTYPE html><html><head>"
+            f'<meta name="description" content="{p["deck"]} - {p["name"]} - Modern"></head><body>'
+            + category("Main", 20)
+            + category("Sideboard", 8)
+            + "</body></html>"
+        )
+
+
+class StandinServer:
+    """ThreadingHTTPServer wrapper; usable as a context manager in tests and benchmarks."""
+
+    def __init__(self, config: StandinConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or StandinConfig()
+        self.event = SyntheticEvent(self.config)
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed + 1)
+        self._tokens = float(self.config.burst)
+        self._last = time.monotonic()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandinServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "StandinServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def record(self, endpoint: str, status: int) -> None:
+        with self._lock:
+            self.stats[(endpoint, status)] += 1
+
+    def admit(self) -> bool:
+        """Token-bucket admission for the rate limit; False means answer 429."""
+        if self.config.rate_limit <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.config.burst, self._tokens + (now - self._last) * self.config.rate_limit)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def should_fail(self) -> bool:
+        if self.config.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < self.config.error_rate
+
+    def simulate_latency(self) -> None:
+        delay_ms = self.config.latency_ms
+        if self.config.jitter_ms:
+            with self._lock:
+                delay_ms += self._rng.uniform(0, self.config.jitter_ms)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+
+
+def _make_handler(server: StandinServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:  # keep benchmark output clean
+            pass
+
+        def _send(self, endpoint: str, status: int, body: str, content_type: str = "text/html", headers: dict | None = None) -> None:
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+            server.record(endpoint, status)
+
+        def _gate(self, endpoint: str) -> bool:
+            """Latency, rate limit and random errors shared by every endpoint."""
+            server.simulate_latency()
+            if not server.admit():
+                self._send(endpoint, 429, "Too Many Requests", headers={"Retry-After": str(server.config.retry_after_s)})
+                return False
+            if server.should_fail():
+                self._send(endpoint, 503, "Service Unavailable")
+                return False
+            return True
+
+        def _datatable(self, endpoint: str, rows: list[dict[str, Any]], form: dict[str, str]) -> None:
+            start = int(form.get("start") or 0)
+            length = int(form.get("length") or 10)
+            if server.config.page_cap:
+                length = min(length, server.config.page_cap)
+            body = {
+                "draw": form.get("draw", "1"),
+                "recordsTotal": len(rows),
+                "recordsFiltered": len(rows),
+                "data": rows[start:start + length],
+            }
+            self._send(endpoint, 200, json.dumps(body), content_type="application/json")
+
+        def do_GET(self) -> None:
+            path = urlparse(self.path).path.rstrip("/")
+            parts = path.split("/")
+            if path.startswith("/Tournament/View/"):
+                if self._gate("tournament"):
+                    self._send("tournament", 200, server.event.tournament_page())
+            elif path.startswith("/Standing/Event/"):
+                if self._gate("csrf"):
+                    page = f'<html><body><input name="__RequestVerificationToken" value="{CSRF_TOKEN}"></body></html>'
+                    self._send("csrf", 200, page)
+            elif path.startswith("/Decklist/View/"):
+                if self._gate("decklist"):
+                    html = server.event.decklist_page(parts[-1])
+                    if html is None:
+                        self._send("decklist", 404, "Not Found")
+                    else:
+                        self._send("decklist", 200, html)
+            else:
+                self._send("other", 404, "Not Found")
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode("utf-8")).items()}
+            path = urlparse(self.path).path.rstrip("/")
+            endpoint = "standings" if path == "/Standing/GetRoundStandings" else "pairings" if path.startswith("/Match/GetRoundMatches/") else "other"
+            if endpoint == "other":
+                self._send("other", 404, "Not Found")
+                return
+            if not self._gate(endpoint):
+                return
+            if not self.headers.get("Cookie"):
+                self._send(endpoint, 200, LOGIN_PAGE)
+                return
+            if self.headers.get("RequestVerificationToken") != CSRF_TOKEN:
+                self._send(endpoint, 403, "Forbidden")
+                return
+            if endpoint == "standings":
+                rows = server.event.standings.get(int(form.get("roundId") or 0), [])
+            else:
+                rows = server.event.pairings.get(int(path.rsplit("/", 1)[-1]), [])
+            self._datatable(endpoint, rows, form)
+
+    return Handler
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Serve a synthetic melee.gg event locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--event-id", type=int, default=1)
+    parser.add_argument("--players", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=6)
+    parser.add_argument("--limited-rounds", type=int, default=0, help="Label the first N rounds as draft rounds.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed latency added to every response.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra uniform random latency per response.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503.")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests/s before answering 429 (0 = unlimited).")
+    parser.add_argument("--burst", type=int, default=10, help="Token-bucket burst for --rate-limit.")
+    parser.add_argument("--page-cap", type=int, default=None, help="Server-side maximum DataTables page length.")
+    return parser
+
+
+def config_from_args(args: argparse.Namespace) -> StandinConfig:
+    return StandinConfig(
+        event_id=args.event_id,
+        players=args.players,
+        rounds=args.rounds,
+        limited_rounds=args.limited_rounds,
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        page_cap=args.page_cap,
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _build_arg_parser().parse_args(argv)
+    server = StandinServer(config_from_args(args), host=args.host, port=args.port)
+    print(f"Serving synthetic event {args.event_id} at {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,15 +4,36 @@
 # @Author  : peterpiperpickedpeppers
 # @Link    : https://github.com/peterpiperpickedpeppers
 
-from bs4 import BeautifulSoup
 import requests
 import os
 import pandas as pd
 import time
 from dotenv import load_dotenv
-from typing import Any
-import json, ast
+from typing import Any, Callable, Iterable, Iterator
+import json
 import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from utils.http_cache import IMMUTABLE, TTL_LIVE_ROUND, TTL_TOURNAMENT_PAGE
+from utils.http_client import MeleeClient, TokenBucket, get_client, melee_url, scrape_csrf_token
+# payload parsing lives in a network-free module; re-exported for existing callers
+from utils.melee_payloads import (  # noqa: F401
+    PAIRINGS_ID_COLUMNS,
+    STANDINGS_FLAT_COLUMNS,
+    extract_competitor,
+    extract_competitor_ids,
+    extract_player_id,
+    flatten_standings_frame,
+    has_player_ids,
+    merge_pairings_frames,
+    parse_result_string,
+    process_raw_pairings_list,
+    records_from_pairings,
+    standings_extract_deck_info,
+    standings_extract_display_names,
+    write_standings_payload,
+)
 
 load_dotenv()
 
@@ -113,133 +134,272 @@ def standings_maybe_get_csrf_header(session: requests.Session, event_id: int) ->
     Try to fetch an anti-forgery token from the event page.
     If found, return {"RequestVerificationToken": token}; otherwise {}.
     """
-    try:
-        r = session.get(f"https://melee.gg/Standing/Event/{event_id}", timeout=20)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-        # common locations for CSRF token
-        inp = soup.find("input", {"name": "__RequestVerificationToken"})
-        if inp and inp.get("value"):
-            return {"RequestVerificationToken": inp["value"]}
-        meta = soup.find("meta", {"name": "__RequestVerificationToken"})
-        if meta and meta.get("content"):
-            return {"RequestVerificationToken": meta["content"]}
-    except Exception:
-        pass
-    return {}
-
-def fetch_round_standings(round_id: int, event_id: int, page_size: int = 100, delay_s: float = 0.2) -> pd.DataFrame:
-    cookie = os.environ.get("MELEE_COOKIE")
-    if not cookie:
+    return scrape_csrf_token(session, event_id)
+
+def fetch_round_standings(
+    round_id: int,
+    event_id: int,
+    page_size: int = 100,
+    delay_s: float | None = None,
+    client: MeleeClient | None = None,
+    completed: bool = False,
+    limiter: TokenBucket | None = None,
+) -> pd.DataFrame:
+    """Fetch every standings page for one round.
+
+    Pages after the first are fetched concurrently (see fetch_datatables_pages),
+    each paced by `limiter` when given. `completed` marks the round as final,
+    so its pages are cached forever instead of for TTL_LIVE_ROUND seconds.
+    `delay_s` defaults to no fixed pause when the client paces itself
+    adaptively, 0.2s otherwise.
+    """
+    # shared pooled client: connections and the event's CSRF token are reused across rounds
+    client = client or get_client()
+    if delay_s is None:
+        delay_s = 0.0 if client.concurrency is not None else 0.2
+    if not os.environ.get("MELEE_COOKIE") and not client.offline:
         raise RuntimeError("Set MELEE_COOKIE with your Cookie header from DevTools.")
-
-    s = requests.Session()
-    s.headers.update({
+    headers = {
         "Accept": "application/json, text/javascript, */*; q=0.01",
         "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-        "Origin": "https://melee.gg",
-        "Referer": f"https://melee.gg/Standing/Event/{event_id}",
+        "Origin": melee_url(),
+        "Referer": melee_url(f"/Standing/Event/{event_id}"),
         "X-Requested-With": "XMLHttpRequest",
-        "Cookie": cookie,
-    })
-    s.headers.update(standings_maybe_get_csrf_header(s, event_id))
-
-    all_rows = []
-    start = 0
-    page_num = 1
+    }
 
-    while True:
-        r = s.post(os.environ.get("MELEE_GET_STANDINGS_URL"), data=standings_make_payload(round_id, start=start, length=page_size), timeout=30) # type: ignore
+    def fetch_page(start: int, length: int) -> dict:
+        r = client.post(
+            os.environ.get("MELEE_GET_STANDINGS_URL") or melee_url("/Standing/GetRoundStandings"),
+            data=standings_make_payload(round_id, start=start, length=length),
+            headers=headers,
+            event_id=event_id,
+            cache_ttl=IMMUTABLE if completed else TTL_LIVE_ROUND,
+            limiter=limiter,
+        )
         if r.status_code >= 400:
             raise RuntimeError(f"Page fetch failed at start={start} ({r.status_code}).\n{r.text[:1000]}")
         j = r.json()
-        rows = j.get("data", j)
+        if delay_s and not getattr(r, "from_cache", False):
+            time.sleep(delay_s)
+        return j if isinstance(j, dict) else {"data": j}
 
-        n = len(rows)
-        if not n:
-            break
+    all_rows = fetch_datatables_pages(fetch_page, page_size=page_size)
+    print(f"Fetched {len(all_rows)} rows for round {round_id}")
+    return pd.DataFrame(all_rows)
 
-        all_rows.extend(rows)
-        print(f"Fetched page {page_num}: {n} rows (start={start})")
 
-        # advance; if server caps 'length' keep paging past that cap
-        start += page_size
-        page_num += 1
-        time.sleep(delay_s)
+def fetch_datatables_pages(
+    fetch_page: Callable[[int, int], dict],
+    page_size: int,
+    max_workers: int | None = None,
+) -> list[dict]:
+    """
+    Fetch every row of a server-side DataTables endpoint.
 
-        # stop when a short page is returned (means no more data)
-        if n < page_size:
-            break
+    `fetch_page(start, length)` must return the decoded JSON body. The first
+    page's `recordsFiltered`/`recordsTotal` gives the row count, so all
+    remaining `start` offsets are known up front and fetched concurrently.
+    If the server silently caps `length`, the cap is detected from the first
+    page (fewer rows than requested while more remain) and used as the stride.
+    Responses without totals fall back to serial paging until a short page.
 
-    return pd.DataFrame(all_rows)
-
-def standings_extract_display_names(team_entry: Any) -> str | None:
+    Returns rows in offset order.
+    """
+    rows: list[dict] = []
+    for _, page in iter_datatables_pages(fetch_page, page_size, max_workers=max_workers):
+        rows.extend(page)
+    return rows
+
+
+def iter_datatables_pages(
+    fetch_page: Callable[[int, int], dict],
+    page_size: int,
+    max_workers: int | None = None,
+    skip_starts: set[int] | frozenset[int] = frozenset(),
+) -> Iterator[tuple[int, list[dict]]]:
     """
-    Return a comma-separated string of player display names from a Team object.
-    Accepts:
-      - dict (already-parsed team payload)
-      - str (JSON or Python-literal dict)
-      - None / NaN-like -> None
-    Tries DisplayName, then DisplayNameLastFirst, then Username, then Name.
+    Yield `(start, rows)` for every page of a DataTables endpoint, in offset order.
+
+    Same paging strategy as fetch_datatables_pages, but pages are handed over
+    as they arrive instead of being accumulated. Offsets in `skip_starts`
+    (already journaled by a previous run) are neither fetched nor yielded,
+    except the first page, which is always fetched to learn the row count.
     """
-    if team_entry is None:
-        return None
+    if max_workers is None:
+        max_workers = int(os.environ.get("DATATABLES_PAGE_WORKERS") or 4)
 
-    # Handle NaN-like values without importing numpy
+    first = fetch_page(0, page_size)
+    rows = list(first.get("data", []) or [])
+    if not rows:
+        return
+    if 0 not in skip_starts:
+        yield 0, rows
+
+    total_raw = first.get("recordsFiltered", first.get("recordsTotal"))
     try:
-        # floats can be NaN; NaN != NaN
-        if isinstance(team_entry, float) and team_entry != team_entry:
-            return None
-    except Exception:
-        pass
+        total = int(total_raw)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        total = None
 
-    team: dict[str, Any] | None = None
+    # short first page with more rows remaining => server-side cap on 'length'
+    stride = page_size
+    if total is not None and len(rows) < page_size and len(rows) < total:
+        stride = len(rows)
 
-    if isinstance(team_entry, dict):
-        team = team_entry
-    elif isinstance(team_entry, str):
-        s = team_entry.strip()
-        if not s:
-            return None
-        # Try JSON first, then Python-literal (handles single quotes)
-        try:
-            team = json.loads(s)
-        except json.JSONDecodeError:
-            try:
-                team = ast.literal_eval(s)
-            except Exception:
-                return None
-    else:
-        return None
+    if total is None:
+        start = len(rows)
+        n = len(rows)
+        while n >= stride:
+            page = list(fetch_page(start, stride).get("data", []) or [])
+            n = len(page)
+            if not n:
+                break
+            if start not in skip_starts:
+                yield start, page
+            start += n
+        return
+
+    offsets = [start for start in range(stride, total, stride) if start not in skip_starts]
+    if not offsets:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(offsets)))) as pool:
+        pages = pool.map(lambda start: fetch_page(start, stride).get("data", []) or [], offsets)
+        for start, page in zip(offsets, pages):
+            yield start, page
+
+ROUND_SELECTORS = {
+    "standings": "#standings-round-selector-container .round-selector",
+    "pairings": "#pairings-round-selector-container .round-selector",
+}
+
+
+def _parse_round_selector_buttons(btns) -> list[dict[str, Any]]:
+    out: list[dict[str, Any]] = []
+    for b in btns:
+        rid_raw = (b.get("data-id") or "").strip()  # type: ignore
+        if not rid_raw.isdigit():
+            continue
+        rid = int(rid_raw)
+        name = (b.get("data-name") or "").strip()  # type: ignore
+        if not name:
+            name = " ".join(b.get_text(" ", strip=True).split())
+        m = re.search(r"round\s+(\d+)", name, flags=re.I)
+        round_number = int(m.group(1)) if m else None
 
-    if not isinstance(team, dict):
-        return None
+        started_raw = b.get("data-is-started")
+        completed_raw = b.get("data-is-completed")
+        is_started = None if started_raw is None else str(started_raw).strip().lower() == "true"
+        is_completed = None if completed_raw is None else str(completed_raw).strip().lower() == "true"
 
-    players = team.get("Players") or team.get("players")
+        out.append(
+            {
+                "id": rid,
+                "name": name,
+                "round_number": round_number,
+                "is_started": is_started,
+                "is_completed": is_completed,
+            }
+        )
+    return out
 
-    # Sometimes the payload is a single player dict instead of a Team dict
-    if isinstance(players, dict):
-        players = [players]
 
-    if not isinstance(players, list):
-        return None
+class TournamentPage:
+    """
+    Round selectors of `https://melee.gg/Tournament/View/{event_id}`, fetched and parsed once.
 
-    names: list[str] = []
-    for p in players:
-        if not isinstance(p, dict):
-            continue
-        name = (
-            p.get("DisplayName")
-            or p.get("DisplayNameLastFirst")
-            or p.get("Username")
-            or p.get("Name")
-        )
-        if name:
-            names.append(str(name))
+    Both the standings and pairings round selectors are extracted from a single
+    parse. `save()` persists them to `<event_dir>/round_metadata.json` so later
+    pipeline stages read round metadata locally instead of re-downloading the page.
+    """
+
+    FILENAME = "round_metadata.json"
+
+    def __init__(self, event_id: int, rounds: dict[str, list[dict[str, Any]]], fetched_at: float | None = None):
+        self.event_id = int(event_id)
+        self.rounds = rounds
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+    @classmethod
+    def from_html(cls, event_id: int, html: str) -> "TournamentPage":
+        from bs4 import BeautifulSoup  # only the fetch stages parse HTML
+
+        soup = BeautifulSoup(html, "html.parser")
+        rounds = {mode: _parse_round_selector_buttons(soup.select(sel)) for mode, sel in ROUND_SELECTORS.items()}
+        return cls(event_id, rounds)
+
+    @classmethod
+    def fetch(cls, session: requests.Session, event_id: int, limiter: TokenBucket | None = None) -> "TournamentPage":
+        # MeleeClient paces only real requests (not cache hits); plain sessions take a token here
+        kwargs: dict[str, Any] = {}
+        if isinstance(session, MeleeClient):
+            kwargs["limiter"] = limiter
+        elif limiter is not None:
+            limiter.acquire()
+        r = session.get(melee_url(f"/Tournament/View/{event_id}"), timeout=30, **kwargs)
+        r.raise_for_status()
+        return cls.from_html(event_id, r.text)
 
-    return ", ".join(names) if names else None
+    @classmethod
+    def load(cls, event_dir: Path | str, event_id: int | None = None) -> "TournamentPage | None":
+        """Load a saved page; returns None if missing, unreadable or saved for another event."""
+        path = Path(event_dir) / cls.FILENAME
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if event_id is not None and int(raw.get("event_id", -1)) != int(event_id):
+            return None
+        return cls(int(raw["event_id"]), raw.get("rounds") or {}, fetched_at=float(raw.get("fetched_at", 0)))
+
+    def save(self, event_dir: Path | str) -> Path:
+        path = Path(event_dir) / self.FILENAME
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"event_id": self.event_id, "fetched_at": self.fetched_at, "rounds": self.rounds}
+        path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        return path
+
+    def round_metadata(self, mode: str = "standings") -> list[dict[str, Any]]:
+        if mode not in ROUND_SELECTORS:
+            raise ValueError("mode must be 'standings' or 'pairings'")
+        return [dict(m) for m in self.rounds.get(mode, [])]
+
+    def round_ids(self, mode: str = "standings") -> list[int]:
+        """Round IDs in newest→oldest order."""
+        return [int(m["id"]) for m in reversed(self.round_metadata(mode))]
+
+    def classify(self, event_type: str, mode: str = "pairings") -> dict[str, Any]:
+        return _classify_round_metadata(self.round_metadata(mode), event_type, mode)
+
+
+def load_tournament_page(
+    session: requests.Session,
+    event_id: int,
+    event_dir: Path | str | None = None,
+    max_age_s: float | None = TTL_TOURNAMENT_PAGE,
+    limiter: TokenBucket | None = None,
+) -> TournamentPage:
+    """
+    Return the event's TournamentPage, preferring `<event_dir>/round_metadata.json`.
 
-def get_round_ids(session: requests.Session, event_id: int, mode: str = "standings") -> list[int]:
+    The saved copy is used when it is younger than `max_age_s` (None = any age);
+    otherwise the page is fetched once (paced by `limiter`) and saved back to `event_dir`.
+    """
+    if event_dir is not None:
+        page = TournamentPage.load(event_dir, event_id)
+        if page is not None and (max_age_s is None or time.time() - page.fetched_at <= max_age_s):
+            return page
+    page = TournamentPage.fetch(session, event_id, limiter=limiter)
+    if event_dir is not None:
+        page.save(event_dir)
+    return page
+
+
+def get_round_ids(
+    session: requests.Session,
+    event_id: int,
+    mode: str = "standings",
+    page: TournamentPage | None = None,
+) -> list[int]:
     """
     Fetch round IDs from a Melee tournament page.
 
@@ -247,36 +407,24 @@ def get_round_ids(session: requests.Session, event_id: int, mode: str = "standin
         session (requests.Session): Active session with headers/cookies.
         event_id (int): The tournament's event ID.
         mode (str): Either "standings" or "pairings" — determines which selector to scrape.
+        page (TournamentPage): Already-parsed page to reuse instead of fetching.
 
     Returns:
         list[int]: Round IDs in newest→oldest order.
     """
     # Validate argument early
-    if mode not in {"standings", "pairings"}:
+    if mode not in ROUND_SELECTORS:
         raise ValueError("mode must be 'standings' or 'pairings'")
+    page = page or TournamentPage.fetch(session, event_id)
+    return page.round_ids(mode)
 
-    r = session.get(f"https://melee.gg/Tournament/View/{event_id}", timeout=30)
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
-
-    # Choose the right selector based on mode
-    if mode == "standings":
-        btns = soup.select("#standings-round-selector-container .round-selector")
-    else:
-        btns = soup.select("#pairings-round-selector-container .round-selector")
-
-    ids = []
-    for b in btns:
-        rid = (b.get("data-id") or "").strip()  # type: ignore
-        if rid.isdigit():
-            ids.append(int(rid))
-
-    # Return newest → oldest
-    ids.reverse()
-    return ids
 
-
-def get_round_metadata(session: requests.Session, event_id: int, mode: str = "standings") -> list[dict[str, Any]]:
+def get_round_metadata(
+    session: requests.Session,
+    event_id: int,
+    mode: str = "standings",
+    page: TournamentPage | None = None,
+) -> list[dict[str, Any]]:
     """
     Return per-round metadata from the tournament page.
 
@@ -287,46 +435,12 @@ def get_round_metadata(session: requests.Session, event_id: int, mode: str = "st
       - is_started / is_completed: bool | None (depending on selector attrs)
 
     Order is as displayed on the page (typically chronological for numbered rounds).
+    Pass `page` to reuse an already-parsed TournamentPage.
     """
-    if mode not in {"standings", "pairings"}:
+    if mode not in ROUND_SELECTORS:
         raise ValueError("mode must be 'standings' or 'pairings'")
-
-    r = session.get(f"https://melee.gg/Tournament/View/{event_id}", timeout=30)
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
-
-    if mode == "standings":
-        btns = soup.select("#standings-round-selector-container .round-selector")
-    else:
-        btns = soup.select("#pairings-round-selector-container .round-selector")
-
-    out: list[dict[str, Any]] = []
-    for b in btns:
-        rid_raw = (b.get("data-id") or "").strip()  # type: ignore
-        if not rid_raw.isdigit():
-            continue
-        rid = int(rid_raw)
-        name = (b.get("data-name") or "").strip()  # type: ignore
-        if not name:
-            name = " ".join(b.get_text(" ", strip=True).split())
-        m = re.search(r"round\s+(\d+)", name, flags=re.I)
-        round_number = int(m.group(1)) if m else None
-
-        started_raw = b.get("data-is-started")
-        completed_raw = b.get("data-is-completed")
-        is_started = None if started_raw is None else str(started_raw).strip().lower() == "true"
-        is_completed = None if completed_raw is None else str(completed_raw).strip().lower() == "true"
-
-        out.append(
-            {
-                "id": rid,
-                "name": name,
-                "round_number": round_number,
-                "is_started": is_started,
-                "is_completed": is_completed,
-            }
-        )
-    return out
+    page = page or TournamentPage.fetch(session, event_id)
+    return page.round_metadata(mode)
 
 
 def get_limited_round_numbers_for_event_type(event_type: str) -> set[int]:
@@ -346,7 +460,13 @@ def get_limited_round_numbers_for_event_type(event_type: str) -> set[int]:
     return set()
 
 
-def classify_event_round_ids(session: requests.Session, event_id: int, event_type: str, mode: str = "pairings") -> dict[str, Any]:
+def classify_event_round_ids(
+    session: requests.Session,
+    event_id: int,
+    event_type: str,
+    mode: str = "pairings",
+    page: TournamentPage | None = None,
+) -> dict[str, Any]:
     """
     Classify rounds into constructed vs limited using event type + round metadata.
 
@@ -357,7 +477,11 @@ def classify_event_round_ids(session: requests.Session, event_id: int, event_typ
       - constructed_ids
       - metadata
     """
-    metadata = get_round_metadata(session, event_id, mode=mode)
+    metadata = get_round_metadata(session, event_id, mode=mode, page=page)
+    return _classify_round_metadata(metadata, event_type, mode)
+
+
+def _classify_round_metadata(metadata: list[dict[str, Any]], event_type: str, mode: str) -> dict[str, Any]:
     limited_round_numbers = get_limited_round_numbers_for_event_type(event_type)
 
     if mode == "pairings":
@@ -384,146 +508,6 @@ def classify_event_round_ids(session: requests.Session, event_id: int, event_typ
         "metadata": metadata,
     }
 
-# pairings api utils
-def parse_result_string(result: str):
-    """
-    Parses the ResultString column to determine the outcome.
-    Return (winner_name, is_draw, is_bye)
-    winner_name is None on draw/bye.
-    """
-    if not isinstance(result, str):
-        return (None, False, False)
-    s = result.strip()
-    if "was assigned a bye" in s:
-        # e.g. "doejurko was assigned a bye"
-        who = s.replace(" was assigned a bye", "").strip()
-        return (who, False, True)
-    if "Draw" in s or "-0-3 Draw" in s or "0-0-3" in s:
-        return (None, True, False)
-    # e.g. "Sam Clayton won 2-0-0"
-    if " won " in s:
-        return (s.split(" won ", 1)[0].strip(), False, False)
-    return (None, False, False)
-
-def extract_competitor(comp: dict):
-    """
-    From one competitor dictionary (from the JSON row), pull player name and their first decklist name.
-    Returns (name, deck)
-    """
-    # Player name (DisplayName preferred)
-    name = None
-    try:
-        players = comp.get("Team", {}).get("Players", [])
-        if players and isinstance(players, list):
-            p = players[0] or {}
-            name = p.get("DisplayName") or p.get("DisplayNameLastFirst") or p.get("Username")
-            if name:
-                name = name.strip()
-    except Exception:
-        pass
-
-    # Decklist name (first decklist if present)
-    deck = None
-    try:
-        decks = comp.get("Decklists", [])
-        if decks and isinstance(decks, list):
-            deck_name = decks[0].get("DecklistName")
-            if deck_name:
-                deck = deck_name.strip()
-    except Exception:
-        pass
-
-    return name, deck
-
-def process_raw_pairings_list(raw_pairings_list: list) -> pd.DataFrame:
-    """
-    Convert the aggregated list of Melee match dictionaries into a rectangular DF,
-    performing cleanup and column standardization.
-    """
-    # NOTE: This function relies on parse_result_string and extract_competitor
-    # being available in the same module scope, which is why we moved them here.
-    
-    rows = []
-    for m in raw_pairings_list:
-        # The raw list already contains the 'RoundId' which was injected during fetching
-        round_id = m.get("RoundId")
-        result = m.get("ResultString")
-        winner_name, is_draw, is_bye = parse_result_string(result)
-
-        # Competitors list comes from the 'Competitors' key in the raw match dict
-        comps = m.get("Competitors", []) or [] 
-        
-        # Normalize two sides; some entries (bye) have only one competitor
-        if len(comps) == 2:
-            p1_name, p1_deck = extract_competitor(comps[0])
-            p2_name, p2_deck = extract_competitor(comps[1])
-        elif len(comps) == 1:
-            p1_name, p1_deck = extract_competitor(comps[0])
-            p2_name, p2_deck = None, None
-        else:
-            # Skip totally malformed rows (or rows with 0 or >2 competitors)
-            continue
-
-        # Decide outcome/winning deck
-        if is_bye:
-            outcome = "Bye"
-            winning_deck = p1_deck if winner_name == p1_name else None
-        elif is_draw:
-            outcome = "Draw"
-            winning_deck = None
-        else:
-            if winner_name and winner_name == p1_name:
-                outcome = f"{p1_name} won"
-                winning_deck = p1_deck
-            elif winner_name and winner_name == p2_name:
-                outcome = f"{p2_name} won"
-                winning_deck = p2_deck
-            else:
-                # Unknown/edge case – keep original string
-                outcome = result or "Unknown"
-                winning_deck = None
-
-        rows.append({
-            "RoundId": round_id,
-            "TableNumber": m.get("TableNumberDescription") or m.get("TableNumber"),
-            "Player": p1_name,
-            "PlayerDeck": p1_deck,
-            "Opponent": p2_name,
-            "OpponentDeck": p2_deck,
-            "Outcome": outcome,
-            "WinningDeck": winning_deck,
-            "ResultString": result,
-        })
-
-    df = pd.DataFrame(rows)
-    
-    # --- Robust Table Number Extraction for Sorting ---
-    with pd.option_context("mode.chained_assignment", None):
-        # Convert original column to string
-        table_series = df["TableNumber"].astype(str)
-        
-        # 1. Attempt to extract the number from HTML (TableNumberDescription)
-        extracted_from_html = table_series.str.extract(r'>(\d+)<', expand=False)
-        
-        # 2. Fallback to the original string if HTML extraction failed (e.g., if it was just '10')
-        df["Table_Numeric"] = extracted_from_html.fillna(table_series)
-        
-        # 3. Final conversion to numeric, coercing any non-numeric value to NaN
-        df["Table_Numeric"] = pd.to_numeric(df["Table_Numeric"], errors="coerce")
-
-    # Fill NaNs with a large sentinel value (9999) so they sort last
-    df["Table_Numeric"] = df["Table_Numeric"].fillna(9999).astype(int) 
-
-    # Sort by the numeric Table column
-    df = df.sort_values(["RoundId", "Table_Numeric", "Player"], na_position="last").reset_index(drop=True)
-    
-    # Rename the cleaned column
-    df = df.rename(columns={'Table_Numeric': 'TableNumber_Cleaned'})
-    
-    # Select final columns 
-    final_cols = ['RoundId', 'TableNumber_Cleaned', 'Player', 'PlayerDeck', 'Opponent', 'OpponentDeck', 'Outcome', 'WinningDeck', 'ResultString']
-    return df[final_cols]
-
 def make_payload(start: int, length: int) -> dict:
     """Generates the DataTables payload with updated start/length values."""
     # (Payload structure remains the same)
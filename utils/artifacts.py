@@ -0,0 +1,251 @@
+"""Typed, columnar storage for the pipeline's tabular artifacts.
+
+Pairings, decklists and standings are written with a declared schema
+(SCHEMAS) so readers get the same dtypes back without re-inferring them.
+Each artifact keeps its historical CSV path as its name; the columnar copy
+sits next to it with a different suffix:
+
+    <event> pairings.csv      -> <event> pairings.parquet
+    modern_rcs_all_decklists.csv -> modern_rcs_all_decklists.arrow
+
+Parquet is the default columnar format; Arrow IPC (`.arrow`) is used for hot
+intermediates that are re-read often, since it can be memory-mapped instead of
+decoded. Both need pyarrow; without it everything stays CSV.
+
+Environment:
+    ARTIFACT_FORMAT  csv | parquet | arrow (default: parquet when pyarrow is
+                     installed, else csv); overrides per-artifact defaults
+    ARTIFACT_CSV     1/0, also write the CSV for humans next to a columnar
+                     artifact (default 1)
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+from pathlib import Path
+from typing import Any, Iterable
+
+import pandas as pd
+
+# declared dtypes; columns an artifact does not list keep pandas' inference
+SCHEMAS: dict[str, dict[str, str]] = {
+    "pairings": {
+        "RoundId": "Int64",
+        "TableNumber_Cleaned": "Int64",
+        "Player": "string",
+        "PlayerDeck": "string",
+        "Opponent": "string",
+        "OpponentDeck": "string",
+        "Outcome": "string",
+        "WinningDeck": "string",
+        "ResultString": "string",
+        "PlayerId": "Int64",
+        "OpponentId": "Int64",
+        "WinnerId": "Int64",
+        "PlayerDecklistId": "string",
+        "OpponentDecklistId": "string",
+    },
+    # one row per card per deck: the repeated labels are categoricals and the counts small ints
+    "decklists": {
+        "player": "category",
+        "Event": "category",
+        "wins": "Int16",
+        "losses": "Int16",
+        "draws": "Int16",
+        "deck_archetype": "category",
+        "card_name": "category",
+        "qty": "Int8",
+        "zone": "category",
+        "deck_guid": "category",
+        "player_id": "Int64",
+    },
+    "standings_round": {
+        "PlayerName": "string",
+        "PlayerId": "Int64",
+        "decklist_guid": "string",
+        "deck_archetype": "string",
+        "Rank": "Int64",
+        "MatchRecord": "string",
+    },
+    "standings_summary": {
+        "PlayerName": "string",
+        "player_id": "Int64",
+        "wins": "Int64",
+        "losses": "Int64",
+        "draws": "Int64",
+        "limited_wins": "Int64",
+        "limited_losses": "Int64",
+        "limited_draws": "Int64",
+        "constructed_wins": "Int64",
+        "constructed_losses": "Int64",
+        "constructed_draws": "Int64",
+        "decklist_guid": "string",
+        "deck_archetype": "string",
+    },
+}
+
+SUFFIXES = {"parquet": ".parquet", "arrow": ".arrow"}
+_FALSE = {"0", "false", "no", "off"}
+
+
+def pyarrow_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def artifact_format(default: str = "parquet") -> str:
+    """Columnar format to write: ARTIFACT_FORMAT, else `default`; "csv" when pyarrow is missing."""
+    fmt = (os.environ.get("ARTIFACT_FORMAT") or default).strip().lower()
+    if fmt not in SUFFIXES:
+        return "csv"
+    return fmt if pyarrow_available() else "csv"
+
+
+def csv_enabled() -> bool:
+    return str(os.environ.get("ARTIFACT_CSV", "1")).strip().lower() not in _FALSE
+
+
+def apply_schema(df: pd.DataFrame, schema: str) -> pd.DataFrame:
+    """Cast the columns of `df` declared in SCHEMAS[schema]; others are left alone."""
+    dtypes = {c: t for c, t in SCHEMAS[schema].items() if c in df.columns and str(df[c].dtype) != t}
+    if not dtypes:
+        return df
+    df = df.copy()
+    for col, dtype in dtypes.items():
+        if dtype.startswith("Int"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def _label_dtypes(schema: str) -> dict[str, str]:
+    """Non-integer dtypes of a schema, which read_csv can parse into directly."""
+    return {c: t for c, t in SCHEMAS[schema].items() if not t.startswith("Int")}
+
+
+def columnar_paths(csv_path: Path | str) -> list[Path]:
+    csv_path = Path(csv_path)
+    return [csv_path.with_suffix(suffix) for suffix in SUFFIXES.values()]
+
+
+def artifact_exists(csv_path: Path | str) -> bool:
+    """True when the artifact exists in any format."""
+    return Path(csv_path).exists() or any(p.exists() for p in columnar_paths(csv_path))
+
+
+def find_artifacts(directory: Path | str, pattern: str) -> list[Path]:
+    """Artifacts in `directory` whose stem matches `pattern`, in any format, newest first.
+
+    Results are named by their CSV path so they can be passed to read_artifact.
+    """
+    found: dict[Path, float] = {}
+    for suffix in (".csv", *SUFFIXES.values()):
+        for path in Path(directory).glob(pattern + suffix):
+            key = path.with_suffix(".csv")
+            found[key] = max(found.get(key, 0.0), path.stat().st_mtime)
+    return sorted(found, key=found.__getitem__, reverse=True)
+
+
+def write_artifact(
+    df: pd.DataFrame,
+    csv_path: Path | str,
+    schema: str,
+    fmt: str | None = None,
+    write_csv: bool | None = None,
+    **csv_kwargs: Any,
+) -> list[Path]:
+    """Write `df` under the artifact named by `csv_path`; returns the files written.
+
+    `fmt` is the preferred columnar format for this artifact (ARTIFACT_FORMAT
+    wins over it). The CSV is written when no columnar format is available
+    or when `write_csv` (default: ARTIFACT_CSV) asks for it. A stale columnar
+    copy in another format is removed so readers never see old data.
+
+    The CSV goes first so the columnar copy is never older than it and
+    read_artifact keeps preferring the columnar copy.
+    """
+    csv_path = Path(csv_path)
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    df = apply_schema(df, schema)
+    fmt = artifact_format(fmt or "parquet")
+    written: list[Path] = []
+    if fmt == "csv" or (csv_enabled() if write_csv is None else write_csv):
+        csv_kwargs.setdefault("index", False)
+        df.to_csv(csv_path, **csv_kwargs)
+        written.append(csv_path)
+    elif csv_path.exists():
+        csv_path.unlink()
+    if fmt != "csv":
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        target = csv_path.with_suffix(SUFFIXES[fmt])
+        tmp = target.with_name(target.name + ".tmp")
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            pq.write_table(table, tmp)
+        else:
+            import pyarrow.ipc as ipc
+
+            with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, target)
+        written.append(target)
+    for stale in columnar_paths(csv_path):
+        if stale not in written and stale.exists():
+            stale.unlink()
+    return written
+
+
+def read_artifact(
+    csv_path: Path | str,
+    schema: str,
+    columns: Iterable[str] | None = None,
+    arrow_backed: bool = False,
+    **csv_kwargs: Any,
+) -> pd.DataFrame:
+    """Load an artifact, preferring its columnar copy when it is at least as new as the CSV.
+
+    Arrow IPC files are memory-mapped; with `arrow_backed` the frame keeps
+    Arrow-backed columns (pd.ArrowDtype) instead of converting to numpy, which
+    makes loading close to zero-copy. CSV input is cast to the declared schema.
+    """
+    csv_path = Path(csv_path)
+    columns = list(columns) if columns is not None else None
+    csv_mtime = csv_path.stat().st_mtime if csv_path.exists() else None
+    if pyarrow_available():
+        for path in columnar_paths(csv_path):
+            if not path.exists() or (csv_mtime is not None and path.stat().st_mtime < csv_mtime):
+                continue
+            import pyarrow as pa
+
+            if path.suffix == ".parquet":
+                import pyarrow.parquet as pq
+
+                table = pq.read_table(path, columns=columns, memory_map=True)
+            else:
+                import pyarrow.ipc as ipc
+
+                table = ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+                if columns is not None:
+                    table = table.select(columns)
+            if arrow_backed:
+                return table.to_pandas(types_mapper=pd.ArrowDtype)
+            return apply_schema(table.to_pandas(), schema)
+    if columns is not None:
+        csv_kwargs["usecols"] = columns
+    # labels are parsed straight into their dtype (no intermediate object columns);
+    # integers go through apply_schema so stray values become NA instead of failing
+    csv_kwargs.setdefault("dtype", _label_dtypes(schema))
+    return apply_schema(pd.read_csv(csv_path, **csv_kwargs), schema)
+
+
+def load_decklists(path: Path | str, columns: Iterable[str] | None = None, **kwargs: Any) -> pd.DataFrame:
+    """Load a decklists artifact with the declared schema: categorical labels, Int8 qty, Int16 records.
+
+    Every decklists consumer goes through here; on the combined multi-event
+    file this keeps memory at a fraction of the object-column frame.
+    """
+    return read_artifact(path, "decklists", columns=columns, **kwargs)
@@ -0,0 +1,176 @@
+"""Sparse pilot x (card, zone) copy matrix for the card-winrate stage.
+
+One row per (archetype, pilot) and one column per (card, zone); the value is
+the number of copies that pilot registered. Rows are grouped by archetype and
+stored CSR, so an archetype's entries are one contiguous slice of the arrays.
+Players, archetypes, cards and zones are the int32 codes of the event
+vocabulary (utils/vocab.py).
+
+The copy structure is stored as plain numpy arrays (indptr/indices/data; no
+scipy) and cached per event in <event>/card_matrix.npz, keyed by the decklists
+artifact's files (name, size, mtime) and the vocabulary sizes. Wins and losses
+depend on the pairings and the round filter, so they are not cached: they are
+attached to the rows on every run (set_records).
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.artifacts import columnar_paths
+from utils.vocab import EventVocabulary
+
+MATRIX_NAME = "card_matrix.npz"
+
+# decklist columns the matrix is built from (after EventVocabulary.encode_frame)
+FRAME_COLUMNS = ("player", "deck_archetype", "card_name", "zone", "qty")
+_ARRAYS = ("pilots", "archetypes", "cards", "zones", "indptr", "indices", "data")
+
+
+def _int_array(values, dtype=np.int64) -> np.ndarray:
+    return pd.to_numeric(pd.Series(values), errors="coerce").fillna(0).astype(dtype).to_numpy()
+
+
+def _row_keys(archetype: np.ndarray, pilot: np.ndarray) -> np.ndarray:
+    return ((archetype.astype(np.int64) + 1) << 32) | (pilot.astype(np.int64) + 1)
+
+
+class CardMatrix:
+    """Copies per pilot and (card, zone) in CSR form, with aligned per-pilot vectors."""
+
+    def __init__(
+        self,
+        pilots: np.ndarray,
+        archetypes: np.ndarray,
+        cards: np.ndarray,
+        zones: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        data: np.ndarray,
+        key: str = "",
+    ) -> None:
+        self.pilots = pilots            # per row: player code
+        self.archetypes = archetypes    # per row: archetype code (sorted)
+        self.cards = cards              # per column: card code
+        self.zones = zones              # per column: zone code
+        self.indptr = indptr            # CSR: row i's entries are indptr[i]:indptr[i + 1]
+        self.indices = indices          # CSR: column of each entry, ascending within a row
+        self.data = data                # CSR: copies of each entry (explicit 0s are kept)
+        self.key = key
+        self.wins = np.zeros(len(pilots), dtype=np.int32)     # per row, see set_records
+        self.losses = np.zeros(len(pilots), dtype=np.int32)   # per row, see set_records
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.pilots), len(self.cards)
+
+    @classmethod
+    def from_codes(cls, pilot, archetype, card, zone, copies) -> "CardMatrix":
+        """Build from one entry per decklist row; copies of repeated (pilot, card, zone) rows are summed."""
+        pilot, archetype, card, zone, copies = (_int_array(v) for v in (pilot, archetype, card, zone, copies))
+
+        # rows: (archetype, pilot) in order of first appearance, then grouped by archetype
+        row_local, row_uniques = pd.factorize(_row_keys(archetype, pilot))
+        row_archetypes = (row_uniques >> 32) - 1
+        order = np.argsort(row_archetypes, kind="stable")
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        row = rank[row_local]
+
+        # columns: (card, zone) sorted by code
+        col_uniques, col = np.unique(((card + 1) << 32) | (zone + 1), return_inverse=True)
+
+        # entries sorted by (row, column), duplicates summed
+        n_cols = max(len(col_uniques), 1)
+        entry_uniques, entry = np.unique(row.astype(np.int64) * n_cols + col, return_inverse=True)
+        data = np.bincount(entry, weights=copies, minlength=len(entry_uniques)).astype(np.int32)
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(entry_uniques // n_cols, minlength=len(row_uniques)))])
+
+        return cls(
+            pilots=((row_uniques & 0xFFFFFFFF) - 1)[order].astype(np.int32),
+            archetypes=row_archetypes[order].astype(np.int32),
+            cards=((col_uniques >> 32) - 1).astype(np.int32),
+            zones=((col_uniques & 0xFFFFFFFF) - 1).astype(np.int32),
+            indptr=indptr.astype(np.int64),
+            indices=(entry_uniques % n_cols).astype(np.int32),
+            data=data,
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "CardMatrix":
+        """Build from an encoded decklists frame (FRAME_COLUMNS)."""
+        return cls.from_codes(*(df[c] for c in FRAME_COLUMNS))
+
+    def set_records(self, pilot, archetype, wins, losses) -> "CardMatrix":
+        """Attach wins/losses per row from decklist rows; each pilot's first row carries their record."""
+        keys = _row_keys(_int_array(archetype), _int_array(pilot))
+        uniques, first = np.unique(keys, return_index=True)
+        at = np.searchsorted(uniques, _row_keys(self.archetypes, self.pilots))
+        self.wins = _int_array(wins)[first][at].astype(np.int32)
+        self.losses = _int_array(losses)[first][at].astype(np.int32)
+        return self
+
+    def archetype_rows(self, archetype: int) -> slice:
+        lo, hi = np.searchsorted(self.archetypes, [archetype, archetype + 1])
+        return slice(int(lo), int(hi))
+
+    def entries(self, rows: slice) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(column, row - rows.start, copies) of every stored entry in `rows`; a slice of the CSR arrays."""
+        lo, hi = self.indptr[rows.start], self.indptr[rows.stop]
+        local_rows = np.repeat(np.arange(rows.stop - rows.start), np.diff(self.indptr[rows.start:rows.stop + 1]))
+        return self.indices[lo:hi], local_rows, self.data[lo:hi]
+
+    def save(self, path: Path | str) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            np.savez_compressed(fh, **{k: getattr(self, k) for k in _ARRAYS}, key=np.array(self.key))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path | str) -> "CardMatrix":
+        with np.load(path) as npz:
+            return cls(**{k: npz[k] for k in _ARRAYS}, key=str(npz["key"]))
+
+
+def matrix_path(directory: Path | str) -> Path:
+    return Path(directory) / MATRIX_NAME
+
+
+def cache_key(decklists_path: Path | str, vocab: EventVocabulary) -> str:
+    """Identity of the decklists artifact (every format on disk) and of the vocabulary it was encoded with."""
+    parts = []
+    for path in (Path(decklists_path), *columnar_paths(decklists_path)):
+        if path.exists():
+            st = path.stat()
+            parts.append(f"{path.name}:{st.st_size}:{st.st_mtime_ns}")
+    parts.append(",".join(str(len(vocab[kind])) for kind in EventVocabulary.KINDS))
+    return "|".join(parts)
+
+
+def load_card_matrix(event_dir: Path | str, df: pd.DataFrame, decklists_path: Path | str, vocab: EventVocabulary) -> CardMatrix:
+    """The event's card matrix for the encoded decklists `df` (read from `decklists_path`), with its records.
+
+    The copy structure comes from the cache when the decklists artifact and
+    the vocabulary are unchanged; wins/losses are always taken from `df`.
+    """
+    path = matrix_path(event_dir)
+    key = cache_key(decklists_path, vocab)
+    matrix = None
+    if path.exists():
+        try:
+            cached = CardMatrix.load(path)
+            if cached.key == key:
+                matrix = cached
+        except (OSError, ValueError, KeyError) as exc:
+            print(f"Warning: ignoring unreadable card matrix {path}: {exc}")
+    if matrix is None:
+        matrix = CardMatrix.from_frame(df)
+        matrix.key = key
+        matrix.save(path)
+    return matrix.set_records(df["player"], df["deck_archetype"], df["wins"], df["losses"])
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Per-event archive of raw decklist HTML, compressed, with an offset index.
+
+`<event_dir>/decklists_html.bin` is a concatenation of independently
+zlib-compressed pages, and `<event_dir>/decklists_html.idx.jsonl` maps each
+GUID to the (offset, length) of its page. Both are append-only, so fetching
+can be interrupted at any point, and any single page can be read back with
+one seek. Keeping the raw pages means parser heuristics can be changed and
+every deck re-parsed offline, without downloading anything again.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import zlib
+from pathlib import Path
+from typing import Iterator
+
+
+def read_archived_html(blob_path: Path | str, offset: int, length: int) -> str:
+    """Read and decompress one page; usable from worker processes without an index."""
+    with open(blob_path, "rb") as fh:
+        fh.seek(offset)
+        return zlib.decompress(fh.read(length)).decode("utf-8")
+
+
+class DecklistArchive:
+    def __init__(self, event_dir: Path | str):
+        self.event_dir = Path(event_dir)
+        self.blob_path = self.event_dir / "decklists_html.bin"
+        self.index_path = self.event_dir / "decklists_html.idx.jsonl"
+        self._lock = threading.Lock()
+        self._index: dict[str, tuple[int, int]] = {}
+        self._load_index()
+
+    def _load_index(self) -> None:
+        try:
+            size = self.blob_path.stat().st_size
+            with self.index_path.open("r", encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from a crash
+                    offset, length = int(entry["offset"]), int(entry["length"])
+                    if offset + length <= size:
+                        self._index[str(entry["guid"])] = (offset, length)
+        except FileNotFoundError:
+            pass
+
+    def __contains__(self, guid: str) -> bool:
+        return guid in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def guids(self) -> list[str]:
+        return list(self._index)
+
+    def locate(self, guid: str) -> tuple[int, int] | None:
+        return self._index.get(guid)
+
+    def get(self, guid: str) -> str | None:
+        loc = self._index.get(guid)
+        if loc is None:
+            return None
+        return read_archived_html(self.blob_path, *loc)
+
+    def put(self, guid: str, html: str) -> None:
+        """Append one page (blob first, then its index line, so indexed pages are always complete)."""
+        blob = zlib.compress(html.encode("utf-8"), 6)
+        with self._lock:
+            self.event_dir.mkdir(parents=True, exist_ok=True)
+            with self.blob_path.open("ab") as fh:
+                offset = fh.tell()
+                fh.write(blob)
+            with self.index_path.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps({"guid": guid, "offset": offset, "length": len(blob)}) + "\n")
+            self._index[guid] = (offset, len(blob))
+
+    def iter_pages(self) -> Iterator[tuple[str, str]]:
+        for guid in self.guids():
+            html = self.get(guid)
+            if html is not None:
+                yield guid, html
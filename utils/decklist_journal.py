@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Resumable decklist fetch state: a journal of parsed GUIDs plus a retry queue.
+
+- `<event_dir>/decklists_journal.jsonl` holds one line per successfully parsed
+  deck ({"guid", "rows"}), appended as soon as the deck is parsed, so an
+  interrupted run only fetches the GUIDs that are still missing.
+- `<event_dir>/decklists_retry.json` maps failed GUIDs to their attempt count,
+  last status and the earliest time they may be retried (exponential backoff).
+  A GUID that used up its attempt budget stays in the queue and is skipped.
+  404/410 (deleted or private deck) are terminal: given up on the first failure.
+  A page that parsed to no cards ("empty") is retried like any other failure.
+  An offline cache miss ("offline") is given up at once, but only for that
+  run: the entry is dropped when the journal is loaded again.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+# statuses that will not change on retry: the deck is gone or private
+TERMINAL_STATUSES = {404, 410}
+# a 200 page without any cards (retried with the caches bypassed)
+EMPTY_STATUS = "empty"
+# no cached page in offline mode: pointless to retry now, worth fetching once online
+OFFLINE_STATUS = "offline"
+
+
+class DecklistJournal:
+    def __init__(self, event_dir: Path | str, max_attempts: int = 4, backoff_s: float = 5.0):
+        self.event_dir = Path(event_dir)
+        self.journal_path = self.event_dir / "decklists_journal.jsonl"
+        self.retry_path = self.event_dir / "decklists_retry.json"
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_s = float(backoff_s)
+        self._lock = threading.Lock()
+        self._rows: dict[str, list[dict[str, Any]]] = {}
+        self._retry: dict[str, dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with self.journal_path.open("r", encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from a crash
+                    self._rows[str(entry["guid"])] = entry.get("rows") or []
+        except FileNotFoundError:
+            pass
+        try:
+            self._retry = json.loads(self.retry_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._retry = {}
+        # a GUID that succeeded after being queued is no longer pending, and an
+        # offline miss only gave the GUID up for the run that hit it
+        for guid in list(self._retry):
+            if guid in self._rows or self._retry[guid].get("last_status") == OFFLINE_STATUS:
+                del self._retry[guid]
+
+    def _write_retry(self) -> None:
+        self.event_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.retry_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self._retry, indent=2), encoding="utf-8")
+        os.replace(tmp, self.retry_path)
+
+    def is_done(self, guid: str) -> bool:
+        return guid in self._rows
+
+    def rows_for(self, guid: str) -> list[dict[str, Any]] | None:
+        return self._rows.get(guid)
+
+    def last_status(self, guid: str) -> Any:
+        return self._retry.get(guid, {}).get("last_status")
+
+    def is_exhausted(self, guid: str) -> bool:
+        entry = self._retry.get(guid)
+        if entry is None:
+            return False
+        return bool(entry.get("terminal")) or int(entry.get("attempts", 0)) >= self.max_attempts
+
+    def pending(self, guids: Iterable[str]) -> list[str]:
+        """GUIDs that still need fetching (not journaled, attempt budget left)."""
+        return [g for g in guids if g not in self._rows and not self.is_exhausted(g)]
+
+    def exhausted(self, guids: Iterable[str]) -> list[str]:
+        return [g for g in guids if g not in self._rows and self.is_exhausted(g)]
+
+    def record_success(self, guid: str, rows: list[dict[str, Any]]) -> None:
+        line = json.dumps({"guid": guid, "rows": rows}, ensure_ascii=False)
+        with self._lock:
+            self.event_dir.mkdir(parents=True, exist_ok=True)
+            with self.journal_path.open("a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+            self._rows[guid] = rows
+            if self._retry.pop(guid, None) is not None:
+                self._write_retry()
+
+    def record_failure(self, guid: str, status: Any = None) -> None:
+        """Queue a failed GUID; the n-th failure delays the next try by backoff_s * 2^(n-1).
+
+        A TERMINAL_STATUSES or OFFLINE_STATUS failure gives the GUID up at once.
+        """
+        with self._lock:
+            entry = self._retry.setdefault(guid, {"attempts": 0})
+            entry["attempts"] = int(entry.get("attempts", 0)) + 1
+            entry["last_status"] = status
+            if status in TERMINAL_STATUSES or status == OFFLINE_STATUS:
+                entry["terminal"] = True
+            entry["next_at"] = time.time() + self.backoff_s * (2 ** (entry["attempts"] - 1))
+            self._write_retry()
+
+    def next_retry_at(self, guids: Iterable[str]) -> float | None:
+        """Earliest time any of `guids` may be retried, or None when none is queued."""
+        times = [float(self._retry[g].get("next_at", 0)) for g in guids if g in self._retry]
+        return min(times) if times else None
+
+    def due(self, guids: Iterable[str], now: float | None = None) -> list[str]:
+        now = time.time() if now is None else now
+        return [g for g in self.pending(guids) if float(self._retry.get(g, {}).get("next_at", 0)) <= now]
+
+    def clear(self, keep_given_up: bool = False) -> None:
+        """Delete the journal and retry queue; with `keep_given_up`, the retry
+        file keeps only the exhausted/terminal GUIDs so reruns still skip them."""
+        with self._lock:
+            kept = {
+                g: e for g, e in self._retry.items()
+                if keep_given_up and self.is_exhausted(g) and e.get("last_status") != OFFLINE_STATUS
+            }
+            for path in (self.journal_path, self.retry_path):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            self._rows = {}
+            self._retry = kept
+            if kept:
+                self._write_retry()
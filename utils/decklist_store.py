@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Repository-wide store of parsed decklists, keyed by deck GUID.
+
+A decklist GUID never changes content once submitted, so its parsed card rows
+and player name are kept across runs and events in
+`data/decklist_store/<guid[:2]>/<guid>.json`. `DecklistScraper` reads from the
+store before touching the network and writes every freshly parsed deck back,
+so re-running or re-analysing any event already seen needs no decklist
+requests at all.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+DEFAULT_STORE_DIR = Path(__file__).resolve().parents[1] / "data" / "decklist_store"
+
+
+class DecklistStore:
+    def __init__(self, root: Path | str = DEFAULT_STORE_DIR):
+        self.root = Path(root)
+
+    def _path(self, guid: str) -> Path:
+        guid = guid.strip().lower()
+        return self.root / guid[:2] / f"{guid}.json"
+
+    def get(self, guid: str) -> list[dict[str, Any]] | None:
+        """Return the stored card rows for a GUID, or None if it was never parsed."""
+        try:
+            entry = json.loads(self._path(guid).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        player = entry.get("player", "")
+        return [
+            {"player": player, "card_name": c["card_name"], "qty": c["qty"], "zone": c["zone"], "deck_guid": guid}
+            for c in entry.get("cards") or []
+        ]
+
+    def put(self, guid: str, rows: list[dict[str, Any]]) -> None:
+        """Persist the parsed rows of one deck (player name plus cards)."""
+        if not rows:
+            return
+        path = self._path(guid)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "guid": guid,
+            "player": rows[0].get("player", ""),
+            "cards": [{"card_name": r["card_name"], "qty": r["qty"], "zone": r["zone"]} for r in rows],
+        }
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def __contains__(self, guid: str) -> bool:
+        return self._path(guid).exists()
+
+
+def store_from_env() -> DecklistStore | None:
+    """Store configured by the environment: DECKLIST_STORE=0 disables, DECKLIST_STORE_DIR moves it."""
+    enabled = str(os.environ.get("DECKLIST_STORE", "1")).strip().lower() not in {"0", "false", "no", "off"}
+    if not enabled:
+        return None
+    root = (os.environ.get("DECKLIST_STORE_DIR") or "").strip()
+    return DecklistStore(Path(root) if root else DEFAULT_STORE_DIR)
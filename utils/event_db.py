@@ -0,0 +1,261 @@
+"""Per-event SQLite database (<event>/event.sqlite) for the analytics stages.
+
+Tables:
+    pairings   the event's pairings artifact, one row per match
+    results    one row per match and side, seen from that side: PlayerDeck is
+               the archetype, OpponentDeck the opponent's, Result is
+               win/loss/draw (NULL when it cannot be decided). Byes and
+               0-0-3 results are left out.
+    matchups   W/L/D per (Archetype, Opponent_Archetype), mirrors excluded
+
+filter_pairings_by_archetype fills pairings and results, create_matchups_files
+fills matchups, and the aggregate/win-matrix/heatmap/verify stages query it.
+The per-archetype results/ and matchups/ CSV trees are only written when
+RESULTS_CSV_TREES=1.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from utils.melee_payloads import parse_result_string
+
+DB_NAME = "event.sqlite"
+
+PAIRINGS_COLUMNS = [
+    "RoundId",
+    "TableNumber_Cleaned",
+    "Player",
+    "PlayerDeck",
+    "Opponent",
+    "OpponentDeck",
+    "Outcome",
+    "WinningDeck",
+    "ResultString",
+    "PlayerId",
+    "OpponentId",
+    "WinnerId",
+    "PlayerDecklistId",
+    "OpponentDecklistId",
+]
+# swapped for the opponent's perspective; Outcome is rewritten and WinningDeck kept
+_SWAP = [("Player", "Opponent"), ("PlayerDeck", "OpponentDeck"), ("PlayerId", "OpponentId"), ("PlayerDecklistId", "OpponentDecklistId")]
+RESULTS_COLUMNS = PAIRINGS_COLUMNS + ["Result", "side", "match_idx"]
+MATCHUPS_COLUMNS = ["Archetype", "Opponent_Archetype", "Wins", "Losses", "Draws", "Total_Matches", "Winrate"]
+
+_INT_COLUMNS = {"RoundId", "TableNumber_Cleaned", "PlayerId", "OpponentId", "WinnerId", "side", "match_idx",
+                "Wins", "Losses", "Draws", "Total_Matches"}
+_REAL_COLUMNS = {"Winrate"}
+_SCHEMA = """
+CREATE TABLE pairings ({pairings});
+CREATE TABLE results ({results});
+CREATE INDEX results_archetype ON results (PlayerDeck);
+CREATE INDEX results_opponent_archetype ON results (OpponentDeck);
+CREATE INDEX results_player ON results (Player);
+CREATE INDEX results_player_id ON results (PlayerId);
+CREATE INDEX results_round ON results (RoundId);
+CREATE INDEX pairings_round ON pairings (RoundId);
+"""
+_MATCHUPS_SCHEMA = """
+CREATE TABLE matchups ({matchups});
+CREATE UNIQUE INDEX matchups_archetype ON matchups (Archetype, Opponent_Archetype);
+CREATE INDEX matchups_opponent_archetype ON matchups (Opponent_Archetype);
+"""
+
+
+def csv_trees_enabled() -> bool:
+    return str(os.environ.get("RESULTS_CSV_TREES", "")).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def event_db_path(event_dir: Path | str) -> Path:
+    return Path(event_dir) / DB_NAME
+
+
+def connect(event_dir: Path | str, create: bool = False) -> sqlite3.Connection:
+    """Open the event database; without `create`, a missing database is a FileNotFoundError."""
+    path = event_db_path(event_dir)
+    if not create and not path.exists():
+        raise FileNotFoundError(
+            f"Event database not found: {path} (run scripts.filter_pairings_by_archetype and scripts.create_matchups_files first)"
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return sqlite3.connect(path)
+
+
+def _column_type(column: str) -> str:
+    if column in _INT_COLUMNS:
+        return "INTEGER"
+    return "REAL" if column in _REAL_COLUMNS else "TEXT"
+
+
+def _columns_sql(columns: list[str]) -> str:
+    return ", ".join(f'"{c}" {_column_type(c)}' for c in columns)
+
+
+def _swap_outcome(val: Any) -> Any:
+    val = str(val)
+    if 'draw' in val.lower():
+        return val
+    if 'won' in val.lower():
+        return val.lower().replace('won', 'lost')
+    if 'lost' in val.lower():
+        return val.lower().replace('lost', 'won')
+    return val
+
+
+def _result(outcome: Any, result_string: Any, winner_id: Any, player_id: Any, opponent_id: Any,
+            player: Any, opponent: Any, winning_deck: Any, deck: Any, opp_deck: Any) -> str | None:
+    outcome, result_string = str(outcome), str(result_string)
+    if ('Draw' in outcome or 'Draw' in result_string) and '0-0-3' not in result_string:
+        return "draw"
+    # decide by who won, not by deck: in a mirror both sides played the winning deck
+    if pd.notna(winner_id) and pd.notna(player_id) and pd.notna(opponent_id):
+        if winner_id == player_id:
+            return "win"
+        if winner_id == opponent_id:
+            return "loss"
+        return None
+    # older pairings without IDs: the winner's name from ResultString
+    winner_name = parse_result_string(result_string)[0]
+    if winner_name is not None and pd.notna(player) and winner_name == player:
+        return "win"
+    if winner_name is not None and pd.notna(opponent) and winner_name == opponent:
+        return "loss"
+    # last resort, only unambiguous outside mirrors
+    if pd.notna(winning_deck) and deck != opp_deck:
+        if winning_deck == deck:
+            return "win"
+        if winning_deck == opp_deck:
+            return "loss"
+    return None
+
+
+def results_frame(pairings: pd.DataFrame) -> pd.DataFrame:
+    """Both perspectives of every decided match: side 0 as paired, side 1 with player and opponent swapped."""
+    df = pairings.reindex(columns=PAIRINGS_COLUMNS).reset_index(drop=True)
+    df["match_idx"] = range(len(df))
+    if len(df):
+        # byes and incomplete matches (0-0-3) are not results
+        df = df[~df["ResultString"].fillna("").astype(str).str.contains(r"0-0-3", regex=True, na=False)]
+        df = df[~df["Outcome"].fillna("").astype(str).str.strip().str.lower().eq("bye")]
+    for col in ("PlayerDeck", "OpponentDeck"):
+        decks = df[col].astype("string").str.strip()
+        df[col] = decks.mask(decks.eq(""))
+
+    player_side = df.assign(side=0)
+    opponent_side = df.assign(side=1)
+    for left, right in _SWAP:
+        opponent_side[[left, right]] = df[[right, left]]
+    opponent_side["Outcome"] = [_swap_outcome(v) for v in df["Outcome"]]
+
+    out = pd.concat([player_side, opponent_side], ignore_index=True)
+    out = out[out["PlayerDeck"].notna()]
+    out["Result"] = [
+        _result(*row)
+        for row in zip(out["Outcome"], out["ResultString"], out["WinnerId"], out["PlayerId"], out["OpponentId"],
+                       out["Player"], out["Opponent"], out["WinningDeck"], out["PlayerDeck"], out["OpponentDeck"])
+    ]
+    return out[RESULTS_COLUMNS].reset_index(drop=True)
+
+
+def _sql_values(df: pd.DataFrame) -> list[tuple]:
+    values = df.astype(object).where(df.notna(), None)
+    for col in values.columns.intersection(list(_INT_COLUMNS)):
+        values[col] = [None if v is None else int(v) for v in values[col]]
+    return list(values.itertuples(index=False, name=None))
+
+
+def _insert(conn: sqlite3.Connection, table: str, df: pd.DataFrame) -> None:
+    cols = ", ".join(f'"{c}"' for c in df.columns)
+    marks = ", ".join("?" for _ in df.columns)
+    conn.executemany(f"INSERT INTO {table} ({cols}) VALUES ({marks})", _sql_values(df))
+
+
+def load_pairings(conn: sqlite3.Connection, pairings: pd.DataFrame) -> pd.DataFrame:
+    """(Re)build the pairings and results tables (dropping stale matchups); returns the results frame."""
+    results = results_frame(pairings)
+    with conn:
+        conn.executescript("DROP TABLE IF EXISTS pairings; DROP TABLE IF EXISTS results; DROP TABLE IF EXISTS matchups;")
+        conn.executescript(_SCHEMA.format(pairings=_columns_sql(PAIRINGS_COLUMNS), results=_columns_sql(RESULTS_COLUMNS)))
+        _insert(conn, "pairings", pairings.reindex(columns=PAIRINGS_COLUMNS))
+        _insert(conn, "results", results)
+    return results
+
+
+def build_matchups(conn: sqlite3.Connection) -> pd.DataFrame:
+    """(Re)build the matchups table from results; returns it."""
+    df = pd.read_sql_query(
+        """
+        SELECT PlayerDeck AS Archetype, OpponentDeck AS Opponent_Archetype,
+               SUM(Result = 'win') AS Wins, SUM(Result = 'loss') AS Losses, SUM(Result = 'draw') AS Draws
+        FROM results
+        WHERE OpponentDeck IS NULL OR OpponentDeck != PlayerDeck
+        GROUP BY PlayerDeck, OpponentDeck
+        """,
+        conn,
+    )
+    for col in ("Wins", "Losses", "Draws"):
+        df[col] = df[col].fillna(0).astype(int)
+    df["Total_Matches"] = df["Wins"] + df["Losses"] + df["Draws"]
+    # Winrate: wins / (wins + losses + draws)
+    df["Winrate"] = [round(w / t * 100, 1) if t > 0 else 0 for w, t in zip(df["Wins"], df["Total_Matches"])]
+    with conn:
+        conn.execute("DROP TABLE IF EXISTS matchups")
+        conn.executescript(_MATCHUPS_SCHEMA.format(matchups=_columns_sql(MATCHUPS_COLUMNS)))
+        _insert(conn, "matchups", df[MATCHUPS_COLUMNS])
+    return df[MATCHUPS_COLUMNS]
+
+
+def archetypes(conn: sqlite3.Connection) -> list[str]:
+    return [r[0] for r in conn.execute("SELECT DISTINCT PlayerDeck FROM results ORDER BY PlayerDeck")]
+
+
+def archetype_results(conn: sqlite3.Connection, archetype: str) -> pd.DataFrame:
+    """Every match the archetype played, from its side (the old results/<archetype> results.csv)."""
+    return pd.read_sql_query(
+        "SELECT * FROM results WHERE PlayerDeck = ? ORDER BY side, match_idx", conn, params=(archetype,)
+    )
+
+
+def archetype_matchups(conn: sqlite3.Connection, archetype: str) -> pd.DataFrame:
+    """One archetype's matchup rows, most played first (the old matchups/<archetype> matchups.csv)."""
+    return pd.read_sql_query(
+        "SELECT * FROM matchups WHERE Archetype = ? ORDER BY Total_Matches DESC, Winrate DESC, Opponent_Archetype", conn, params=(archetype,)
+    )
+
+
+def matchup(conn: sqlite3.Connection, archetype: str, opponent: str) -> dict[str, int] | None:
+    row = conn.execute(
+        "SELECT Wins, Losses, Draws, Total_Matches FROM matchups WHERE Archetype = ? AND Opponent_Archetype = ?",
+        (archetype, opponent),
+    ).fetchone()
+    if row is None:
+        return None
+    return dict(zip(("wins", "losses", "draws", "total"), row))
+
+
+def matchups_between(conn: sqlite3.Connection, names: list[str]) -> pd.DataFrame:
+    """Matchup rows where both sides are among `names`."""
+    marks = ", ".join("?" for _ in names)
+    return pd.read_sql_query(
+        f"SELECT * FROM matchups WHERE Archetype IN ({marks}) AND Opponent_Archetype IN ({marks})",
+        conn,
+        params=(*names, *names),
+    )
+
+
+def archetype_totals(conn: sqlite3.Connection) -> pd.DataFrame:
+    """Summed W/L/D/total per archetype over its non-mirror matchups, by archetype name."""
+    return pd.read_sql_query(
+        """
+        SELECT Archetype, SUM(Wins) AS Wins, SUM(Losses) AS Losses, SUM(Draws) AS Draws,
+               SUM(Total_Matches) AS Total_Matches
+        FROM matchups GROUP BY Archetype ORDER BY Archetype
+        """,
+        conn,
+    )
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Per-endpoint fetch telemetry for one run of a fetch script.
+
+The shared MeleeClient records every network attempt and cache hit here:
+request counts, latency percentiles, response bytes, retries, status codes
+and the time spent waiting on rate limiters. Scripts can also time whole
+stages (e.g. decklist parsing). At the end of a run `emit_run_metrics`
+appends a JSON summary to <event>/logs/fetch_metrics.jsonl and, when
+FETCH_METRICS_PROM_DIR is set, writes a Prometheus textfile there, one per
+script and event (melee_<script>_<event>.prom) so batch runs don't clobber
+each other.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+from urllib.parse import urlsplit
+
+# (path fragment, endpoint label); first match wins
+ENDPOINTS = [
+    ("/Tournament/View", "tournament_view"),
+    ("/Standing/GetRoundStandings", "standings"),
+    ("/Match/GetRoundMatches", "pairings"),
+    ("/Standing/Event", "csrf_token"),
+    ("/Decklist/View", "decklist_view"),
+]
+PERCENTILES = (50, 90, 99)
+
+
+def endpoint_for(url: str) -> str:
+    path = urlsplit(url).path
+    for fragment, label in ENDPOINTS:
+        if fragment in path:
+            return label
+    return "other"
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class _EndpointStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.bytes = 0
+        self.wait_s = 0.0
+        self.latencies: list[float] = []
+        self.statuses: Counter[str] = Counter()
+
+    def summary(self) -> dict[str, Any]:
+        ordered = sorted(self.latencies)
+        latency = {f"p{p}": _percentile(ordered, p) for p in PERCENTILES}
+        latency["max"] = ordered[-1] if ordered else None
+        latency["total"] = sum(ordered)
+        return {
+            "requests": self.requests,
+            "attempts": len(self.latencies) + self.statuses["error"],
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "bytes": self.bytes,
+            "wait_s": round(self.wait_s, 6),
+            "latency_s": {k: round(v, 6) if v is not None else None for k, v in latency.items()},
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+
+
+class FetchMetrics:
+    """Thread-safe counters for one process; see the module docstring."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, _EndpointStats] = defaultdict(_EndpointStats)
+        self._stages: Counter[str] = Counter()
+        self.started = time.monotonic()
+
+    def observe(
+        self,
+        url: str,
+        *,
+        latency_s: float | None = None,
+        status: int | None = None,
+        nbytes: int = 0,
+        retry: bool = False,
+        cache_hit: bool = False,
+        wait_s: float = 0.0,
+    ) -> None:
+        """Record one network attempt (status None = connection error) or one cache hit.
+
+        Bytes count network traffic only. `retry` marks attempts after the
+        first for the same request, so requests = attempts - retries.
+        """
+        with self._lock:
+            stats = self._endpoints[endpoint_for(url)]
+            stats.wait_s += wait_s
+            if cache_hit:
+                stats.requests += 1
+                stats.cache_hits += 1
+                return
+            if retry:
+                stats.retries += 1
+            else:
+                stats.requests += 1
+            if status is None:
+                stats.statuses["error"] += 1
+                return
+            stats.statuses[str(status)] += 1
+            stats.bytes += nbytes
+            if latency_s is not None:
+                stats.latencies.append(latency_s)
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._stages[name] += seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a block of non-network work (parsing, writing) under `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - start)
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "elapsed_s": round(time.monotonic() - self.started, 3),
+                "endpoints": {name: stats.summary() for name, stats in sorted(self._endpoints.items())},
+                "stages_s": {name: round(s, 6) for name, s in sorted(self._stages.items())},
+            }
+
+
+def _event_key(summary: dict[str, Any]) -> str:
+    """The event a run belongs to: its id when the script knows it, else its name."""
+    for field in ("event_id", "event"):
+        if summary.get(field) not in (None, ""):
+            return str(summary[field])
+    return ""
+
+
+def _label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _prometheus_lines(summary: dict[str, Any], script: str) -> list[str]:
+    event = _event_key(summary)
+    base = {"script": script, **({"event": event} if event else {})}
+
+    def metric(name: str, kind: str, help_text: str, samples: list[tuple[dict[str, str], float]]) -> list[str]:
+        out = [f"# HELP melee_fetch_{name} {help_text}", f"# TYPE melee_fetch_{name} {kind}"]
+        for labels, value in samples:
+            label_str = ",".join(f'{k}="{_label_value(v)}"' for k, v in {**base, **labels}.items())
+            out.append(f"melee_fetch_{name}{{{label_str}}} {value}")
+        return out
+
+    endpoints = summary["endpoints"].items()
+    lines: list[str] = []
+    for field, help_text in [
+        ("requests", "Requests issued, cache hits included."),
+        ("retries", "Extra attempts after a retryable failure."),
+        ("cache_hits", "Requests answered from the HTTP cache."),
+        ("bytes", "Response body bytes received."),
+    ]:
+        lines += metric(f"{field}_total", "counter", help_text, [({"endpoint": e}, s[field]) for e, s in endpoints])
+    lines += metric("wait_seconds_total", "counter", "Time spent waiting on rate limiters.",
+                    [({"endpoint": e}, s["wait_s"]) for e, s in endpoints])
+    lines += metric("responses_total", "counter", "Responses by status code (error = connection failure).",
+                    [({"endpoint": e, "status": code}, n) for e, s in endpoints for code, n in s["statuses"].items()])
+    lines += metric("latency_seconds", "gauge", "Response latency percentiles for this run.",
+                    [({"endpoint": e, "quantile": f"0.{p}"}, s["latency_s"][f"p{p}"])
+                     for e, s in endpoints for p in PERCENTILES if s["latency_s"][f"p{p}"] is not None])
+    lines += metric("stage_seconds", "gauge", "Wall time of non-network stages.",
+                    [({"stage": name}, s) for name, s in summary["stages_s"].items()])
+    lines += metric("elapsed_seconds", "gauge", "Wall time of the run.", [({}, summary["elapsed_s"])])
+    return lines
+
+
+def emit_run_metrics(metrics: FetchMetrics, logs_dir: Path, script: str, **extra: Any) -> dict[str, Any]:
+    """Append the run summary to logs_dir/fetch_metrics.jsonl (plus a .prom file if configured).
+
+    `extra` is logged as-is; its event_id (or else event) names the .prom file
+    and is added to every sample as the `event` label.
+    """
+    summary = {
+        "ts": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "script": script,
+        **extra,
+        **metrics.summary(),
+    }
+    logs_dir.mkdir(parents=True, exist_ok=True)
+    with (logs_dir / "fetch_metrics.jsonl").open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(summary) + "\n")
+
+    prom_dir = os.environ.get("FETCH_METRICS_PROM_DIR")
+    if prom_dir:
+        event = re.sub(r"[^A-Za-z0-9_.-]+", "_", _event_key(summary)).strip("_")
+        path = Path(prom_dir) / (f"melee_{script}_{event}.prom" if event else f"melee_{script}.prom")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".prom.tmp")
+        # the textfile collector may read at any time, so swap the file in atomically
+        tmp.write_text("\n".join(_prometheus_lines(summary, script)) + "\n", encoding="utf-8")
+        os.replace(tmp, path)
+    return summary
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Per-event record of which rounds have already been fetched in final form.
+
+Stored as `<EVENT_DATA_DIR>/fetch_state.json`:
+
+    {"pairings": {"completed_round_ids": [...]},
+     "standings": {"completed_round_ids": [...]}}
+
+A round is only recorded once it was fetched while the tournament page marked
+it `is_completed`, so in incremental mode (INCREMENTAL_FETCH=1) later runs can
+skip it and only fetch new or still-running rounds.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Iterable
+
+STATE_FILENAME = "fetch_state.json"
+
+
+def incremental_enabled() -> bool:
+    return str(os.environ.get("INCREMENTAL_FETCH", "")).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def standings_final_only() -> bool:
+    """True when STANDINGS_FINAL_ONLY asks the standings stage to fetch only the last round."""
+    return str(os.environ.get("STANDINGS_FINAL_ONLY", "")).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def final_round_id(round_ids: Iterable[int], completed_round_ids: Iterable[int]) -> int | None:
+    """Latest completed round of `round_ids` (oldest→newest), or None when none has finished.
+
+    The newest round on the page may not have started, or may still be running,
+    so its standings would be empty or partial.
+    """
+    completed = set(completed_round_ids)
+    return next((rid for rid in reversed(list(round_ids)) if rid in completed), None)
+
+
+def load_completed_round_ids(event_dir: Path, stage: str) -> set[int]:
+    path = Path(event_dir) / STATE_FILENAME
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return set()
+    ids = (state.get(stage) or {}).get("completed_round_ids") or []
+    return {int(x) for x in ids}
+
+
+def record_completed_round_ids(event_dir: Path, stage: str, round_ids: Iterable[int]) -> None:
+    """Add round IDs to the stage's completed set (never removes existing ones)."""
+    path = Path(event_dir) / STATE_FILENAME
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        state = {}
+    done = set(int(x) for x in (state.get(stage) or {}).get("completed_round_ids") or [])
+    done.update(int(x) for x in round_ids)
+    state.setdefault(stage, {})["completed_round_ids"] = sorted(done)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
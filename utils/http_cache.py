@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Persistent on-disk HTTP response cache for the melee.gg fetchers.
+
+Responses are content-addressed by (method, URL, form payload), so the same
+DataTables page request (`standings_make_payload` / `make_payload`) always maps
+to the same entry. Entries live under the event directory
+(`data/<event>/http_cache/`) and carry the time they were stored; callers pass
+a TTL per request:
+
+- `IMMUTABLE` for data that can no longer change (completed rounds, decklists)
+- a number of seconds for data that is still moving (in-progress rounds,
+  the tournament page)
+
+In offline mode every lookup is served from the cache regardless of age and a
+miss raises `OfflineCacheMiss` instead of touching the network.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Mapping
+
+import requests
+
+IMMUTABLE = float("inf")
+TTL_LIVE_ROUND = 60.0
+TTL_TOURNAMENT_PAGE = 300.0
+
+
+class OfflineCacheMiss(requests.RequestException):
+    """Raised in offline mode when a request has no cached response."""
+
+
+class CachedResponse:
+    """Minimal stand-in for `requests.Response` rebuilt from a cache entry."""
+
+    from_cache = True
+
+    def __init__(self, url: str, status_code: int, headers: Mapping[str, str], text: str):
+        self.url = url
+        self.status_code = status_code
+        self.headers = dict(headers)
+        self.text = text
+        self.encoding = "utf-8"
+
+    @property
+    def content(self) -> bytes:
+        return self.text.encode("utf-8")
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} for cached url: {self.url}")
+
+
+def cache_key(method: str, url: str, data: Mapping[str, Any] | None = None) -> str:
+    """Stable content address for a request: sha256 over method, URL and sorted form fields."""
+    items = sorted((str(k), str(v)) for k, v in (data or {}).items())
+    blob = json.dumps([method.upper(), url, items], separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Directory of cached responses, one JSON file per request key."""
+
+    def __init__(self, root: Path, offline: bool = False):
+        self.root = Path(root)
+        self.offline = offline
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str, ttl: float) -> CachedResponse | None:
+        """Return the cached response if present and younger than `ttl` (always, when offline)."""
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        age = time.time() - float(entry.get("stored_at", 0))
+        if not self.offline and age > ttl:
+            return None
+        return CachedResponse(
+            url=entry.get("url", ""),
+            status_code=int(entry.get("status_code", 200)),
+            headers=entry.get("headers") or {},
+            text=entry.get("text", ""),
+        )
+
+    def put(self, key: str, method: str, url: str, response: requests.Response) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "method": method.upper(),
+            "url": url,
+            "status_code": response.status_code,
+            "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+            "stored_at": time.time(),
+            "text": response.text,
+        }
+        # write-then-rename so concurrent readers never see a partial entry
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+def is_cacheable(method: str, response: requests.Response) -> bool:
+    """Only keep successful responses; a login page in place of JSON is an auth failure, not data."""
+    if response.status_code != 200:
+        return False
+    if method.upper() == "POST" and response.text.lstrip().startswith("<!DOCTYPE html>"):
+        return False
+    return True
+
+
+def offline_mode() -> bool:
+    """True when MELEE_OFFLINE asks for replay-only fetching."""
+    return str(os.environ.get("MELEE_OFFLINE", "")).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def cache_from_env() -> ResponseCache | None:
+    """Build the cache configured by the environment, or None when caching is off.
+
+    - MELEE_HTTP_CACHE=0 disables caching
+    - MELEE_CACHE_DIR overrides the location (default: $EVENT_DATA_DIR/http_cache)
+    - MELEE_OFFLINE=1 replays purely from the cache
+    """
+    offline = offline_mode()
+    enabled = str(os.environ.get("MELEE_HTTP_CACHE", "1")).strip().lower() not in {"0", "false", "no", "off"}
+    if not enabled and not offline:
+        return None
+    root = (os.environ.get("MELEE_CACHE_DIR") or "").strip()
+    if not root:
+        event_dir = (os.environ.get("EVENT_DATA_DIR") or "").strip()
+        if not event_dir:
+            return None
+        root = str(Path(event_dir) / "http_cache")
+    return ResponseCache(Path(root), offline=offline)
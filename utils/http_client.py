@@ -0,0 +1,416 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Shared HTTP client for the melee.gg fetchers.
+
+All fetch stages (standings, pairings, decklists) go through one pooled
+`requests.Session` per process so keep-alive connections are reused across
+rounds, pages and decklists. The login cookie is applied once, the
+anti-forgery token is scraped once per event and only refreshed when the
+server answers 401/403, and transient failures (connection errors, 429, 5xx)
+are retried a bounded number of times with jittered exponential backoff.
+The number of requests in flight adapts to the server (AIMD): it grows while
+latency stays healthy and halves on 429/5xx/Retry-After.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import re
+import threading
+import time
+from typing import Any
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from utils.fetch_metrics import FetchMetrics
+from utils.http_cache import (
+    IMMUTABLE,
+    TTL_TOURNAMENT_PAGE,
+    OfflineCacheMiss,
+    ResponseCache,
+    cache_from_env,
+    cache_key,
+    is_cacheable,
+    offline_mode,
+)
+
+load_dotenv()
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+AUTH_STATUSES = {401, 403}
+
+# Default TTLs for GETs when the caller does not pass `cache_ttl`. DataTables
+# POSTs are only cached when the caller knows whether the round is final.
+DEFAULT_TTL_RULES: list[tuple[re.Pattern, float]] = [
+    (re.compile(r"/Decklist/View/"), IMMUTABLE),
+    (re.compile(r"/Tournament/View/"), TTL_TOURNAMENT_PAGE),
+]
+_UNSET: Any = object()
+
+DEFAULT_BASE_URL = "https://melee.gg"
+
+
+def melee_url(path: str = "") -> str:
+    """Absolute URL for a melee.gg path; MELEE_BASE_URL points it elsewhere (e.g. a local stand-in server)."""
+    base = (os.environ.get("MELEE_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+    return base + path
+
+
+def scrape_csrf_token(
+    session: requests.Session, event_id: int, timeout: int = 20, limiter: TokenBucket | None = None
+) -> dict:
+    """
+    Try to fetch an anti-forgery token from the event standings page.
+    If found, return {"RequestVerificationToken": token}; otherwise {}.
+
+    The page request takes a token from `limiter` like any other request; a
+    MeleeClient sends it uncached (tokens rotate) with its usual retries.
+    """
+    try:
+        url = melee_url(f"/Standing/Event/{event_id}")
+        if isinstance(session, MeleeClient):
+            r = session.request("GET", url, timeout=timeout, cache_ttl=None, limiter=limiter)
+        else:
+            if limiter is not None:
+                limiter.acquire()
+            r = session.get(url, timeout=timeout)
+        r.raise_for_status()
+        from bs4 import BeautifulSoup  # loaded on first use so importing the client stays cheap
+
+        soup = BeautifulSoup(r.text, "html.parser")
+        # common locations for CSRF token
+        inp = soup.find("input", {"name": "__RequestVerificationToken"})
+        if inp and inp.get("value"):
+            return {"RequestVerificationToken": inp["value"]}
+        meta = soup.find("meta", {"name": "__RequestVerificationToken"})
+        if meta and meta.get("content"):
+            return {"RequestVerificationToken": meta["content"]}
+    except Exception:
+        pass
+    return {}
+
+
+def _retry_after_seconds(response: requests.Response) -> float | None:
+    retry_after = (response.headers.get("Retry-After") or "").strip()
+    return float(retry_after) if retry_after.isdigit() else None
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst` banked.
+
+    `acquire()` blocks until a token is available, so any number of worker
+    threads sharing one bucket never exceed the configured request rate.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on requests in flight, shared by every fetcher using one client.
+
+    Each successful response with healthy latency (within `latency_tolerance`
+    times the best latency seen recently) grows the limit by `increase / limit`,
+    i.e. about +`increase` per limit-worth of responses. A 429, a 5xx, a
+    Retry-After header or a connection error multiplies it by `decrease`, at
+    most once per congestion event: responses to requests sent before the last
+    decrease do not shrink it again. Retry-After also pauses new requests
+    from every thread until it has passed.
+    """
+
+    def __init__(
+        self,
+        initial: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 16,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ):
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max(max_limit, min_limit))
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.increase = float(increase)
+        self.decrease = float(decrease)
+        self.latency_tolerance = float(latency_tolerance)
+        self.in_flight = 0
+        self._epoch = 0
+        self._best_latency: float | None = None
+        self._pause_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> int:
+        """Block until a slot is free (and any Retry-After pause is over); returns a ticket for release()."""
+        with self._cond:
+            while True:
+                wait = self._pause_until - time.monotonic()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return self._epoch
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(
+        self,
+        ticket: int,
+        latency_s: float | None = None,
+        status: int | None = None,
+        retry_after_s: float | None = None,
+    ) -> None:
+        """Return a slot and feed the outcome back: status None means the request failed at the connection level."""
+        with self._cond:
+            self.in_flight -= 1
+            congested = status is None or status == 429 or status >= 500 or retry_after_s is not None
+            if retry_after_s:
+                self._pause_until = max(self._pause_until, time.monotonic() + retry_after_s)
+            if congested:
+                if ticket == self._epoch:
+                    self.limit = max(self.min_limit, self.limit * self.decrease)
+                    self._epoch += 1
+            elif latency_s is not None:
+                if self._best_latency is None or latency_s < self._best_latency:
+                    self._best_latency = latency_s
+                else:
+                    # let the baseline drift up slowly so a permanently slower server is not "unhealthy" forever
+                    self._best_latency *= 1.01
+                if latency_s <= self._best_latency * self.latency_tolerance:
+                    self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            self._cond.notify_all()
+
+
+class MeleeClient:
+    """Pooled, retrying HTTP client shared by every melee.gg fetcher.
+
+    Exposes `get`/`post` with the same call shape as `requests.Session`, so it
+    can be passed anywhere a session was used before. Pass `event_id=` on
+    requests that need the anti-forgery header (DataTables POSTs).
+    """
+
+    def __init__(
+        self,
+        cookie: str | None = None,
+        pool_size: int = 16,
+        max_retries: int = 3,
+        backoff_s: float = 0.5,
+        max_backoff_s: float = 30.0,
+        timeout: float = 30,
+        cache: ResponseCache | None = None,
+        offline: bool = False,
+        concurrency: AdaptiveConcurrency | None = None,
+        metrics: FetchMetrics | None = None,
+    ):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        cookie = cookie if cookie is not None else os.environ.get("MELEE_COOKIE")
+        if cookie:
+            self.session.headers["Cookie"] = cookie
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.timeout = timeout
+        self.cache = cache
+        self.offline = offline
+        self.concurrency = concurrency
+        self.metrics = metrics if metrics is not None else FetchMetrics()
+        self._csrf: dict[int, dict] = {}
+        self._csrf_lock = threading.Lock()
+
+    def csrf_header(self, event_id: int, refresh: bool = False, limiter: TokenBucket | None = None) -> dict:
+        """Return the cached anti-forgery header for an event, scraping it on first use.
+
+        The scrape goes through `request` (paced by `limiter`, retried, counted
+        in the metrics) without an event_id, so it never needs a token itself.
+        """
+        if self.offline:
+            return {}
+        with self._csrf_lock:
+            if refresh or event_id not in self._csrf:
+                self._csrf[event_id] = scrape_csrf_token(self, event_id, limiter=limiter)
+            return dict(self._csrf[event_id])
+
+    def _sleep_before_retry(self, attempt: int, response: requests.Response | None = None) -> None:
+        delay = _retry_after_seconds(response) if response is not None else None
+        if delay is None:
+            # full jitter: uniform(0, base * 2^attempt)
+            delay = random.uniform(0, self.backoff_s * (2 ** attempt))
+        time.sleep(min(delay, self.max_backoff_s))
+
+    def _resolve_ttl(self, method: str, url: str, cache_ttl: Any) -> float | None:
+        if cache_ttl is not _UNSET:
+            return cache_ttl
+        if method.upper() != "GET":
+            return None
+        for pattern, ttl in DEFAULT_TTL_RULES:
+            if pattern.search(url):
+                return ttl
+        return None
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        event_id: int | None = None,
+        headers: dict | None = None,
+        timeout: float | None = None,
+        cache_ttl: Any = _UNSET,
+        limiter: TokenBucket | None = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Send a request with caching, CSRF handling and bounded, jittered retries.
+
+        `cache_ttl` is seconds a cached response stays valid (`IMMUTABLE` for
+        never-expiring data, None to bypass the cache); when omitted, GETs use
+        DEFAULT_TTL_RULES. `limiter` paces every network attempt (retries
+        included); cache hits do not consume tokens. Returns the final response (which may still be an
+        error status once retries are exhausted); raises only if the last
+        attempt failed at the connection level, or on a cache miss offline.
+        """
+        ttl = self._resolve_ttl(method, url, cache_ttl) if self.cache is not None else None
+        key = cache_key(method, url, kwargs.get("data")) if ttl is not None else None
+        if key is not None:
+            cached = self.cache.get(key, ttl)  # type: ignore[union-attr]
+            if cached is not None:
+                self.metrics.observe(url, cache_hit=True)
+                return cached  # type: ignore[return-value]
+        if self.offline:
+            raise OfflineCacheMiss(f"Offline mode: no cached response for {method.upper()} {url}")
+
+        r = self._send(method, url, event_id=event_id, headers=headers, timeout=timeout, limiter=limiter, **kwargs)
+        if key is not None and is_cacheable(method, r):
+            self.cache.put(key, method, url, r)  # type: ignore[union-attr]
+        return r
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        *,
+        event_id: int | None = None,
+        headers: dict | None = None,
+        timeout: float | None = None,
+        limiter: TokenBucket | None = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        csrf_refreshed = False
+        retried = False
+        attempt = 0
+        while True:
+            req_headers = dict(headers or {})
+            if event_id is not None:
+                req_headers.update(self.csrf_header(event_id, limiter=limiter))
+            waited = time.monotonic()
+            if limiter is not None:
+                limiter.acquire()
+            ticket = self.concurrency.acquire() if self.concurrency is not None else None
+            started = time.monotonic()
+            waited = started - waited
+            try:
+                r = self.session.request(
+                    method,
+                    url,
+                    headers=req_headers,
+                    timeout=timeout if timeout is not None else self.timeout,
+                    **kwargs,
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if ticket is not None:
+                    self.concurrency.release(ticket)  # type: ignore[union-attr]
+                self.metrics.observe(url, retry=retried, wait_s=waited)
+                retried = True
+                if attempt >= self.max_retries:
+                    raise
+                self._sleep_before_retry(attempt)
+                attempt += 1
+                continue
+            latency = time.monotonic() - started
+            if ticket is not None:
+                self.concurrency.release(  # type: ignore[union-attr]
+                    ticket,
+                    latency_s=latency,
+                    status=r.status_code,
+                    retry_after_s=_retry_after_seconds(r),
+                )
+            self.metrics.observe(
+                url,
+                latency_s=latency,
+                status=r.status_code,
+                nbytes=len(getattr(r, "content", None) or b""),
+                retry=retried,
+                wait_s=waited,
+            )
+            retried = True
+
+            if r.status_code in AUTH_STATUSES and event_id is not None and not csrf_refreshed:
+                # token likely rotated; scrape a fresh one and try once more
+                self.csrf_header(event_id, refresh=True, limiter=limiter)
+                csrf_refreshed = True
+                continue
+            if r.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                self._sleep_before_retry(attempt, r)
+                attempt += 1
+                continue
+            return r
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+
+def concurrency_from_env(pool_size: int = 16) -> AdaptiveConcurrency | None:
+    """Adaptive in-flight limit configured by the environment (MELEE_ADAPTIVE=0 disables).
+
+    MELEE_CONCURRENCY_INITIAL (default 4) is the starting limit and
+    MELEE_CONCURRENCY_MAX (default: the connection pool size) the ceiling.
+    """
+    enabled = str(os.environ.get("MELEE_ADAPTIVE", "1")).strip().lower() not in {"0", "false", "no", "off"}
+    if not enabled:
+        return None
+    return AdaptiveConcurrency(
+        initial=float(os.environ.get("MELEE_CONCURRENCY_INITIAL") or 4),
+        max_limit=float(os.environ.get("MELEE_CONCURRENCY_MAX") or pool_size),
+    )
+
+
+_shared_client: MeleeClient | None = None
+_shared_lock = threading.Lock()
+
+
+def get_client() -> MeleeClient:
+    """Return the process-wide shared client, creating it on first use."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            pool_size = int(os.environ.get("MELEE_POOL_SIZE") or 16)
+            _shared_client = MeleeClient(
+                pool_size=pool_size,
+                max_retries=int(os.environ.get("MELEE_MAX_RETRIES") or 3),
+                cache=cache_from_env(),
+                offline=offline_mode(),
+                concurrency=concurrency_from_env(pool_size),
+            )
+        return _shared_client
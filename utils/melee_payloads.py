@@ -0,0 +1,450 @@
+"""Pure helpers for Melee standings and pairings payloads.
+
+Parsing of the nested Team/Decklists objects, standings flattening, and the
+pairings table and records built from raw match rows. Nothing here touches
+the network or imports requests/bs4, so analytics stages can use it cheaply;
+utils.api_utils re-exports every name for the fetch scripts.
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import pandas as pd
+
+
+# standings payload helpers
+def _parse_payload(team_entry: Any) -> dict[str, Any] | list[Any] | None:
+    """
+    Return a nested standings cell (Team, Decklists) as a dict or list.
+    Accepts:
+      - dict / list (already-parsed payload)
+      - str (JSON, or the Python-literal repr written by older runs)
+      - None / NaN-like -> None
+    """
+    if team_entry is None:
+        return None
+
+    # Handle NaN-like values without importing numpy
+    try:
+        # floats can be NaN; NaN != NaN
+        if isinstance(team_entry, float) and team_entry != team_entry:
+            return None
+    except Exception:
+        pass
+
+    team: Any = None
+
+    if isinstance(team_entry, (dict, list)):
+        team = team_entry
+    elif isinstance(team_entry, str):
+        s = team_entry.strip()
+        if not s:
+            return None
+        # Try JSON first, then Python-literal (handles single quotes)
+        try:
+            team = json.loads(s)
+        except json.JSONDecodeError:
+            try:
+                team = ast.literal_eval(s)
+            except Exception:
+                return None
+    else:
+        return None
+
+    return team if isinstance(team, (dict, list)) else None
+
+
+def _parse_team(team_entry: Any) -> dict[str, Any] | None:
+    team = _parse_payload(team_entry)
+    return team if isinstance(team, dict) else None
+
+
+def standings_extract_display_names(team_entry: Any) -> str | None:
+    """
+    Return a comma-separated string of player display names from a Team object
+    (see _parse_team for the accepted forms).
+    Tries DisplayName, then DisplayNameLastFirst, then Username, then Name.
+    """
+    team = _parse_team(team_entry)
+    if team is None:
+        return None
+
+    players = team.get("Players") or team.get("players")
+
+    # Sometimes the payload is a single player dict instead of a Team dict
+    if isinstance(players, dict):
+        players = [players]
+
+    if not isinstance(players, list):
+        return None
+
+    names: list[str] = []
+    for p in players:
+        if not isinstance(p, dict):
+            continue
+        name = (
+            p.get("DisplayName")
+            or p.get("DisplayNameLastFirst")
+            or p.get("Username")
+            or p.get("Name")
+        )
+        if name:
+            names.append(str(name))
+
+    return ", ".join(names) if names else None
+
+def _coerce_id(value: Any) -> int | None:
+    """Melee numeric IDs arrive as ints (or numeric strings); anything else is None."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value == value else None
+    text = str(value).strip()
+    return int(text) if text.isdigit() else None
+
+
+def extract_player_id(team_entry: Any) -> int | None:
+    """
+    Return the Melee player ID of the first player in a Team object (see
+    _parse_team for the accepted forms), or None when it carries no numeric ID.
+    """
+    team = _parse_team(team_entry)
+    if team is None:
+        return None
+    players = team.get("Players") or team.get("players")
+    if isinstance(players, dict):
+        players = [players]
+    if not isinstance(players, list) or not players or not isinstance(players[0], dict):
+        return None
+    p = players[0]
+    return _coerce_id(p.get("ID", p.get("Id", p.get("id"))))
+
+def standings_extract_deck_info(decklists_entry: Any) -> tuple[str, str]:
+    """
+    Return (decklist_guid, deck_archetype) of the first decklist with an ID in
+    a Decklists cell (a list of decklist dicts, a single dict, or their string
+    forms). Missing values are "".
+    """
+    decks = _parse_payload(decklists_entry)
+    if isinstance(decks, dict):
+        decks = [decks]
+    if not isinstance(decks, list):
+        return "", ""
+    for item in decks:
+        if isinstance(item, dict):
+            guid = item.get("DecklistId") or item.get("DecklistID") or item.get("decklistId") or ""
+            if guid:
+                name = item.get("DecklistName") or item.get("decklistName") or ""
+                return str(guid).strip(), str(name).strip()
+    return "", ""
+
+
+STANDINGS_FLAT_COLUMNS = ["PlayerName", "PlayerId", "decklist_guid", "deck_archetype"]
+
+
+def flatten_standings_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replace the nested Team/Decklists payload of a standings round with typed
+    columns: PlayerName, PlayerId (Int64), decklist_guid, deck_archetype.
+
+    Every other column holding dicts or lists is dropped as well; the full
+    payload belongs in the round's JSONL side file (write_standings_payload).
+    Frames that are already flat (round files from this version) are
+    returned unchanged.
+    """
+    if "Team" not in df.columns and set(STANDINGS_FLAT_COLUMNS).issubset(df.columns):
+        return df
+    df = df.copy()
+    team = df["Team"] if "Team" in df.columns else pd.Series(None, index=df.index, dtype=object)
+    df["PlayerName"] = team.map(standings_extract_display_names)
+    df["PlayerId"] = pd.array(team.map(extract_player_id), dtype="Int64")
+    if "Decklists" in df.columns:
+        deck_info = df["Decklists"].map(standings_extract_deck_info)
+        df["decklist_guid"] = deck_info.map(lambda info: info[0] or None)
+        df["deck_archetype"] = deck_info.map(lambda info: info[1] or None)
+    else:
+        df["decklist_guid"] = None
+        df["deck_archetype"] = None
+    nested = [
+        c for c in df.columns
+        if c in ("Team", "Decklists") or df[c].map(lambda v: isinstance(v, (dict, list))).any()
+    ]
+    df = df.drop(columns=nested)
+    return df[STANDINGS_FLAT_COLUMNS + [c for c in df.columns if c not in STANDINGS_FLAT_COLUMNS]]
+
+
+def write_standings_payload(df: pd.DataFrame, path: Path | str) -> Path:
+    """Write raw standings rows (nested payload included) as JSON Lines."""
+    path = Path(path)
+    df.to_json(path, orient="records", lines=True, force_ascii=False)
+    return path
+
+
+# pairings payload helpers
+def parse_result_string(result: str):
+    """
+    Parses the ResultString column to determine the outcome.
+    Return (winner_name, is_draw, is_bye)
+    winner_name is None on draw/bye.
+    """
+    if not isinstance(result, str):
+        return (None, False, False)
+    s = result.strip()
+    if "was assigned a bye" in s:
+        # e.g. "doejurko was assigned a bye"
+        who = s.replace(" was assigned a bye", "").strip()
+        return (who, False, True)
+    if "Draw" in s or "-0-3 Draw" in s or "0-0-3" in s:
+        return (None, True, False)
+    # e.g. "Sam Clayton won 2-0-0"
+    if " won " in s:
+        return (s.split(" won ", 1)[0].strip(), False, False)
+    return (None, False, False)
+
+def extract_competitor(comp: dict):
+    """
+    From one competitor dictionary (from the JSON row), pull player name and their first decklist name.
+    Returns (name, deck)
+    """
+    # Player name (DisplayName preferred)
+    name = None
+    try:
+        players = comp.get("Team", {}).get("Players", [])
+        if players and isinstance(players, list):
+            p = players[0] or {}
+            name = p.get("DisplayName") or p.get("DisplayNameLastFirst") or p.get("Username")
+            if name:
+                name = name.strip()
+    except Exception:
+        pass
+
+    # Decklist name (first decklist if present)
+    deck = None
+    try:
+        decks = comp.get("Decklists", [])
+        if decks and isinstance(decks, list):
+            deck_name = decks[0].get("DecklistName")
+            if deck_name:
+                deck = deck_name.strip()
+    except Exception:
+        pass
+
+    return name, deck
+
+def extract_competitor_ids(comp: dict):
+    """
+    From one competitor dictionary, pull the Melee player ID and the first decklist GUID.
+    Returns (player_id, decklist_guid); either may be None.
+    """
+    player_id = extract_player_id(comp.get("Team") or {})
+    guid = None
+    decks = comp.get("Decklists") or []
+    if isinstance(decks, list) and decks and isinstance(decks[0], dict):
+        guid = decks[0].get("DecklistId") or decks[0].get("DecklistID") or None
+        guid = (str(guid).strip() or None) if guid else None
+    return player_id, guid
+
+PAIRINGS_ID_COLUMNS = ['PlayerId', 'OpponentId', 'WinnerId']
+PAIRINGS_DECKLIST_ID_COLUMNS = ['PlayerDecklistId', 'OpponentDecklistId']
+# ID and decklist GUID columns of the pairings: never archetypes, even when the name contains 'deck'
+NON_ARCHETYPE_COLUMNS = frozenset(PAIRINGS_ID_COLUMNS + PAIRINGS_DECKLIST_ID_COLUMNS)
+
+def process_raw_pairings_list(raw_pairings_list: Iterable[dict]) -> pd.DataFrame:
+    """
+    Convert the aggregated list of Melee match dictionaries into a rectangular DF,
+    performing cleanup and column standardization.
+
+    Accepts any iterable (e.g. rows streamed from a PageJournal); each raw
+    match dict is only held while its cleaned row is built.
+    """
+    # NOTE: This function relies on parse_result_string and extract_competitor
+    # being available in the same module scope, which is why we moved them here.
+    
+    rows = []
+    for m in raw_pairings_list:
+        # The raw list already contains the 'RoundId' which was injected during fetching
+        round_id = m.get("RoundId")
+        result = m.get("ResultString")
+        winner_name, is_draw, is_bye = parse_result_string(result)
+
+        # Competitors list comes from the 'Competitors' key in the raw match dict
+        comps = m.get("Competitors", []) or [] 
+        
+        # Normalize two sides; some entries (bye) have only one competitor
+        if len(comps) == 2:
+            p1_name, p1_deck = extract_competitor(comps[0])
+            p2_name, p2_deck = extract_competitor(comps[1])
+            p1_id, p1_guid = extract_competitor_ids(comps[0])
+            p2_id, p2_guid = extract_competitor_ids(comps[1])
+        elif len(comps) == 1:
+            p1_name, p1_deck = extract_competitor(comps[0])
+            p2_name, p2_deck = None, None
+            p1_id, p1_guid = extract_competitor_ids(comps[0])
+            p2_id, p2_guid = None, None
+        else:
+            # Skip totally malformed rows (or rows with 0 or >2 competitors)
+            continue
+
+        # Decide outcome/winning deck; the winner is resolved to an ID here, once,
+        # so later stages never have to match display names again
+        winner_id = None
+        if is_bye:
+            outcome = "Bye"
+            winning_deck = p1_deck if winner_name == p1_name else None
+            winner_id = p1_id
+        elif is_draw:
+            outcome = "Draw"
+            winning_deck = None
+        else:
+            if winner_name and winner_name == p1_name:
+                outcome = f"{p1_name} won"
+                winning_deck = p1_deck
+                winner_id = p1_id
+            elif winner_name and winner_name == p2_name:
+                outcome = f"{p2_name} won"
+                winning_deck = p2_deck
+                winner_id = p2_id
+            else:
+                # Unknown/edge case – keep original string
+                outcome = result or "Unknown"
+                winning_deck = None
+
+        rows.append({
+            "RoundId": round_id,
+            "TableNumber": m.get("TableNumberDescription") or m.get("TableNumber"),
+            "Player": p1_name,
+            "PlayerDeck": p1_deck,
+            "Opponent": p2_name,
+            "OpponentDeck": p2_deck,
+            "Outcome": outcome,
+            "WinningDeck": winning_deck,
+            "ResultString": result,
+            "PlayerId": p1_id,
+            "OpponentId": p2_id,
+            "WinnerId": winner_id,
+            "PlayerDecklistId": p1_guid,
+            "OpponentDecklistId": p2_guid,
+        })
+
+    df = pd.DataFrame(rows)
+    # nullable ints: byes have no opponent, draws no winner, and older payloads no IDs
+    df[PAIRINGS_ID_COLUMNS] = df[PAIRINGS_ID_COLUMNS].astype("Int64")
+    
+    # --- Robust Table Number Extraction for Sorting ---
+    with pd.option_context("mode.chained_assignment", None):
+        # Convert original column to string
+        table_series = df["TableNumber"].astype(str)
+        
+        # 1. Attempt to extract the number from HTML (TableNumberDescription)
+        extracted_from_html = table_series.str.extract(r'>(\d+)<', expand=False)
+        
+        # 2. Fallback to the original string if HTML extraction failed (e.g., if it was just '10')
+        df["Table_Numeric"] = extracted_from_html.fillna(table_series)
+        
+        # 3. Final conversion to numeric, coercing any non-numeric value to NaN
+        df["Table_Numeric"] = pd.to_numeric(df["Table_Numeric"], errors="coerce")
+
+    # Fill NaNs with a large sentinel value (9999) so they sort last
+    df["Table_Numeric"] = df["Table_Numeric"].fillna(9999).astype(int) 
+
+    # Sort by the numeric Table column
+    df = df.sort_values(["RoundId", "Table_Numeric", "Player"], na_position="last").reset_index(drop=True)
+    
+    # Rename the cleaned column
+    df = df.rename(columns={'Table_Numeric': 'TableNumber_Cleaned'})
+    
+    # Select final columns 
+    final_cols = [
+        'RoundId', 'TableNumber_Cleaned', 'Player', 'PlayerDeck', 'Opponent', 'OpponentDeck', 'Outcome', 'WinningDeck', 'ResultString',
+        *PAIRINGS_ID_COLUMNS, *PAIRINGS_DECKLIST_ID_COLUMNS,
+    ]
+    return df[final_cols]
+
+def merge_pairings_frames(existing: pd.DataFrame, fresh: pd.DataFrame, refreshed_round_ids) -> pd.DataFrame:
+    """
+    Replace the refreshed rounds of an existing cleaned pairings table with freshly
+    fetched rows, keeping every other round as-is and the usual sort order.
+    """
+    refreshed = {int(r) for r in refreshed_round_ids}
+    keep = existing[~pd.to_numeric(existing["RoundId"], errors="coerce").isin(refreshed)]
+    merged = pd.concat([keep, fresh], ignore_index=True)
+    merged = merged.sort_values(["RoundId", "TableNumber_Cleaned", "Player"], na_position="last").reset_index(drop=True)
+    return merged[[c for c in fresh.columns if c in merged.columns]]
+
+def has_player_ids(df: pd.DataFrame, column: str = "PlayerId") -> bool:
+    """True when every row of `df` carries a Melee player ID (artifacts from older runs do not)."""
+    return column in df.columns and not df.empty and bool(df[column].notna().all())
+
+def records_from_pairings(
+    pairings: pd.DataFrame,
+    round_ids=None,
+    normalize: Callable[[str], str] | None = None,
+    by_id: bool = False,
+) -> dict[Any, dict[str, int]]:
+    """
+    Rebuild per-player match records ({"wins", "losses", "draws"}) from cleaned
+    pairings, optionally restricted to `round_ids` (pairings-mode IDs).
+
+    Follows how Melee counts MatchRecord: a bye is a win, a drawn match is a
+    draw for both players. Rows without a recognisable result (unreported
+    matches) are skipped. `normalize` maps display names onto the keys the
+    caller uses (e.g. DecklistScraper.normalize_player_name). With `by_id`,
+    records are keyed by Melee player ID from the PlayerId/OpponentId/WinnerId
+    columns instead, and names are not looked at.
+    """
+    normalize = normalize or (lambda name: name.strip())
+    records: dict[str, dict[str, int]] = {}
+    if pairings.empty:
+        return records
+    if round_ids is not None:
+        wanted = {int(r) for r in round_ids}
+        pairings = pairings[pd.to_numeric(pairings["RoundId"], errors="coerce").isin(wanted)]
+
+    if by_id:
+        for pid, oid, wid, outcome in zip(pairings["PlayerId"], pairings["OpponentId"], pairings["WinnerId"], pairings["Outcome"]):
+            ids = [None if pd.isna(x) else int(x) for x in (pid, oid)]
+            if outcome == "Draw":
+                results = [(ids[0], "draws"), (ids[1], "draws")]
+            elif pd.isna(wid):
+                continue
+            elif outcome == "Bye":
+                results = [(int(wid), "wins")]
+            else:
+                loser = ids[1] if int(wid) == ids[0] else ids[0]
+                results = [(int(wid), "wins"), (loser, "losses")]
+            for player_id, key in results:
+                if player_id is not None:
+                    records.setdefault(player_id, {"wins": 0, "losses": 0, "draws": 0})[key] += 1
+        return records
+
+    def bump(name, key: str) -> None:
+        if not isinstance(name, str) or not name.strip():
+            return
+        player = normalize(name)
+        if player:
+            records.setdefault(player, {"wins": 0, "losses": 0, "draws": 0})[key] += 1
+
+    for player, opponent, result in zip(pairings["Player"], pairings["Opponent"], pairings["ResultString"]):
+        winner, is_draw, is_bye = parse_result_string(result)
+        if is_bye:
+            # the bye row's only competitor is the player
+            bump(player, "wins")
+        elif is_draw:
+            bump(player, "draws")
+            bump(opponent, "draws")
+        elif winner:
+            names = [n if isinstance(n, str) else "" for n in (player, opponent)]
+            winner_key = normalize(winner)
+            if winner_key == normalize(names[0]):
+                bump(names[0], "wins")
+                bump(names[1], "losses")
+            elif winner_key == normalize(names[1]):
+                bump(names[1], "wins")
+                bump(names[0], "losses")
+    return records
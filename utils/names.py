@@ -0,0 +1,90 @@
+"""Player-name normalisation shared by the fetch and analytics stages.
+
+Kept free of heavy imports so analytics scripts can use it without loading
+the decklist scraper (bs4, requests).
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import List
+
+# canonical suffix formatting
+SUFFIX_MAP = {
+    "jr": "Jr.",
+    "jr.": "Jr.",
+    "sr": "Sr.",
+    "sr.": "Sr.",
+    "ii": "II",
+    "iii": "III",
+    "iv": "IV",
+    "v": "V",
+}
+
+
+@lru_cache(maxsize=65536)
+def normalize_player_name(raw: str) -> str:
+    """Normalize player display names into 'First Last' with suffix handling.
+
+    Examples:
+    - 'Hulstine, liam' -> 'Liam Hulstine'
+    - 'Smith, John Jr.' -> 'John Smith Jr.'
+    - 'John Smith' -> 'John Smith'
+    Returns empty string if raw is falsy. Results are memoised: the same few
+    thousand names are normalised over and over across rows.
+    """
+    if not raw:
+        return ""
+    s = raw.strip()
+    # If format is 'Last, First [Suffix]' OR 'Last Suffix, First'
+    if "," in s:
+        parts = [p.strip() for p in s.split(",") if p.strip()]
+        if len(parts) >= 2:
+            last_part = parts[0]
+            rest_parts = parts[1:]
+
+            # check for suffix on the last part (e.g., 'Leal Jr.')
+            last_tokens = last_part.split()
+            suffix = ""
+            if last_tokens and last_tokens[-1].rstrip('.').lower() in SUFFIX_MAP:
+                suffix = SUFFIX_MAP[last_tokens[-1].rstrip('.').lower()]
+                last_name = " ".join(last_tokens[:-1]) or last_tokens[0]
+            else:
+                last_name = last_part
+
+            # Build rest tokens while allowing a standalone suffix part (e.g., 'Leal, Jr., Noe')
+            rest_tokens: List[str] = []
+            for part in rest_parts:
+                t = part.strip()
+                if not t:
+                    continue
+                if t.rstrip('.').lower() in SUFFIX_MAP:
+                    suffix = SUFFIX_MAP[t.rstrip('.').lower()]
+                    continue
+                rest_tokens.extend(t.split())
+
+            # final check: trailing suffix token in rest_tokens (e.g., 'John Jr.')
+            if rest_tokens and rest_tokens[-1].rstrip('.').lower() in SUFFIX_MAP:
+                suffix = SUFFIX_MAP[rest_tokens[-1].rstrip('.').lower()]
+                rest_tokens = rest_tokens[:-1]
+
+            first_and_middle = " ".join(rest_tokens)
+            name = (first_and_middle + " " + last_name).strip()
+            if suffix:
+                name = f"{name} {suffix}"
+            # Title-case each word (simple heuristic)
+            return " ".join([w.capitalize() for w in name.split()])
+
+    # No comma: assume 'First Last' or similar. Normalize whitespace and capitalization
+    tokens = s.split()
+    if not tokens:
+        return ""
+    # handle trailing suffix token
+    suffix = ""
+    if tokens and tokens[-1].rstrip('.').lower() in SUFFIX_MAP:
+        suffix = SUFFIX_MAP[tokens[-1].rstrip('.').lower()]
+        tokens = tokens[:-1]
+    name = " ".join(tokens)
+    if suffix:
+        name = f"{name} {suffix}"
+    return " ".join([w.capitalize() for w in name.split()])
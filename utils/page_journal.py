@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Append-only JSONL journal of fetched DataTables pages with a resumable checkpoint.
+
+Every page is written to `<event_dir>/<name>_journal.jsonl` as soon as it
+arrives (one line: {"round_id", "start", "rows"}), and
+`<event_dir>/<name>_checkpoint.json` records which (round, start) pages and
+which whole rounds are done. A crashed or cookie-expired run therefore
+resumes from the checkpoint instead of refetching everything, and the rows
+are streamed back page by page, so memory stays bounded by one page.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+
+class PageJournal:
+    def __init__(self, event_dir: Path | str, name: str, event_id: int):
+        self.event_dir = Path(event_dir)
+        self.journal_path = self.event_dir / f"{name}_journal.jsonl"
+        self.checkpoint_path = self.event_dir / f"{name}_checkpoint.json"
+        self.event_id = int(event_id)
+        self._lock = threading.Lock()
+        self._pages: set[tuple[int, int]] = set()
+        self._rounds_done: set[int] = set()
+        self._load_checkpoint()
+        self._repair_tail()
+
+    def _repair_tail(self) -> None:
+        """Terminate a torn last line so the next append starts on a fresh line."""
+        try:
+            with self.journal_path.open("rb+") as fh:
+                fh.seek(0, os.SEEK_END)
+                if fh.tell() == 0:
+                    return
+                fh.seek(-1, os.SEEK_END)
+                if fh.read(1) != b"\n":
+                    fh.write(b"\n")
+        except FileNotFoundError:
+            pass
+
+    def _load_checkpoint(self) -> None:
+        try:
+            raw = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if int(raw.get("event_id", -1)) != self.event_id:
+            # leftovers from another event: start clean
+            self.clear()
+            return
+        self._pages = {(int(r), int(s)) for r, s in raw.get("pages", [])}
+        self._rounds_done = {int(r) for r in raw.get("rounds_done", [])}
+
+    def _write_checkpoint(self) -> None:
+        payload = {
+            "event_id": self.event_id,
+            "pages": sorted(self._pages),
+            "rounds_done": sorted(self._rounds_done),
+        }
+        tmp = self.checkpoint_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp, self.checkpoint_path)
+
+    @property
+    def has_progress(self) -> bool:
+        return bool(self._pages)
+
+    def is_round_done(self, round_id: int) -> bool:
+        return int(round_id) in self._rounds_done
+
+    def completed_starts(self, round_id: int) -> set[int]:
+        with self._lock:
+            return {s for r, s in self._pages if r == int(round_id)}
+
+    def journaled_round_ids(self) -> set[int]:
+        with self._lock:
+            return {r for r, _ in self._pages}
+
+    def append_page(self, round_id: int, start: int, rows: list[dict[str, Any]]) -> None:
+        """Persist one page, then checkpoint it (journal first, so a checkpointed page is always on disk)."""
+        line = json.dumps({"round_id": int(round_id), "start": int(start), "rows": rows}, ensure_ascii=False)
+        with self._lock:
+            self.event_dir.mkdir(parents=True, exist_ok=True)
+            with self.journal_path.open("a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+                fh.flush()
+            self._pages.add((int(round_id), int(start)))
+            self._write_checkpoint()
+
+    def mark_round_done(self, round_id: int) -> None:
+        with self._lock:
+            self._rounds_done.add(int(round_id))
+            self._write_checkpoint()
+
+    def reset_rounds(self, round_ids: Iterable[int]) -> None:
+        """Forget checkpointed pages of rounds that must be refetched (e.g. still in progress)."""
+        drop = {int(r) for r in round_ids}
+        with self._lock:
+            self._pages = {(r, s) for r, s in self._pages if r not in drop}
+            self._rounds_done -= drop
+            self._write_checkpoint()
+
+    def iter_rows(self, round_ids: Iterable[int] | None = None) -> Iterator[dict[str, Any]]:
+        """Stream journaled rows in (round, start) order, one page in memory at a time.
+
+        Only checkpointed pages are yielded, and when a page was journaled more
+        than once (refetched after a reset) the last copy wins. `round_ids`
+        limits the rows to those rounds (e.g. only the fully fetched ones).
+        """
+        wanted = {int(r) for r in round_ids} if round_ids is not None else None
+        if not self.journal_path.exists():
+            return
+        # first pass: byte offset of the last copy of every checkpointed page
+        offsets: dict[tuple[int, int], int] = {}
+        with self.journal_path.open("rb") as fh:
+            while True:
+                pos = fh.tell()
+                line = fh.readline()
+                if not line:
+                    break
+                try:
+                    page = json.loads(line)
+                except ValueError:
+                    continue  # torn final line from a crash
+                key = (int(page["round_id"]), int(page["start"]))
+                if key in self._pages and (wanted is None or key[0] in wanted):
+                    offsets[key] = pos
+            # second pass: seek to each page in order and yield its rows
+            for key in sorted(offsets):
+                fh.seek(offsets[key])
+                for row in json.loads(fh.readline())["rows"]:
+                    yield row
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in (self.journal_path, self.checkpoint_path):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            self._pages = set()
+            self._rounds_done = set()
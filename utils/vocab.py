@@ -0,0 +1,141 @@
+"""Dictionary encoding: dense int32 IDs for players, archetypes, cards and zones.
+
+Analytics stages encode string columns once at ingest, work on the integer
+codes (masks, groupbys and joins compare ints), and decode back to strings
+only when writing output. Codes are stable across runs because each
+vocabulary is persisted as JSON and only ever appended to:
+
+    data/<event>/vocab.json       per event (create_card_winrates)
+    data/all_events/vocab.json    shared by the combined all-events tables
+
+Missing values encode to -1 and decode to None.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+VOCAB_NAME = "vocab.json"
+MISSING = -1
+
+# decklist column -> vocabulary it is encoded with
+DECKLIST_FIELDS = {"player": "players", "deck_archetype": "archetypes", "card_name": "cards", "zone": "zones", "Event": "events"}
+
+
+class Vocabulary:
+    """Append-only string <-> int32 mapping."""
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        self._values: list[str] = []
+        self._index: dict[str, int] = {}
+        for value in values:
+            self.add(value)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._index
+
+    @property
+    def values(self) -> list[str]:
+        return list(self._values)
+
+    def add(self, value: Any) -> int:
+        value = str(value)
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self._values)
+            self._values.append(value)
+        return code
+
+    def _codes(self, values: Any, grow: bool) -> np.ndarray:
+        series = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # already factorized (typed decklist columns): map the categories, index by the codes
+            series = series.cat.remove_unused_categories()
+            local, uniques = series.cat.codes.to_numpy(), series.cat.categories
+        else:
+            # factorize first so each distinct string is hashed into the vocabulary once
+            local, uniques = pd.factorize(series.astype(object), use_na_sentinel=True)
+        if grow:
+            mapped = [self.add(u) for u in uniques]
+        else:
+            mapped = [self._index.get(str(u), MISSING) for u in uniques]
+        mapped_arr = np.asarray(mapped + [MISSING], dtype=np.int32)
+        # local == -1 (missing) picks the trailing MISSING
+        return mapped_arr[local]
+
+    def encode(self, values: Any) -> np.ndarray:
+        """int32 codes for `values`, adding unseen strings."""
+        return self._codes(values, grow=True)
+
+    def lookup(self, values: Any) -> np.ndarray:
+        """int32 codes for `values`; unseen strings map to -1."""
+        return self._codes(values, grow=False)
+
+    def code(self, value: Any) -> int:
+        return self._index.get(str(value), MISSING)
+
+    def decode(self, codes: Any) -> np.ndarray:
+        codes = np.asarray(codes, dtype=np.int64)
+        table = np.asarray(self._values + [None], dtype=object)
+        return table[np.where(codes < 0, len(self._values), codes)]
+
+
+class EventVocabulary:
+    """The vocabularies used by one event (or by the combined all-events tables)."""
+
+    KINDS = ("players", "archetypes", "cards", "zones", "events")
+
+    def __init__(self, data: dict[str, list[str]] | None = None) -> None:
+        data = data or {}
+        for kind in self.KINDS:
+            setattr(self, kind, Vocabulary(data.get(kind, ())))
+
+    def __getitem__(self, kind: str) -> Vocabulary:
+        return getattr(self, kind)
+
+    def encode_frame(self, df: pd.DataFrame, fields: dict[str, str] = DECKLIST_FIELDS) -> pd.DataFrame:
+        """Copy of `df` with the string columns in `fields` replaced by int32 codes."""
+        out = df.copy()
+        for col, kind in fields.items():
+            if col in out.columns:
+                out[col] = self[kind].encode(out[col])
+        return out
+
+    def decode_frame(self, df: pd.DataFrame, fields: dict[str, str] = DECKLIST_FIELDS) -> pd.DataFrame:
+        """Inverse of encode_frame."""
+        out = df.copy()
+        for col, kind in fields.items():
+            if col in out.columns:
+                out[col] = self[kind].decode(out[col])
+        return out
+
+    @classmethod
+    def load(cls, path: Path | str) -> "EventVocabulary":
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        try:
+            return cls(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError) as exc:
+            print(f"Warning: ignoring unreadable vocabulary {path}: {exc}")
+            return cls()
+
+    def save(self, path: Path | str) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps({kind: self[kind].values for kind in self.KINDS}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+def vocab_path(directory: Path | str) -> Path:
+    return Path(directory) / VOCAB_NAME